@@ -0,0 +1,38 @@
+"""备份导入/导出 API"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import get_db, get_read_session_factory
+from app.schemas import BackupImportResponse
+from app.services.backup_service import stream_backup, import_backup
+from app.services.problem_cache import get_problem_cache
+from app.services.event_bus import get_event_bus, RESYNC_EVENT
+
+router = APIRouter()
+
+
+@router.get("/export")
+async def export_backup(session_factory: async_sessionmaker = Depends(get_read_session_factory)):
+    """流式导出进度、复习计划、笔记和题目标签（JSON Lines，题目以 leetcode_id 关联）"""
+    filename = f"leetcode-backup-{datetime.utcnow():%Y%m%d%H%M%S}.jsonl"
+    return StreamingResponse(
+        stream_backup(session_factory),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import", response_model=BackupImportResponse)
+async def import_backup_file(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    导入备份文件（请求体为导出的 JSON Lines 原文）
+    - 边接收边按块写入，每块一个事务；无效行及本库不存在的题目跳过并在结果中列出
+    - 同一题目的复习计划、笔记以文件为准覆盖（重复的笔记行跳过），进度按题目覆盖，标签关联只增不删
+    """
+    result = await import_backup(db, request.stream())
+    get_problem_cache().clear()
+    # 批量变化不逐条推送，通知订阅者整体刷新
+    get_event_bus().publish(RESYNC_EVENT, {})
+    return result
@@ -0,0 +1,46 @@
+"""变更事件推送 API（Server-Sent Events）"""
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.sharding import require_user_id
+from app.services.event_bus import get_event_bus
+
+router = APIRouter()
+
+# 断线后浏览器重连的等待时间（毫秒）
+RETRY_MS = 3000
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[int] = Query(None, description="从该事件之后开始推送（未带 Last-Event-ID 头时使用）"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    订阅进度、复习、笔记、标签的变更事件
+    - 事件类型：progress / review / note / tag；客户端落后太多时收到 resync，需整体刷新
+    - 空闲时定期发送注释行作为心跳
+    - 浏览器自动重连时带 Last-Event-ID，补发断线期间的事件
+    """
+    if last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+    # 多用户模式下只推送该用户的事件（EventSource 无法设置请求头，可用 user 查询参数）
+    user_id = require_user_id(request) if settings.MULTI_USER else None
+
+    async def event_stream():
+        yield b"retry: %d\n\n" % RETRY_MS
+        # 取总线与登记订阅之间没有 await，总线不会在两者之间被淘汰
+        async for event in get_event_bus(user_id).subscribe(last_event_id):
+            if await request.is_disconnected():
+                break
+            yield b": ping\n\n" if event is None else event.encode()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
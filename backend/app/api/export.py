@@ -0,0 +1,31 @@
+"""导出 API"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.database import get_read_session_factory
+
+from app.services.export_service import EXPORT_FORMATS, EXPORT_QUERIES, stream_export
+
+router = APIRouter()
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", description="导出格式: ndjson/csv"),
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+):
+    """流式导出完整的复习计划(reviews)或进度(progress)历史"""
+    if dataset not in EXPORT_QUERIES:
+        raise HTTPException(status_code=404, detail="不支持的导出数据集")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="不支持的导出格式")
+    
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(dataset, format, session_factory),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,13 @@
+"""监控指标 API"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    """各路由的请求耗时、SQL 语句数和数据库耗时（Prometheus 文本格式）"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
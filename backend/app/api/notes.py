@@ -3,9 +3,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models import Note
 from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse
+from app.services.event_bus import get_event_bus
 
 router = APIRouter()
 
@@ -45,12 +46,13 @@ async def create_or_update_note(
     
     await db.commit()
     await db.refresh(note)
+    get_event_bus().publish("note", {"action": "saved", "note_id": note.id, "problem_id": note.problem_id})
     
     return note
 
 
 @router.get("/{problem_id}", response_model=NoteResponse | None)
-async def get_note(problem_id: int, db: AsyncSession = Depends(get_db)):
+async def get_note(problem_id: int, db: AsyncSession = Depends(get_read_db)):
     """获取题目笔记"""
     result = await db.execute(
         select(Note).where(Note.problem_id == problem_id)
@@ -71,5 +73,6 @@ async def delete_note(note_id: int, db: AsyncSession = Depends(get_db)):
     
     await db.delete(note)
     await db.commit()
+    get_event_bus().publish("note", {"action": "deleted", "note_id": note.id, "problem_id": note.problem_id})
     
     return {"message": "删除成功"}
@@ -1,58 +1,61 @@
 """题目 API"""
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
-from app.models import Problem, Progress, ProblemTag, ReviewPlan
+from app.core.database import get_read_db
+from app.core.responses import FastJSONResponse
+from app.models import Problem, Progress, ProblemTag
 from app.schemas.problem import ProblemResponse, ProblemListResponse, TagInProblem, ProgressInProblem
-from app.services.init_data import init_all_data
+from app.services.problem_cache import get_problem_cache
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.search_service import problem_search_clause
 
 router = APIRouter()
 
 
-async def get_completed_reviews_count(db: AsyncSession, progress_id: int) -> int:
-    """获取已完成的复习轮次数"""
-    result = await db.execute(
-        select(func.count()).where(
-            ReviewPlan.progress_id == progress_id,
-            ReviewPlan.completed == True
-        )
-    )
-    return result.scalar() or 0
-
-
-async def get_total_reviews_count(db: AsyncSession, progress_id: int) -> int:
-    """获取总复习轮次数"""
-    result = await db.execute(
-        select(func.count()).where(ReviewPlan.progress_id == progress_id)
-    )
-    return result.scalar() or 5
+def serialize_problem(problem: Problem) -> dict:
+    """将题目（含进度和标签）转为与 ProblemResponse 结构一致的 dict"""
+    progress = problem.progress
+    progress_data = None
+    if progress:
+        progress_data = {
+            "status": progress.status,
+            "attempt_count": progress.attempt_count,
+            "mastery_level": progress.mastery_level,
+            "first_solved": progress.first_solved,
+            "last_attempt": progress.last_attempt,
+            "completed_reviews": progress.completed_reviews,
+            "total_reviews": progress.total_reviews or 5,
+        }
+    
+    return {
+        "id": problem.id,
+        "leetcode_id": problem.leetcode_id,
+        "title": problem.title,
+        "title_cn": problem.title_cn,
+        "difficulty": problem.difficulty,
+        "category": problem.category,
+        "url": problem.url,
+        "progress": progress_data,
+        "tags": [
+            {"id": pt.tag.id, "name": pt.tag.name, "color": pt.tag.color}
+            for pt in problem.problem_tags
+        ],
+    }
 
 
-@router.get("", response_model=ProblemListResponse)
-async def get_problems(
-    difficulty: Optional[str] = Query(None, description="难度筛选: Easy/Medium/Hard"),
-    category: Optional[str] = Query(None, description="分类筛选"),
-    status: Optional[str] = Query(None, description="状态筛选: not_started/in_progress/mastered"),
-    search: Optional[str] = Query(None, description="搜索关键词"),
-    tag_id: Optional[int] = Query(None, description="标签ID筛选"),
-    sort_by: Optional[str] = Query("default", description="排序方式: default(官方顺序)/leetcode_id(题号)"),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(100, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+def problem_filter_query(
+    difficulty: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    tag_id: Optional[int] = None,
 ):
-    """获取题目列表（支持筛选和分页）"""
-    # 确保数据已初始化
-    await init_all_data(db)
-    
-    # 构建查询
-    query = select(Problem).options(
-        selectinload(Problem.progress),
-        selectinload(Problem.problem_tags).selectinload(ProblemTag.tag)
-    )
+    """按筛选条件构建题目查询（不含排序、分页和关联加载）"""
+    query = select(Problem)
     
     # 难度筛选
     if difficulty:
@@ -64,12 +67,7 @@ async def get_problems(
     
     # 搜索
     if search:
-        search_pattern = f"%{search}%"
-        query = query.where(
-            (Problem.title.ilike(search_pattern)) | 
-            (Problem.title_cn.ilike(search_pattern)) |
-            (Problem.leetcode_id == int(search) if search.isdigit() else False)
-        )
+        query = query.where(problem_search_clause(search))
     
     # 标签筛选
     if tag_id:
@@ -79,99 +77,96 @@ async def get_problems(
     if status:
         query = query.join(Progress).where(Progress.status == status)
     
-    # 排序
-    if sort_by == "leetcode_id":
-        query = query.order_by(Problem.leetcode_id)
-    else:
-        # 默认按 id 保持官方顺序
-        query = query.order_by(Problem.id)
+    return query
+
+
+@router.get("", response_model=ProblemListResponse)
+async def get_problems(
+    difficulty: Optional[str] = Query(None, description="难度筛选: Easy/Medium/Hard"),
+    category: Optional[str] = Query(None, description="分类筛选"),
+    status: Optional[str] = Query(None, description="状态筛选: not_started/in_progress/mastered"),
+    search: Optional[str] = Query(None, description="搜索关键词"),
+    tag_id: Optional[int] = Query(None, description="标签ID筛选"),
+    sort_by: Optional[str] = Query("default", description="排序方式: default(官方顺序)/leetcode_id(题号)"),
+    page: int = Query(1, ge=1, description="页码（未提供 cursor 时使用 OFFSET 分页）"),
+    page_size: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="游标分页：上一页返回的 next_cursor"),
+    include_total: bool = Query(False, description="是否返回筛选结果总数"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """获取题目列表（支持筛选和分页，推荐使用 cursor 游标分页）"""
+    # 优先读取缓存（其他进程写入过时先清空）
+    cache = get_problem_cache()
+    await cache.ensure_fresh(db)
+    filter_params = dict(
+        difficulty=difficulty, category=category, status=status, search=search, tag_id=tag_id,
+    )
+    cache_key = cache.make_key(
+        **filter_params, sort_by=sort_by, page=page, page_size=page_size,
+        cursor=cursor, include_total=include_total,
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return FastJSONResponse(cached)
+    cache_version = cache.version
     
-    # 计算总数
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    # 构建查询
+    query = problem_filter_query(**filter_params).options(
+        selectinload(Problem.progress),
+        selectinload(Problem.problem_tags).selectinload(ProblemTag.tag)
+    )
     
-    # 分页
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    # 计算总数（按需返回，结果按筛选条件缓存）
+    total = None
+    if include_total:
+        total_key = cache.make_key(**filter_params)
+        total = cache.get_total(total_key)
+        if total is None:
+            count_query = select(func.count()).select_from(query.subquery())
+            total_result = await db.execute(count_query)
+            total = total_result.scalar()
+            cache.set_total(total_key, total, cache_version, status_filter=status, tag_filter=tag_id)
+    
+    # 排序键：leetcode_id(题号) 或 id(官方顺序)，均唯一，可直接用作游标
+    sort_column = Problem.leetcode_id if sort_by == "leetcode_id" else Problem.id
+    query = query.order_by(sort_column)
+    
+    # 分页：游标优先，否则回退到 OFFSET
+    if cursor:
+        try:
+            (last_key,) = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        if not isinstance(last_key, int):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        query = query.where(sort_column > last_key)
+    elif page > 1:
+        query = query.offset((page - 1) * page_size)
+    # 多取一行用于判断是否还有下一页
+    query = query.limit(page_size + 1)
     
     # 执行查询
     result = await db.execute(query)
     problems = result.scalars().unique().all()
     
-    # 批量查询所有 progress_id 的复习统计（避免N+1查询）
-    progress_ids = [p.progress.id for p in problems if p.progress]
-    review_stats = {}
-    
-    if progress_ids:
-        # 查询已完成的复习数
-        completed_result = await db.execute(
-            select(
-                ReviewPlan.progress_id,
-                func.count().label('completed')
-            )
-            .where(ReviewPlan.progress_id.in_(progress_ids))
-            .where(ReviewPlan.completed == True)
-            .group_by(ReviewPlan.progress_id)
-        )
-        for row in completed_result.fetchall():
-            if row.progress_id not in review_stats:
-                review_stats[row.progress_id] = {'completed': 0, 'total': 5}
-            review_stats[row.progress_id]['completed'] = row.completed
-        
-        # 查询总复习数
-        total_result = await db.execute(
-            select(
-                ReviewPlan.progress_id,
-                func.count().label('total')
-            )
-            .where(ReviewPlan.progress_id.in_(progress_ids))
-            .group_by(ReviewPlan.progress_id)
-        )
-        for row in total_result.fetchall():
-            if row.progress_id not in review_stats:
-                review_stats[row.progress_id] = {'completed': 0, 'total': 5}
-            review_stats[row.progress_id]['total'] = row.total
-    
-    # 构建响应
-    items = []
-    for problem in problems:
-        # 处理进度信息
-        progress_data = None
-        if problem.progress:
-            stats = review_stats.get(problem.progress.id, {'completed': 0, 'total': 5})
-            progress_data = ProgressInProblem(
-                status=problem.progress.status,
-                attempt_count=problem.progress.attempt_count,
-                mastery_level=problem.progress.mastery_level,
-                first_solved=problem.progress.first_solved,
-                last_attempt=problem.progress.last_attempt,
-                completed_reviews=stats['completed'],
-                total_reviews=stats['total'] if stats['total'] > 0 else 5,
-            )
-        
-        # 处理标签信息
-        tags_data = [
-            TagInProblem(id=pt.tag.id, name=pt.tag.name, color=pt.tag.color)
-            for pt in problem.problem_tags
-        ]
-        
-        items.append(ProblemResponse(
-            id=problem.id,
-            leetcode_id=problem.leetcode_id,
-            title=problem.title,
-            title_cn=problem.title_cn,
-            difficulty=problem.difficulty,
-            category=problem.category,
-            url=problem.url,
-            progress=progress_data,
-            tags=tags_data,
-        ))
-    
-    return ProblemListResponse(total=total, items=items)
+    next_cursor = None
+    if len(problems) > page_size:
+        problems = problems[:page_size]
+        next_cursor = encode_cursor([getattr(problems[-1], sort_column.key)])
+    
+    # 构建响应（普通 dict，编码一次后写入缓存）
+    response = {
+        "total": total,
+        "items": [serialize_problem(problem) for problem in problems],
+        "next_cursor": next_cursor,
+    }
+    content = cache.set(cache_key, response, cache_version, status_filter=status, tag_filter=tag_id)
+    
+    return FastJSONResponse(content)
 
 
 @router.get("/categories")
-async def get_categories(db: AsyncSession = Depends(get_db)):
+async def get_categories(db: AsyncSession = Depends(get_read_db)):
     """获取所有分类"""
     result = await db.execute(
         select(Problem.category).distinct().order_by(Problem.category)
@@ -181,7 +176,7 @@ async def get_categories(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/{problem_id}", response_model=ProblemResponse)
-async def get_problem(problem_id: int, db: AsyncSession = Depends(get_db)):
+async def get_problem(problem_id: int, db: AsyncSession = Depends(get_read_db)):
     """获取题目详情"""
     result = await db.execute(
         select(Problem)
@@ -200,16 +195,12 @@ async def get_problem(problem_id: int, db: AsyncSession = Depends(get_db)):
     # 处理进度信息
     progress_data = None
     if problem.progress:
-        # 查询复习进度
-        completed_reviews = await get_completed_reviews_count(db, problem.progress.id)
-        total_reviews = await get_total_reviews_count(db, problem.progress.id)
-        
         progress_data = ProgressInProblem(
             status=problem.progress.status,
             attempt_count=problem.progress.attempt_count,
             mastery_level=problem.progress.mastery_level,
-            completed_reviews=completed_reviews,
-            total_reviews=total_reviews if total_reviews > 0 else 5,
+            completed_reviews=problem.progress.completed_reviews,
+            total_reviews=problem.progress.total_reviews or 5,
         )
     
     # 处理标签信息
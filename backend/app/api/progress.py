@@ -2,37 +2,20 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, case, and_
 
-from app.core.database import get_db
-from app.models import Progress, ReviewPlan
-from app.schemas.progress import ProgressUpdate, ProgressResponse
-from app.services.review_service import generate_review_plans
+from app.core.database import get_db, get_read_db
+from app.models import Progress
+from app.schemas.progress import ProgressUpdate, ProgressResponse, ProgressBatchComplete, ProgressBatchResponse, ProgressBatchItem
+from app.services.review_service import replace_pending_review_plans, invalidate_review_totals
+from app.services.activity_service import record_attempts, ATTEMPT_COMPLETE, ATTEMPT_UPDATE
+from app.services.problem_cache import get_problem_cache
+from app.services.event_bus import publish_progress
 
 router = APIRouter()
 
 
-async def get_review_stats(db: AsyncSession, progress_id: int) -> tuple[int, int]:
-    """获取复习统计：(已完成轮次, 总轮次)"""
-    # 查询已完成的复习轮次数
-    completed_result = await db.execute(
-        select(func.count()).where(
-            ReviewPlan.progress_id == progress_id,
-            ReviewPlan.completed == True
-        )
-    )
-    completed = completed_result.scalar() or 0
-    
-    # 查询总复习轮次数
-    total_result = await db.execute(
-        select(func.count()).where(ReviewPlan.progress_id == progress_id)
-    )
-    total = total_result.scalar() or 0
-    
-    return completed, total if total > 0 else 5
-
-
-def build_progress_response(progress: Progress, completed_reviews: int, total_reviews: int, is_first_complete: bool = False) -> dict:
+def build_progress_response(progress: Progress, is_first_complete: bool = False) -> dict:
     """构建进度响应，包含复习进度信息"""
     return {
         "id": progress.id,
@@ -42,55 +25,116 @@ def build_progress_response(progress: Progress, completed_reviews: int, total_re
         "attempt_count": progress.attempt_count,
         "first_solved": progress.first_solved,
         "last_attempt": progress.last_attempt,
-        "completed_reviews": completed_reviews,
-        "total_reviews": total_reviews,
+        "completed_reviews": progress.completed_reviews,
+        "total_reviews": progress.total_reviews or 5,
+        "review_round": progress.review_round,
+        "next_due": progress.next_due,
         "is_first_complete": is_first_complete,
     }
 
 
+async def complete_progresses(db: AsyncSession, problem_ids: list[int], now: datetime) -> list[Progress]:
+    """
+    标记完成：一条算术 UPDATE ... RETURNING 切换状态并递增尝试次数（不提交事务）
+    SET 中引用的都是更新前的值；UPDATE 取得写锁后并发请求串行执行，
+    只有把状态从 not_started 切换过来的请求拿到的 first_solved 等于本次时间 now，据此判断首次完成
+    """
+    is_not_started = Progress.status == "not_started"
+    result = await db.scalars(
+        update(Progress)
+        .where(Progress.problem_id.in_(problem_ids))
+        .values(
+            status=case((is_not_started, "in_progress"), else_=Progress.status),
+            first_solved=case((is_not_started, now), else_=Progress.first_solved),
+            attempt_count=Progress.attempt_count + 1,
+            last_attempt=now,
+        )
+        .returning(Progress)
+        .execution_options(synchronize_session=False)
+    )
+    return result.all()
+
+
 @router.post("/{problem_id}/complete", response_model=ProgressResponse)
 async def mark_complete(
     problem_id: int,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    一键标记完成
+    一键标记完成（单个事务）
+    - 一条算术 UPDATE ... RETURNING 完成状态切换和尝试次数递增，并发重复点击不会丢失计数，
+      尝试次数与做题事件日志保持一致
     - 自动将状态从 not_started 变为 in_progress
-    - 自动生成复习计划
-    - 增加尝试次数
+    - 首次完成时生成复习计划（一条 DELETE + 一条多行 INSERT）
+    - 响应直接由 RETURNING 取回的进度构建，提交后不再查询
     """
-    # 查找进度记录
-    result = await db.execute(
-        select(Progress).where(Progress.problem_id == problem_id)
-    )
-    progress = result.scalar_one_or_none()
-    
-    if not progress:
+    now = datetime.utcnow()
+    progresses = await complete_progresses(db, [problem_id], now)
+    if not progresses:
         raise HTTPException(status_code=404, detail="进度记录不存在")
+    progress = progresses[0]
+    is_first_time = progress.first_solved == now
     
-    # 记录是否首次完成
-    is_first_time = progress.status == "not_started"
-    
-    # 自动设置状态为进行中（如果还未开始）
-    if progress.status == "not_started":
-        progress.status = "in_progress"
-        progress.first_solved = datetime.utcnow()
-    
-    # 更新尝试次数和时间
-    progress.attempt_count += 1
-    progress.last_attempt = datetime.utcnow()
-    
+    # 首次完成时生成复习计划，与进度更新、做题记录同一事务提交
+    if is_first_time:
+        await replace_pending_review_plans(db, [progress], now)
+    await record_attempts(db, [problem_id], ATTEMPT_COMPLETE, now)
     await db.commit()
-    await db.refresh(progress)
     
-    # 首次完成时生成复习计划
     if is_first_time:
-        await generate_review_plans(db, progress.id)
+        invalidate_review_totals()
+    # 失效题目列表缓存
+    get_problem_cache().invalidate_problems([problem_id])
+    publish_progress([progress])
+    
+    return build_progress_response(progress, is_first_complete=is_first_time)
+
+
+@router.post("/complete-batch", response_model=ProgressBatchResponse)
+async def mark_complete_batch(
+    batch: ProgressBatchComplete,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    批量标记完成（单个事务）
+    - 与一键完成的规则相同，逐题返回结果
+    - 首次完成的题目批量生成复习计划
+    """
+    # 去重并保持顺序
+    problem_ids = list(dict.fromkeys(batch.problem_ids))
+    
+    now = datetime.utcnow()
+    progress_map = {
+        progress.problem_id: progress
+        for progress in await complete_progresses(db, problem_ids, now)
+    }
+    first_time = [progress for progress in progress_map.values() if progress.first_solved == now]
     
-    # 获取复习统计
-    completed_reviews, total_reviews = await get_review_stats(db, progress.id)
+    # 首次完成的题目批量重建复习计划，与进度更新、做题记录同一事务提交
+    await replace_pending_review_plans(db, first_time, now)
+    await record_attempts(db, progress_map.keys(), ATTEMPT_COMPLETE, now)
+    await db.commit()
     
-    return build_progress_response(progress, completed_reviews, total_reviews, is_first_complete=is_first_time)
+    if first_time:
+        invalidate_review_totals()
+    get_problem_cache().invalidate_problems(progress_map.keys())
+    publish_progress(progress_map.values())
+    
+    first_time_ids = {progress.problem_id for progress in first_time}
+    items = []
+    for problem_id in problem_ids:
+        progress = progress_map.get(problem_id)
+        if progress is None:
+            items.append(ProgressBatchItem(problem_id=problem_id, success=False, detail="进度记录不存在"))
+            continue
+        items.append(ProgressBatchItem(
+            problem_id=problem_id,
+            success=True,
+            progress=build_progress_response(progress, is_first_complete=problem_id in first_time_ids),
+        ))
+    
+    succeeded = sum(1 for item in items if item.success)
+    return ProgressBatchResponse(succeeded=succeeded, failed=len(items) - succeeded, items=items)
 
 
 @router.put("/{problem_id}", response_model=ProgressResponse)
@@ -103,43 +147,51 @@ async def update_progress(
     手动更新题目进度（高级选项）
     保留此接口用于特殊情况下的手动调整
     """
-    # 查找进度记录
-    result = await db.execute(
-        select(Progress).where(Progress.problem_id == problem_id)
+    now = datetime.utcnow()
+    # 一条 UPDATE ... RETURNING 写入新状态并递增尝试次数（SET 中引用的都是更新前的值）
+    started = progress_update.status in ["in_progress", "mastered"]
+    result = await db.scalars(
+        update(Progress)
+        .where(Progress.problem_id == problem_id)
+        .values(
+            status=progress_update.status,
+            mastery_level=progress_update.mastery_level,
+            attempt_count=Progress.attempt_count + 1,
+            last_attempt=now,
+            # 首次完成时记录完成时间
+            first_solved=case(
+                (and_(Progress.status == "not_started", started), now), else_=Progress.first_solved
+            ),
+        )
+        .returning(Progress)
+        .execution_options(synchronize_session=False)
     )
-    progress = result.scalar_one_or_none()
+    progress = result.one_or_none()
     
     if not progress:
         raise HTTPException(status_code=404, detail="进度记录不存在")
     
-    # 记录旧状态
-    old_status = progress.status
-    
-    # 更新状态
-    progress.status = progress_update.status
-    progress.mastery_level = progress_update.mastery_level
-    progress.attempt_count += 1
-    progress.last_attempt = datetime.utcnow()
-    
-    # 如果首次完成
-    if old_status == "not_started" and progress_update.status in ["in_progress", "mastered"]:
-        progress.first_solved = datetime.utcnow()
+    # 只有从 not_started 切换过来时 first_solved 才等于本次时间
+    old_status_not_started = started and progress.first_solved == now
     
+    # 如果状态变为进行中，生成复习计划（与进度更新同一事务提交）
+    generate_plans = progress_update.status == "in_progress" and old_status_not_started
+    if generate_plans:
+        await replace_pending_review_plans(db, [progress], now)
+    await record_attempts(db, [problem_id], ATTEMPT_UPDATE, now)
     await db.commit()
-    await db.refresh(progress)
     
-    # 如果状态变为进行中，生成复习计划
-    if progress_update.status == "in_progress" and old_status == "not_started":
-        await generate_review_plans(db, progress.id)
+    if generate_plans:
+        invalidate_review_totals()
+    # 失效题目列表缓存
+    get_problem_cache().invalidate_problems([problem_id])
+    publish_progress([progress])
     
-    # 获取复习统计
-    completed_reviews, total_reviews = await get_review_stats(db, progress.id)
-    
-    return build_progress_response(progress, completed_reviews, total_reviews)
+    return build_progress_response(progress)
 
 
 @router.get("/{problem_id}", response_model=ProgressResponse)
-async def get_progress(problem_id: int, db: AsyncSession = Depends(get_db)):
+async def get_progress(problem_id: int, db: AsyncSession = Depends(get_read_db)):
     """获取题目进度"""
     result = await db.execute(
         select(Progress).where(Progress.problem_id == problem_id)
@@ -149,7 +201,4 @@ async def get_progress(problem_id: int, db: AsyncSession = Depends(get_db)):
     if not progress:
         raise HTTPException(status_code=404, detail="进度记录不存在")
     
-    # 获取复习统计
-    completed_reviews, total_reviews = await get_review_stats(db, progress.id)
-    
-    return build_progress_response(progress, completed_reviews, total_reviews)
+    return build_progress_response(progress)
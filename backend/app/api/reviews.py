@@ -1,145 +1,165 @@
 """复习 API"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from datetime import datetime
+from sqlalchemy import or_, and_
 
-from app.core.database import get_db
-from app.models import ReviewPlan, Progress, Problem
-from app.schemas.review import ReviewPlanResponse, TodayReviewResponse, ProblemInReview
-from app.services.review_service import get_today_reviews, complete_review
+from app.core.database import get_db, get_read_db
+from app.core.responses import FastJSONResponse
+from app.models import ReviewPlan
+from app.schemas.review import (
+    ReviewPlanResponse, ReviewPlanListResponse, TodayReviewResponse, ReviewQueueCheckResponse,
+    ReviewBatchComplete, ReviewBatchResponse,
+)
+from app.services.review_service import (
+    get_today_reviews, complete_review, complete_reviews, count_review_plans, review_feed_query,
+)
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.problem_cache import get_problem_cache
+from app.services.review_queue import get_review_queue, queue_enabled
+from app.services.event_bus import get_event_bus, publish_progress
 
 router = APIRouter()
 
 
+def build_review_response(row) -> dict:
+    """由复习计划扁平查询行构建与 ReviewPlanResponse 结构一致的 dict"""
+    problem_data = None
+    if row.problem_id is not None:
+        problem_data = {
+            "id": row.problem_id,
+            "leetcode_id": row.leetcode_id,
+            "title": row.title,
+            "title_cn": row.title_cn,
+            "difficulty": row.difficulty,
+            "category": row.category,
+        }
+    
+    return {
+        "id": row.id,
+        "progress_id": row.progress_id,
+        "scheduled_date": row.scheduled_date,
+        "review_round": row.review_round,
+        "completed": row.completed,
+        "completed_at": row.completed_at,
+        "problem": problem_data,
+    }
+
+
+def publish_review_changes(rows, progress_updates: list[dict]) -> None:
+    """复习完成后：失效题目列表缓存，推送复习和进度变化事件"""
+    if not progress_updates:
+        return
+    get_problem_cache().invalidate_problems(update["problem_id"] for update in progress_updates)
+    get_event_bus().publish("review", {
+        "review_ids": [row.id for row in rows if row.completed],
+        "problem_ids": [update["problem_id"] for update in progress_updates],
+    })
+    publish_progress(progress_updates)
+
+
 @router.get("/today", response_model=TodayReviewResponse)
-async def get_today_review_list(db: AsyncSession = Depends(get_db)):
+async def get_today_review_list(db: AsyncSession = Depends(get_read_db)):
     """获取今日待复习、逾期和即将复习的题目"""
     reviews = await get_today_reviews(db)
     
-    async def build_response(plans: list[ReviewPlan]) -> list[ReviewPlanResponse]:
-        """构建复习计划响应"""
-        result = []
-        for plan in plans:
-            # 获取关联的进度和题目信息
-            progress_result = await db.execute(
-                select(Progress)
-                .options(selectinload(Progress.problem))
-                .where(Progress.id == plan.progress_id)
-            )
-            progress = progress_result.scalar_one_or_none()
-            
-            problem_data = None
-            if progress and progress.problem:
-                problem_data = ProblemInReview(
-                    id=progress.problem.id,
-                    leetcode_id=progress.problem.leetcode_id,
-                    title=progress.problem.title,
-                    title_cn=progress.problem.title_cn,
-                    difficulty=progress.problem.difficulty,
-                    category=progress.problem.category,
-                )
-            
-            result.append(ReviewPlanResponse(
-                id=plan.id,
-                progress_id=plan.progress_id,
-                scheduled_date=plan.scheduled_date,
-                review_round=plan.review_round,
-                completed=plan.completed,
-                completed_at=plan.completed_at,
-                problem=problem_data,
-            ))
-        
-        return result
+    return FastJSONResponse({
+        "today": [build_review_response(row) for row in reviews["today"]],
+        "overdue": [build_review_response(row) for row in reviews["overdue"]],
+        "upcoming": [build_review_response(row) for row in reviews["upcoming"]],
+    })
+
+
+@router.post("/queue/check", response_model=ReviewQueueCheckResponse)
+async def check_review_queue(db: AsyncSession = Depends(get_read_db)):
+    """逐条比对待复习队列与数据库，不一致时重建"""
+    if not queue_enabled():
+        raise HTTPException(status_code=400, detail="待复习队列未启用")
+    return await get_review_queue().check(db)
+
+
+@router.put("/complete", response_model=ReviewBatchResponse)
+async def mark_reviews_complete(batch: ReviewBatchComplete, db: AsyncSession = Depends(get_db)):
+    """
+    批量标记复习完成（单个事务，用于一次清空逾期复习）
+    - 与单个完成的规则相同，逐项返回结果
+    - 已完成的计划不重复计数
+    """
+    # 去重并保持顺序
+    review_ids = list(dict.fromkeys(batch.review_ids))
+    rows, progress_updates = await complete_reviews(db, review_ids, batch.quality)
+    publish_review_changes(rows, progress_updates)
+    
+    row_map = {row.id: row for row in rows}
+    items = []
+    for review_id in review_ids:
+        row = row_map.get(review_id)
+        if row is None:
+            items.append({"review_id": review_id, "success": False, "detail": "复习计划不存在", "review": None})
+        else:
+            items.append({"review_id": review_id, "success": True, "detail": None, "review": build_review_response(row)})
     
-    return TodayReviewResponse(
-        today=await build_response(reviews["today"]),
-        overdue=await build_response(reviews["overdue"]),
-        upcoming=await build_response(reviews["upcoming"]),
-    )
+    succeeded = len(row_map)
+    return FastJSONResponse({"succeeded": succeeded, "failed": len(items) - succeeded, "items": items})
 
 
 @router.put("/{review_id}/complete", response_model=ReviewPlanResponse)
-async def mark_review_complete(review_id: int, db: AsyncSession = Depends(get_db)):
+async def mark_review_complete(
+    review_id: int,
+    quality: int | None = Query(None, ge=0, le=5, description="复习质量评分 0-5（SM-2 调度器使用）"),
+    db: AsyncSession = Depends(get_db),
+):
     """标记复习完成"""
-    review_plan = await complete_review(db, review_id)
+    row, progress_updates = await complete_review(db, review_id, quality)
     
-    if not review_plan:
+    if row is None:
         raise HTTPException(status_code=404, detail="复习计划不存在")
     
-    # 获取关联的题目信息
-    progress_result = await db.execute(
-        select(Progress)
-        .options(selectinload(Progress.problem))
-        .where(Progress.id == review_plan.progress_id)
-    )
-    progress = progress_result.scalar_one_or_none()
-    
-    problem_data = None
-    if progress and progress.problem:
-        problem_data = ProblemInReview(
-            id=progress.problem.id,
-            leetcode_id=progress.problem.leetcode_id,
-            title=progress.problem.title,
-            title_cn=progress.problem.title_cn,
-            difficulty=progress.problem.difficulty,
-            category=progress.problem.category,
-        )
+    publish_review_changes([row], progress_updates)
     
-    return ReviewPlanResponse(
-        id=review_plan.id,
-        progress_id=review_plan.progress_id,
-        scheduled_date=review_plan.scheduled_date,
-        review_round=review_plan.review_round,
-        completed=review_plan.completed,
-        completed_at=review_plan.completed_at,
-        problem=problem_data,
-    )
-
-
-@router.get("", response_model=list[ReviewPlanResponse])
+    return FastJSONResponse(build_review_response(row))
+
+
+@router.get("", response_model=ReviewPlanListResponse)
 async def get_all_reviews(
     completed: bool | None = None,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = Query(None, description="游标分页：上一页返回的 next_cursor"),
+    limit: int = Query(100, ge=1, le=500, description="每页数量"),
+    include_total: bool = Query(False, description="是否返回筛选结果总数"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """获取所有复习计划"""
-    query = select(ReviewPlan).order_by(ReviewPlan.scheduled_date)
+    """获取复习计划（按 (scheduled_date, id) 游标分页）"""
+    query = review_feed_query().order_by(ReviewPlan.scheduled_date, ReviewPlan.id)
     
     if completed is not None:
         query = query.where(ReviewPlan.completed == completed)
     
-    result = await db.execute(query)
-    plans = result.scalars().all()
-    
-    response = []
-    for plan in plans:
-        # 获取关联的题目信息
-        progress_result = await db.execute(
-            select(Progress)
-            .options(selectinload(Progress.problem))
-            .where(Progress.id == plan.progress_id)
-        )
-        progress = progress_result.scalar_one_or_none()
-        
-        problem_data = None
-        if progress and progress.problem:
-            problem_data = ProblemInReview(
-                id=progress.problem.id,
-                leetcode_id=progress.problem.leetcode_id,
-                title=progress.problem.title,
-                title_cn=progress.problem.title_cn,
-                difficulty=progress.problem.difficulty,
-                category=progress.problem.category,
-            )
-        
-        response.append(ReviewPlanResponse(
-            id=plan.id,
-            progress_id=plan.progress_id,
-            scheduled_date=plan.scheduled_date,
-            review_round=plan.review_round,
-            completed=plan.completed,
-            completed_at=plan.completed_at,
-            problem=problem_data,
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+            last_date = datetime.fromisoformat(last_date)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        query = query.where(or_(
+            ReviewPlan.scheduled_date > last_date,
+            and_(ReviewPlan.scheduled_date == last_date, ReviewPlan.id > last_id),
         ))
     
-    return response
+    # 多取一行用于判断是否还有下一页
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.fetchall()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].scheduled_date, rows[-1].id])
+    
+    total = await count_review_plans(db, completed) if include_total else None
+    
+    return FastJSONResponse({
+        "total": total,
+        "items": [build_review_response(row) for row in rows],
+        "next_cursor": next_cursor,
+    })
@@ -0,0 +1,41 @@
+"""搜索 API"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.database import get_read_db
+from app.models import Problem
+from app.schemas.search import SearchResponse, SearchHit, ProblemInSearch
+from app.services.search_service import search
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchResponse)
+async def search_problems_and_notes(
+    q: str = Query(..., min_length=1, description="搜索关键词（题目标题/笔记内容）"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """全文搜索题目和笔记，返回按相关度排序的高亮结果"""
+    hits = await search(db, q, limit)
+    
+    # 批量查询命中的题目信息
+    problem_ids = {hit["problem_id"] for hit in hits}
+    problems = {}
+    if problem_ids:
+        result = await db.execute(select(Problem).where(Problem.id.in_(problem_ids)))
+        problems = {problem.id: problem for problem in result.scalars().all()}
+    
+    items = [
+        SearchHit(
+            source=hit["source"],
+            snippet=hit["snippet"],
+            score=hit["score"],
+            problem=ProblemInSearch.model_validate(problems[hit["problem_id"]]),
+        )
+        for hit in hits
+        if hit["problem_id"] in problems
+    ]
+    
+    return SearchResponse(items=items)
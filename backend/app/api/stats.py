@@ -1,100 +1,83 @@
 """统计 API"""
 from datetime import datetime, timedelta
-from collections import defaultdict
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models import Problem, Progress
-from app.schemas.stats import StatsResponse, DifficultyStats, StatusStats, CategoryStats, DailyStats
+from app.schemas.stats import (
+    StatsResponse, DifficultyStats, StatusStats, CategoryStats, DailyStats, HeatmapResponse, HeatmapDay,
+)
+from app.services.activity_service import get_daily_activity
 
 router = APIRouter()
 
 
+def count_if(condition):
+    """条件计数：SUM(CASE WHEN condition THEN 1 ELSE 0 END)"""
+    return func.sum(case((condition, 1), else_=0))
+
+
+def category_stats_query():
+    """按分类聚合题目数、完成数、难度分布、状态分布（problems 按分类索引顺序扫描，无需临时排序）"""
+    return (
+        select(
+            Problem.category,
+            func.count(Problem.id).label("total"),
+            count_if(Progress.status != "not_started").label("completed"),
+            count_if(Problem.difficulty == "Easy").label("easy"),
+            count_if(Problem.difficulty == "Medium").label("medium"),
+            count_if(Problem.difficulty == "Hard").label("hard"),
+            count_if(Progress.status == "not_started").label("not_started"),
+            count_if(Progress.status == "in_progress").label("in_progress"),
+            count_if(Progress.status == "mastered").label("mastered"),
+        )
+        .select_from(Problem)
+        .outerjoin(Progress, Progress.problem_id == Problem.id)
+        .group_by(Problem.category)
+        .order_by(Problem.category)
+    )
+
+
 @router.get("", response_model=StatsResponse)
-async def get_stats(db: AsyncSession = Depends(get_db)):
-    """获取统计数据"""
-    # 总题目数
-    total_result = await db.execute(select(func.count(Problem.id)))
-    total_problems = total_result.scalar()
+async def get_stats(db: AsyncSession = Depends(get_read_db)):
+    """获取统计数据（固定两次查询，与分类数量无关）"""
+    # 按分类一次性聚合：题目数、完成数、难度分布、状态分布
+    category_result = await db.execute(category_stats_query())
+    category_rows = category_result.fetchall()
     
-    # 已完成数量（状态不是 not_started 的）
-    completed_result = await db.execute(
-        select(func.count(Progress.id)).where(Progress.status != "not_started")
-    )
-    completed_count = completed_result.scalar()
+    # 由分类结果汇总全局统计
+    total_problems = sum(row.total for row in category_rows)
+    completed_count = sum(row.completed for row in category_rows)
     
     # 完成率
     completion_rate = round(completed_count / total_problems * 100, 1) if total_problems > 0 else 0
     
     # 难度统计
-    difficulty_stats = DifficultyStats()
-    for difficulty in ["Easy", "Medium", "Hard"]:
-        result = await db.execute(
-            select(func.count(Problem.id)).where(Problem.difficulty == difficulty)
-        )
-        count = result.scalar()
-        if difficulty == "Easy":
-            difficulty_stats.easy = count
-        elif difficulty == "Medium":
-            difficulty_stats.medium = count
-        else:
-            difficulty_stats.hard = count
-    
-    # 状态统计
-    status_stats = StatusStats()
-    for status in ["not_started", "in_progress", "mastered"]:
-        result = await db.execute(
-            select(func.count(Progress.id)).where(Progress.status == status)
-        )
-        count = result.scalar()
-        setattr(status_stats, status, count)
-    
-    # 分类统计
-    category_result = await db.execute(
-        select(Problem.category, func.count(Problem.id))
-        .group_by(Problem.category)
-        .order_by(Problem.category)
+    difficulty_stats = DifficultyStats(
+        easy=sum(row.easy for row in category_rows),
+        medium=sum(row.medium for row in category_rows),
+        hard=sum(row.hard for row in category_rows),
     )
-    category_data = category_result.fetchall()
-    
-    category_stats = []
-    for category, total in category_data:
-        # 计算该分类已完成数量
-        completed_in_category = await db.execute(
-            select(func.count(Progress.id))
-            .select_from(Progress)
-            .join(Problem)
-            .where(Problem.category == category)
-            .where(Progress.status != "not_started")
-        )
-        completed = completed_in_category.scalar()
-        category_stats.append(CategoryStats(
-            category=category,
-            total=total,
-            completed=completed,
-        ))
     
-    # 每日统计（最近30天）
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    daily_result = await db.execute(
-        select(Progress.last_attempt)
-        .where(Progress.last_attempt >= thirty_days_ago)
-        .where(Progress.last_attempt.isnot(None))
+    # 状态统计
+    status_stats = StatusStats(
+        not_started=sum(row.not_started for row in category_rows),
+        in_progress=sum(row.in_progress for row in category_rows),
+        mastered=sum(row.mastered for row in category_rows),
     )
-    daily_data = daily_result.fetchall()
     
-    # 按日期统计
-    date_counts = defaultdict(int)
-    for row in daily_data:
-        if row[0]:
-            date_str = row[0].strftime("%Y-%m-%d")
-            date_counts[date_str] += 1
+    # 分类统计
+    category_stats = [
+        CategoryStats(category=row.category, total=row.total, completed=row.completed)
+        for row in category_rows
+    ]
     
+    # 每日统计（最近30天），读取每日活动汇总
     daily_stats = [
-        DailyStats(date=date, count=count)
-        for date, count in sorted(date_counts.items())
+        DailyStats(date=activity.day.isoformat(), count=activity.total)
+        for activity in await get_daily_activity(db, days=30)
     ]
     
     return StatsResponse(
@@ -106,3 +89,27 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
         category_stats=category_stats,
         daily_stats=daily_stats,
     )
+
+
+@router.get("/heatmap", response_model=HeatmapResponse)
+async def get_heatmap(
+    days: int = Query(365, ge=1, le=3660, description="统计最近多少天（含今天）"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """做题活动热力图：按天汇总完成和复习次数，读取的行数只与天数有关"""
+    end = datetime.utcnow().date()
+    activities = await get_daily_activity(db, days=days, today=end)
+    return HeatmapResponse(
+        start=(end - timedelta(days=days - 1)).isoformat(),
+        end=end.isoformat(),
+        total=sum(activity.total for activity in activities),
+        days=[
+            HeatmapDay(
+                date=activity.day.isoformat(),
+                total=activity.total,
+                completes=activity.completes,
+                reviews=activity.reviews,
+            )
+            for activity in activities
+        ],
+    )
@@ -1,21 +1,44 @@
 """标签 API"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, insert, delete, true
 
-from app.core.database import get_db
-from app.models import Tag, ProblemTag
-from app.schemas.tag import TagCreate, TagResponse
+from app.core.database import get_db, get_read_db
+from app.models import Tag, ProblemTag, Problem
+from app.schemas.tag import TagCreate, TagResponse, TagBulkUpdate
+from app.services.problem_cache import get_problem_cache
+from app.services.event_bus import get_event_bus
 
 router = APIRouter()
 
 
+def publish_tag_links(action: str, tag_ids: list[int], problem_ids: list[int]) -> None:
+    """推送题目-标签关联变化事件（批量操作时为请求中的题目和标签）"""
+    get_event_bus().publish("tag", {"action": action, "tag_ids": tag_ids, "problem_ids": problem_ids})
+
+
 @router.get("", response_model=list[TagResponse])
-async def get_tags(db: AsyncSession = Depends(get_db)):
+async def get_tags(
+    with_counts: bool = Query(False, description="是否返回每个标签关联的题目数"),
+    db: AsyncSession = Depends(get_read_db),
+):
     """获取所有标签"""
-    result = await db.execute(select(Tag).order_by(Tag.name))
-    tags = result.scalars().all()
-    return tags
+    if not with_counts:
+        result = await db.execute(select(Tag).order_by(Tag.name))
+        tags = result.scalars().all()
+        return tags
+    
+    # 一次 GROUP BY 统计各标签的题目数
+    result = await db.execute(
+        select(Tag, func.count(ProblemTag.id))
+        .outerjoin(ProblemTag, ProblemTag.tag_id == Tag.id)
+        .group_by(Tag.id)
+        .order_by(Tag.name)
+    )
+    return [
+        TagResponse(id=tag.id, name=tag.name, color=tag.color, problem_count=count)
+        for tag, count in result.all()
+    ]
 
 
 @router.post("", response_model=TagResponse)
@@ -32,6 +55,7 @@ async def create_tag(tag_data: TagCreate, db: AsyncSession = Depends(get_db)):
     db.add(tag)
     await db.commit()
     await db.refresh(tag)
+    get_event_bus().publish("tag", {"action": "created", "tag_id": tag.id, "name": tag.name, "color": tag.color})
     
     return tag
 
@@ -47,10 +71,55 @@ async def delete_tag(tag_id: int, db: AsyncSession = Depends(get_db)):
     
     await db.delete(tag)
     await db.commit()
+    get_problem_cache().invalidate_tag(tag_id)
+    get_event_bus().publish("tag", {"action": "deleted", "tag_id": tag_id})
     
     return {"message": "删除成功"}
 
 
+@router.post("/bulk-attach")
+async def attach_tags_bulk(bulk: TagBulkUpdate, db: AsyncSession = Depends(get_db)):
+    """批量为题目添加标签（已存在的关联自动跳过）"""
+    # INSERT OR IGNORE ... SELECT：只关联存在的题目和标签，重复关联由唯一索引忽略
+    result = await db.execute(
+        insert(ProblemTag)
+        .prefix_with("OR IGNORE")
+        .from_select(
+            ["problem_id", "tag_id"],
+            select(Problem.id, Tag.id)
+            .join(Tag, true())
+            .where(Problem.id.in_(bulk.problem_ids), Tag.id.in_(bulk.tag_ids)),
+        )
+    )
+    await db.commit()
+    
+    for tag_id in bulk.tag_ids:
+        get_problem_cache().invalidate_tag(tag_id, bulk.problem_ids)
+    if result.rowcount:
+        publish_tag_links("attached", bulk.tag_ids, bulk.problem_ids)
+    
+    return {"message": "添加成功", "count": result.rowcount}
+
+
+@router.post("/bulk-detach")
+async def detach_tags_bulk(bulk: TagBulkUpdate, db: AsyncSession = Depends(get_db)):
+    """批量从题目移除标签"""
+    result = await db.execute(
+        delete(ProblemTag).where(
+            ProblemTag.problem_id.in_(bulk.problem_ids),
+            ProblemTag.tag_id.in_(bulk.tag_ids),
+        )
+    )
+    await db.commit()
+    
+    for tag_id in bulk.tag_ids:
+        get_problem_cache().invalidate_tag(tag_id, bulk.problem_ids)
+    if result.rowcount:
+        publish_tag_links("detached", bulk.tag_ids, bulk.problem_ids)
+    
+    return {"message": "移除成功", "count": result.rowcount}
+
+
 @router.post("/{problem_id}/tags/{tag_id}")
 async def add_tag_to_problem(
     problem_id: int,
@@ -72,6 +141,8 @@ async def add_tag_to_problem(
     problem_tag = ProblemTag(problem_id=problem_id, tag_id=tag_id)
     db.add(problem_tag)
     await db.commit()
+    get_problem_cache().invalidate_tag(tag_id, [problem_id])
+    publish_tag_links("attached", [tag_id], [problem_id])
     
     return {"message": "添加成功"}
 
@@ -93,5 +164,7 @@ async def remove_tag_from_problem(
     if problem_tag:
         await db.delete(problem_tag)
         await db.commit()
+        get_problem_cache().invalidate_tag(tag_id, [problem_id])
+        publish_tag_links("detached", [tag_id], [problem_id])
     
     return {"message": "移除成功"}
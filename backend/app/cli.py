@@ -0,0 +1,259 @@
+"""命令行工具
+
+用法:
+    python -m app.cli repair-review-counters   根据复习计划回填/修复进度上的复习计数
+    python -m app.cli migrate                  执行未应用的数据库迁移
+    python -m app.cli check-query-plans        检查热点查询是否命中索引（未命中时退出码为 1）
+    python -m app.cli compact-review-plans     切换到 lazy 调度模式后，每题只保留下一轮未完成的复习计划
+    python -m app.cli rebuild-daily-activity   由做题事件日志重建每日活动汇总
+    python -m app.cli export-backup <文件>     导出进度、复习计划、笔记和题目标签（JSON Lines）
+    python -m app.cli import-backup <文件>     导入备份文件
+
+多用户模式（MULTI_USER=true）下命令作用于用户的分片库：--user 指定用户，未指定时依次处理 SHARD_DIR 中的全部用户
+（migrate 同时迁移共享的目录库；export-backup / import-backup 必须指定 --user）
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from typing import AsyncIterator, NamedTuple, Optional
+
+from sqlalchemy import Connection, Executable
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.api.problems import problem_filter_query
+from app.api.stats import category_stats_query
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReadSessionLocal, engine, init_db
+from app.core.sharding import USER_ID_PATTERN, current_shard, shard_router
+from app.models import Problem
+from app.services.backup_service import stream_backup, import_backup
+from app.services.init_data import init_all_data
+from app.services.search_service import init_search_index
+from app.services.review_service import (
+    rebuild_review_counters, compact_pending_review_plans, is_lazy_mode,
+    pending_reviews_query, next_pending_plan_query, complete_plans_statement,
+)
+from app.services.activity_service import rebuild_daily_activity
+
+
+class Target(NamedTuple):
+    """命令作用的数据库：单用户模式为 DATABASE_URL，多用户模式为目录库或某个用户的分片库"""
+    label: str
+    engine: AsyncEngine
+    session_factory: async_sessionmaker
+    read_session_factory: async_sessionmaker
+    # 打开时执行的迁移版本号
+    migrations: list[int]
+    user_id: Optional[str] = None
+
+
+# 多用户模式下未指定 --user 时也作用于目录库的命令
+CATALOG_COMMANDS = {"migrate"}
+
+
+async def open_targets(command: str, user_id: Optional[str] = None) -> AsyncIterator[Target]:
+    """依次打开命令作用的数据库（分片库打开时执行迁移并补齐用户数据，处理期间设为当前分片）"""
+    applied = await init_db()
+    catalog = Target("DATABASE_URL", engine, AsyncSessionLocal, ReadSessionLocal, applied)
+    if not settings.MULTI_USER:
+        yield catalog
+        return
+
+    # 分片库的进度按目录库中的题目补齐，与应用启动时一样先初始化目录库
+    await init_search_index()
+    async with AsyncSessionLocal() as db:
+        await init_all_data(db)
+    if command in CATALOG_COMMANDS and user_id is None:
+        yield catalog._replace(label="目录库")
+    try:
+        for shard_user_id in [user_id] if user_id else shard_router.user_ids():
+            shard = await shard_router.get(shard_user_id)
+            token = current_shard.set(shard)
+            try:
+                yield Target(
+                    f"用户 {shard_user_id}", shard.engine, shard.session_factory, shard.read_session_factory,
+                    shard.migrations, shard_user_id,
+                )
+            finally:
+                current_shard.reset(token)
+    finally:
+        await shard_router.close()
+
+
+async def repair_review_counters(target: Target) -> None:
+    """回填/修复复习计数"""
+    async with target.session_factory() as db:
+        fixed = await rebuild_review_counters(db)
+    print(f"已修正 {fixed} 条进度记录的复习计数")
+
+
+async def compact_review_plans(target: Target) -> None:
+    """压缩未完成的复习计划（仅 lazy 模式）"""
+    if not is_lazy_mode():
+        print("当前为 eager 调度模式（REVIEW_MODE），无需压缩")
+        sys.exit(1)
+    async with target.session_factory() as db:
+        deleted = await compact_pending_review_plans(db)
+        fixed = await rebuild_review_counters(db)
+    print(f"已删除 {deleted} 条未完成的复习计划，修正 {fixed} 条进度记录的复习计数")
+
+
+async def rebuild_activity(target: Target) -> None:
+    """重建每日活动汇总"""
+    async with target.session_factory() as db:
+        days = await rebuild_daily_activity(db)
+    print(f"已重建 {days} 天的活动汇总")
+
+
+async def export_backup(target: Target, path: str) -> None:
+    """导出备份到文件"""
+    with open(path, "wb") as f:
+        async for chunk in stream_backup(target.read_session_factory):
+            f.write(chunk)
+    print(f"已导出到 {path}")
+
+
+async def read_chunks(path: str, size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """按块读取文件"""
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+async def import_backup_file(target: Target, path: str) -> None:
+    """从文件导入备份（新数据库先写入题目等种子数据；分片库打开时已补齐）"""
+    if target.user_id is None:
+        await init_search_index()
+    async with target.session_factory() as db:
+        if target.user_id is None:
+            await init_all_data(db)
+        result = await import_backup(db, read_chunks(path))
+    imported = ", ".join(f"{name} {count}" for name, count in result["imported"].items())
+    print(f"已导入: {imported}；跳过 {result['skipped']} 行")
+    for error in result["errors"]:
+        print(f"  第 {error['line']} 行: {error['detail']}")
+
+
+# 查询计划中表示按主键定位
+PRIMARY_KEY = "INTEGER PRIMARY KEY"
+
+
+class HotQuery(NamedTuple):
+    """热点查询：由应用实际使用的查询构建器生成，检查其查询计划命中的索引"""
+    name: str
+    statement: Executable
+    index: str
+    # 全表聚合只能整表扫描，要求按索引顺序扫描（不建临时排序）
+    full_scan: bool = False
+
+
+def hot_queries() -> list[HotQuery]:
+    now = datetime.utcnow()
+    page = lambda query: query.order_by(Problem.id).limit(101)  # noqa: E731
+    return [
+        HotQuery("今日/逾期/即将复习", pending_reviews_query(now), "ix_review_plans_completed_scheduled"),
+        HotQuery("完成复习：标记计划", complete_plans_statement([1, 2], now), PRIMARY_KEY),
+        HotQuery("完成复习：下一轮计划", next_pending_plan_query(1), "ix_review_plans_progress_pending"),
+        HotQuery("题目列表：难度", page(problem_filter_query(difficulty="Easy")), "ix_problems_difficulty"),
+        HotQuery("题目列表：分类", page(problem_filter_query(category="哈希")), "ix_problems_category"),
+        HotQuery("题目列表：状态", page(problem_filter_query(status="in_progress")), "ix_progress_status"),
+        HotQuery("题目列表：标签", page(problem_filter_query(tag_id=1)), "ix_problem_tags_tag_problem"),
+        HotQuery("统计：分类聚合", category_stats_query(), "ix_problems_category", full_scan=True),
+    ]
+
+
+def explain_query_plan(conn: Connection, statement: Executable) -> list[str]:
+    """编译语句并执行 EXPLAIN QUERY PLAN，返回计划各行的描述"""
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    args = tuple(
+        value.isoformat(" ") if isinstance(value, datetime) else value
+        for value in (params[name] for name in compiled.positiontup)
+    )
+    result = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", args)
+    return [row[-1] for row in result.fetchall()]
+
+
+def plan_problems(query: HotQuery, plan: list[str]) -> list[str]:
+    """检查查询计划，返回发现的问题（为空表示通过）"""
+    problems = []
+    uses = ("USING INTEGER PRIMARY KEY",) if query.index == PRIMARY_KEY else (
+        f"USING INDEX {query.index}", f"USING COVERING INDEX {query.index}",
+    )
+    if not any(use in line for line in plan for use in uses):
+        problems.append(f"未使用 {query.index}")
+    for line in plan:
+        if line.startswith("SCAN ") and not (query.full_scan and "INDEX" in line):
+            problems.append(f"全表扫描: {line}")
+        if query.full_scan and "TEMP B-TREE" in line:
+            problems.append(f"临时排序: {line}")
+    return problems
+
+
+async def migrate(target: Target) -> None:
+    """执行数据库迁移（打开数据库时已执行，这里输出结果）"""
+    print(f"已应用迁移: {target.migrations}" if target.migrations else "数据库已是最新版本")
+
+
+async def check_query_plans(target: Target) -> None:
+    """对热点查询执行 EXPLAIN QUERY PLAN，确认命中预期索引且没有全表扫描"""
+    failed = False
+    async with target.engine.connect() as conn:
+        for query in hot_queries():
+            plan = await conn.run_sync(explain_query_plan, query.statement)
+            problems = plan_problems(query, plan)
+            failed = failed or bool(problems)
+            print(f"[{'FAIL' if problems else 'OK'}] {query.name}: {' | '.join(plan)}")
+            for problem in problems:
+                print(f"    {problem}")
+    if failed:
+        sys.exit(1)
+
+
+COMMANDS = {
+    "repair-review-counters": repair_review_counters,
+    "migrate": migrate,
+    "check-query-plans": check_query_plans,
+    "compact-review-plans": compact_review_plans,
+    "rebuild-daily-activity": rebuild_activity,
+}
+
+# 需要文件路径参数的命令
+FILE_COMMANDS = {
+    "export-backup": export_backup,
+    "import-backup": import_backup_file,
+}
+
+
+async def run_command(command: str, user_id: Optional[str] = None, path: Optional[str] = None) -> None:
+    """对命令作用的每个数据库执行命令"""
+    async for target in open_targets(command, user_id):
+        if settings.MULTI_USER:
+            print(f"[{target.label}]")
+        if command in FILE_COMMANDS:
+            await FILE_COMMANDS[command](target, path)
+        else:
+            await COMMANDS[command](target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LeetCode Hot 100 管理工具命令行")
+    parser.add_argument("command", choices=[*COMMANDS, *FILE_COMMANDS], help="要执行的命令")
+    parser.add_argument("path", nargs="?", help="备份文件路径（export-backup / import-backup）")
+    parser.add_argument("--user", help="多用户模式下只处理该用户的分片库（不存在时创建）")
+    args = parser.parse_args()
+    if args.command in FILE_COMMANDS and not args.path:
+        parser.error(f"{args.command} 需要指定文件路径")
+    if args.user:
+        if not settings.MULTI_USER:
+            parser.error("--user 仅用于多用户模式（MULTI_USER=true）")
+        if not USER_ID_PATTERN.match(args.user):
+            parser.error("用户只能包含字母、数字、-、_，最长 64 位")
+    elif settings.MULTI_USER and args.command in FILE_COMMANDS:
+        parser.error(f"多用户模式下 {args.command} 需要通过 --user 指定用户")
+    asyncio.run(run_command(args.command, args.user, args.path))
+
+
+if __name__ == "__main__":
+    main()
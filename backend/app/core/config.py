@@ -13,6 +13,31 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str = "sqlite+aiosqlite:///./leetcode.db"
+    # 是否输出全部 SQL（与 DEBUG 解耦，逐条打印本身有明显开销）
+    DB_ECHO: bool = False
+    
+    # SQLite 连接参数（每个连接建立时通过 PRAGMA 设置）
+    DB_JOURNAL_MODE: str = "WAL"          # WAL 模式下读不阻塞写
+    DB_SYNCHRONOUS: str = "NORMAL"        # WAL 下 NORMAL 即可保证一致性
+    DB_CACHE_SIZE: int = -64000           # 负数表示 KiB，约 64MB 页缓存
+    DB_MMAP_SIZE: int = 268435456         # 256MB 内存映射
+    DB_BUSY_TIMEOUT: int = 5000           # 锁等待毫秒数
+    
+    # 连接池
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    
+    # 只读引擎：GET 接口使用独立连接池，不与写事务争用连接
+    DB_READ_ENGINE: bool = True
+    DB_READ_POOL_SIZE: int = 10
+    
+    # 多用户模式：题目目录共用 DATABASE_URL，每个用户的进度、复习计划、笔记和标签存放在独立的分片库
+    # 请求通过 X-User-Id 头（或 user 查询参数）指定用户
+    MULTI_USER: bool = False
+    SHARD_DIR: str = "./shards"
+    SHARD_MAX_OPEN: int = 64              # 同时打开的分片引擎数上限，超出时关闭最久未用的
+    SHARD_POOL_SIZE: int = 2              # 每个分片引擎的连接池大小
     
     # CORS 配置
     CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
@@ -20,6 +45,34 @@ class Settings(BaseSettings):
     # 艾宾浩斯复习间隔（天数）
     REVIEW_INTERVALS: list[int] = [1, 2, 4, 7, 15]
     
+    # 复习调度模式
+    # eager: 首次完成时一次生成全部轮次的复习计划（固定使用 REVIEW_INTERVALS）
+    # lazy:  每题只保留下一轮，完成后由调度器计算下一轮间隔
+    REVIEW_MODE: str = "eager"
+    # lazy 模式的调度器: ebbinghaus（REVIEW_INTERVALS）/ sm2（难度系数）
+    REVIEW_SCHEDULER: str = "ebbinghaus"
+    # 待复习队列：未完成计划常驻内存，今日复习直接切片
+    REVIEW_QUEUE_ENABLED: bool = True
+    
+    # 变更事件推送（/api/events）
+    EVENTS_HEARTBEAT_SECONDS: int = 15    # 空闲时发送心跳的间隔
+    EVENTS_QUEUE_SIZE: int = 256          # 每个订阅者缓存的事件数，溢出时通知客户端整体刷新
+    EVENTS_MAX_USER_BUSES: int = 256      # 多用户模式下保留的用户事件总线数上限，超出时淘汰最久未用且无订阅者的
+    
+    # 题目列表缓存条目上限
+    PROBLEM_CACHE_SIZE: int = 256
+    
+    # 请求统计（/api/metrics）；Server-Timing 响应头默认关闭
+    METRICS_ENABLED: bool = True
+    METRICS_SERVER_TIMING: bool = False
+    
+    # 慢查询日志：超过阈值（毫秒，0 表示关闭）的语句写入滚动 JSON 行日志
+    SLOW_QUERY_MS: int = 200
+    SLOW_QUERY_EXPLAIN: bool = True       # 后台附加 EXPLAIN QUERY PLAN
+    SLOW_QUERY_LOG_FILE: str = "./logs/slow_queries.log"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    
     class Config:
         env_file = ".env"
 
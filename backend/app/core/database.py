@@ -1,14 +1,84 @@
 """数据库配置"""
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.migrations import run_migrations
 
 
-# 创建异步引擎
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
+def search_bigrams(*values) -> str:
+    """
+    把文本切成相邻两个字符的词（两个字符都是字母、数字或汉字），空格分隔
+    供 notes_bigram 全文索引的触发器调用，使两个字的关键词（如「哈希」「链表」）也能走索引
+    """
+    grams = []
+    for value in values:
+        if not value:
+            continue
+        value = value.lower()
+        grams.extend(
+            value[i:i + 2] for i in range(len(value) - 1)
+            if value[i].isalnum() and value[i + 1].isalnum()
+        )
+    return " ".join(grams)
+
+
+def register_sql_functions(dbapi_connection) -> None:
+    """注册全文索引触发器用到的 SQL 函数（写笔记的连接都需要注册）"""
+    dbapi_connection.create_function("search_bigrams", -1, search_bigrams, deterministic=True)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only: bool = False, attach: dict[str, str] | None = None) -> None:
+    """在新建连接上应用 SQLite 调优参数，并附加其他库（{库名: 文件路径}）"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.DB_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.DB_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size={settings.DB_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size={settings.DB_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.DB_BUSY_TIMEOUT}")
+    for schema, path in (attach or {}).items():
+        cursor.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+    register_sql_functions(dbapi_connection)
+
+
+def create_engine_with_profile(
+    pool_size: int,
+    read_only: bool = False,
+    url: str | None = None,
+    attach: dict[str, str] | None = None,
+):
+    """按配置创建异步引擎（连接池大小、SQLite PRAGMA）；url 默认为 DATABASE_URL"""
+    # aiosqlite 默认使用 NullPool（每次新建连接并重新执行 PRAGMA），这里显式改为队列池
+    new_engine = create_async_engine(
+        url or settings.DATABASE_URL,
+        echo=settings.DB_ECHO,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    
+    if new_engine.dialect.name == "sqlite":
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            _apply_sqlite_pragmas(dbapi_connection, read_only=read_only, attach=attach)
+    
+    return new_engine
+
+
+# 创建异步引擎（读写）
+engine = create_engine_with_profile(settings.DB_POOL_SIZE)
+
+# 只读引擎（未启用时与读写引擎共用）
+read_engine = (
+    create_engine_with_profile(settings.DB_READ_POOL_SIZE, read_only=True)
+    if settings.DB_READ_ENGINE
+    else engine
 )
 
 # 创建异步会话工厂
@@ -18,6 +88,12 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 
 class Base(DeclarativeBase):
     """声明式基类"""
@@ -37,7 +113,21 @@ async def get_db():
             await session.close()
 
 
-async def init_db():
-    """初始化数据库表"""
+async def get_read_db():
+    """获取只读数据库会话的依赖注入（用于 GET 接口）"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def get_read_session_factory() -> async_sessionmaker:
+    """只读会话工厂的依赖注入（用于在流式响应内自行创建会话）"""
+    return ReadSessionLocal
+
+
+async def init_db() -> list[int]:
+    """初始化数据库表并执行版本迁移，返回本次应用的迁移版本号"""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        return await conn.run_sync(run_migrations, Base.metadata)
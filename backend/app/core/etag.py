@@ -0,0 +1,68 @@
+"""基于数据版本号的 ETag / 条件请求"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.database import read_engine
+from app.core.sharding import request_user_id, shard_router
+from app.services.data_version import read_version
+
+# 需要 ETag 的只读接口（GET）
+ETAG_PATH_PREFIXES = ("/api/problems", "/api/stats", "/api/tags", "/api/reviews", "/api/backup")
+
+
+def make_etag(version: int, user_id: Optional[str] = None) -> str:
+    """
+    由数据版本号生成 ETag
+    - 版本号保存在数据库中（app_meta.data_version），每个有写入的事务提交时递增，
+      其他进程（多 worker、命令行）的写入同样会使 ETag 变化
+    - 带上当前 UTC 日期：今日复习的逾期/今日划分、统计和热力图的时间窗口随日期变化，
+      跨过零点后即使没有写入也不再命中旧响应
+    - 多用户模式下带上用户，不同用户的响应不会互相命中
+    """
+    today = datetime.utcnow().strftime("%Y%m%d")
+    if user_id:
+        return f'"{user_id}-{version}-{today}"'
+    return f'"{version}-{today}"'
+
+
+async def read_data_version(user_id: Optional[str]) -> int:
+    """读取当前数据版本号（一次主键查询；多用户模式下读取用户的分片库）"""
+    engine = (await shard_router.get(user_id)).read_engine if settings.MULTI_USER else read_engine
+    async with engine.connect() as conn:
+        return await read_version(conn)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """判断 If-None-Match 是否命中当前 ETag"""
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def etag_middleware(request: Request, call_next):
+    """
+    条件请求中间件（GET 读接口）
+    - If-None-Match 命中时直接返回 304，只读取一次版本号，不执行接口的查询
+    - 否则附加 ETag
+    """
+    path = request.url.path
+    if request.method != "GET" or not path.startswith(ETAG_PATH_PREFIXES):
+        return await call_next(request)
+
+    user_id = request_user_id(request)
+    if settings.MULTI_USER and user_id is None:
+        # 未指定用户的请求由接口返回 400
+        return await call_next(request)
+
+    # 在查询前取版本号：期间发生的写入会让下次请求拿到新版本
+    etag = make_etag(await read_data_version(user_id), user_id)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+    return response
@@ -0,0 +1,176 @@
+"""请求级 SQL 计数与延迟直方图（Prometheus 文本格式）"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+# 请求延迟 / 数据库耗时的桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 单个请求执行的 SQL 语句数的桶
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# 不计入统计的路径
+EXCLUDED_PATHS = ("/api/metrics",)
+
+# 未匹配到路由（404 等）时使用的路由标签，避免任意路径撑爆标签基数
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestStats:
+    """当前请求的数据库统计"""
+    statements: int = 0
+    db_time: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """累计桶直方图，按标签分组"""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [各桶计数..., 总和, 总数]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, label_names: tuple) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = _format_labels(label_names, labels)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """按标签分组的累计计数器"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, value: float = 1) -> None:
+        self._series[labels] = self._series.get(labels, 0) + value
+
+    def render(self, label_names: tuple) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._series.items()):
+            number = f"{value:.6f}" if isinstance(value, float) else str(value)
+            lines.append(f"{self.name}{{{_format_labels(label_names, labels)}}} {number}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+ROUTE_LABELS = ("method", "route")
+STATUS_LABELS = ("method", "route", "status")
+
+requests_total = Counter("http_requests_total", "HTTP 请求数")
+request_duration = Histogram("http_request_duration_seconds", "HTTP 请求耗时（秒）", LATENCY_BUCKETS)
+request_statements = Histogram("db_statements_per_request", "单个请求执行的 SQL 语句数", STATEMENT_BUCKETS)
+request_db_time = Histogram("db_time_per_request_seconds", "单个请求的数据库耗时（秒）", LATENCY_BUCKETS)
+statements_total = Counter("db_statements_total", "SQL 语句总数")
+db_time_total = Counter("db_time_seconds_total", "数据库总耗时（秒）")
+
+
+def render_metrics() -> str:
+    """输出 Prometheus 文本格式"""
+    lines = []
+    lines += requests_total.render(STATUS_LABELS)
+    lines += request_duration.render(ROUTE_LABELS)
+    lines += request_statements.render(ROUTE_LABELS)
+    lines += request_db_time.render(ROUTE_LABELS)
+    lines += statements_total.render(ROUTE_LABELS)
+    lines += db_time_total.render(ROUTE_LABELS)
+    return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def instrument_engine(target_engine: AsyncEngine) -> None:
+    """为引擎注册语句计时钩子（重复调用不会重复注册）"""
+    sync_engine = target_engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_template(request: Request) -> str:
+    """取匹配到的路由模板（如 /api/problems/{problem_id}），而不是实际路径"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+async def metrics_middleware(request: Request, call_next):
+    """
+    请求统计中间件
+    - 记录每个路由模板的请求耗时、SQL 语句数和数据库耗时
+    - 开启 METRICS_SERVER_TIMING 时在响应头附加 Server-Timing
+    - 流式响应只统计到响应头发出为止
+    """
+    if request.url.path in EXCLUDED_PATHS:
+        return await call_next(request)
+
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _request_stats.reset(token)
+    elapsed = time.perf_counter() - started
+
+    labels = (request.method, _route_template(request))
+    requests_total.inc((*labels, response.status_code))
+    request_duration.observe(labels, elapsed)
+    request_statements.observe(labels, stats.statements)
+    request_db_time.observe(labels, stats.db_time)
+    statements_total.inc(labels, stats.statements)
+    db_time_total.inc(labels, stats.db_time)
+
+    if settings.METRICS_SERVER_TIMING:
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} queries", '
+            f"total;dur={elapsed * 1000:.2f}"
+        )
+    return response
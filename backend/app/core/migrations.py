@@ -0,0 +1,164 @@
+"""数据库版本迁移
+
+新库直接按模型建表并记为最新版本；已有的 leetcode.db 按版本号依次执行未应用的迁移。
+迁移函数需保持幂等（同一迁移重复执行不会出错），全部迁移在同一事务内完成。
+新增迁移时在 MIGRATIONS 末尾追加，版本号递增。
+多用户模式的分片库只包含部分表，迁移函数需跳过库中不存在的表。
+"""
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy import Connection, MetaData, inspect, text
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+def _add_review_counters(conn: Connection, metadata: MetaData) -> None:
+    """progress 增加复习计数列，并从 review_plans 回填"""
+    columns = {column["name"] for column in inspect(conn).get_columns("progress")}
+    for name in ("completed_reviews", "total_reviews"):
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE progress ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"))
+
+    conn.execute(text("""
+        UPDATE progress SET
+            completed_reviews = (
+                SELECT COUNT(*) FROM review_plans
+                WHERE review_plans.progress_id = progress.id AND review_plans.completed = 1
+            ),
+            total_reviews = (
+                SELECT COUNT(*) FROM review_plans WHERE review_plans.progress_id = progress.id
+            )
+    """))
+
+
+def _add_hot_query_indexes(conn: Connection, metadata: MetaData) -> None:
+    """为热点查询条件建立索引（problem_tags 先去重再建唯一索引）"""
+    conn.execute(text("""
+        DELETE FROM problem_tags
+        WHERE id NOT IN (SELECT MIN(id) FROM problem_tags GROUP BY problem_id, tag_id)
+    """))
+    inspector = inspect(conn)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        # 后续迁移才添加的列上的索引由对应迁移创建
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            if all(column.name in existing for column in index.columns):
+                index.create(conn, checkfirst=True)
+
+
+def _add_review_schedule(conn: Connection, metadata: MetaData) -> None:
+    """progress 增加复习调度状态列，并从未完成的复习计划回填"""
+    columns = {column["name"] for column in inspect(conn).get_columns("progress")}
+    for name, ddl in (
+        ("review_round", "INTEGER NOT NULL DEFAULT 0"),
+        ("next_due", "DATETIME"),
+        ("review_interval", "INTEGER NOT NULL DEFAULT 0"),
+        ("ease_factor", "FLOAT NOT NULL DEFAULT 0"),
+    ):
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE progress ADD COLUMN {name} {ddl}"))
+
+    conn.execute(text("""
+        UPDATE progress SET
+            next_due = (
+                SELECT MIN(scheduled_date) FROM review_plans
+                WHERE review_plans.progress_id = progress.id AND review_plans.completed = 0
+            ),
+            review_round = COALESCE((
+                SELECT MIN(review_round) FROM review_plans
+                WHERE review_plans.progress_id = progress.id AND review_plans.completed = 0
+            ), 0)
+    """))
+    for index in metadata.tables["progress"].indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _add_activity_log(conn: Connection, metadata: MetaData) -> None:
+    """
+    新增做题事件日志和每日汇总（表由 create_all 创建）
+    事件日志为空时由首次完成时间和已完成的复习计划回填，再重建每日汇总
+    """
+    if conn.execute(text("SELECT 1 FROM attempts LIMIT 1")).first() is None:
+        conn.execute(text("""
+            INSERT INTO attempts (problem_id, kind, created_at)
+            SELECT problem_id, 'complete', first_solved FROM progress
+            WHERE first_solved IS NOT NULL
+        """))
+        conn.execute(text("""
+            INSERT INTO attempts (problem_id, kind, created_at)
+            SELECT progress.problem_id, 'review', review_plans.completed_at
+            FROM review_plans JOIN progress ON progress.id = review_plans.progress_id
+            WHERE review_plans.completed = 1 AND review_plans.completed_at IS NOT NULL
+        """))
+    conn.execute(text("DELETE FROM daily_activity"))
+    conn.execute(text("""
+        INSERT INTO daily_activity (day, total, completes, reviews)
+        SELECT date(created_at), COUNT(*),
+               SUM(CASE WHEN kind != 'review' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN kind = 'review' THEN 1 ELSE 0 END)
+        FROM attempts
+        GROUP BY date(created_at)
+    """))
+
+
+def _rework_review_and_tag_indexes(conn: Connection, metadata: MetaData) -> None:
+    """
+    review_plans 按进度的索引追加 scheduled_date（取最早的未完成计划时不再选错索引），
+    problem_tags 增加按标签筛选的索引
+    """
+    inspector = inspect(conn)
+    if inspector.has_table("review_plans"):
+        conn.execute(text("DROP INDEX IF EXISTS ix_review_plans_progress_completed"))
+    for name in ("review_plans", "problem_tags"):
+        if inspector.has_table(name):
+            for index in metadata.tables[name].indexes:
+                index.create(conn, checkfirst=True)
+
+
+# (版本号, 说明, 迁移函数)
+MIGRATIONS: list[tuple[int, str, Callable[[Connection, MetaData], None]]] = [
+    (1, "progress 复习计数列", _add_review_counters),
+    (2, "热点查询索引与 problem_tags 唯一约束", _add_hot_query_indexes),
+    (3, "progress 复习调度状态（next_due）", _add_review_schedule),
+    (4, "做题事件日志与每日汇总", _add_activity_log),
+    (5, "复习计划与题目标签索引调整", _rework_review_and_tag_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _get_version(conn: Connection) -> int:
+    result = conn.execute(
+        text("SELECT value FROM app_meta WHERE key = :key"), {"key": SCHEMA_VERSION_KEY}
+    )
+    value = result.scalar_one_or_none()
+    return int(value) if value is not None else 0
+
+
+def _set_version(conn: Connection, version: int) -> None:
+    conn.execute(
+        text("INSERT OR REPLACE INTO app_meta (key, value) VALUES (:key, :value)"),
+        {"key": SCHEMA_VERSION_KEY, "value": str(version)},
+    )
+
+
+def run_migrations(conn: Connection, metadata: MetaData, tables: Optional[Sequence[str]] = None) -> list[int]:
+    """建表并执行未应用的迁移，返回本次执行的迁移版本号；tables 指定只建部分表（分片库）"""
+    is_new_database = not inspect(conn).has_table("progress")
+    metadata.create_all(conn, tables=[metadata.tables[name] for name in tables] if tables else None)
+
+    if is_new_database:
+        _set_version(conn, LATEST_VERSION)
+        return []
+
+    current = _get_version(conn)
+    applied = []
+    for version, _description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        migrate(conn, metadata)
+        _set_version(conn, version)
+        applied.append(version)
+    return applied
@@ -0,0 +1,37 @@
+"""快速 JSON 响应"""
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时回退到标准库
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """将由基础类型（dict/list/str/int/datetime 等）组成的数据一次性编码为 JSON"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    跳过 response_model 的逐项校验和 jsonable_encoder，直接编码普通 dict
+    路由上仍声明 response_model，OpenAPI 文档保持不变
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            # 已编码的内容（如缓存）直接输出
+            return content
+        return dumps(content)
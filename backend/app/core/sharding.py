@@ -0,0 +1,211 @@
+"""多用户模式：按用户分库
+
+- 共享目录库（DATABASE_URL）保存题目等读多写少的数据
+- 每个用户一个分片库（SHARD_DIR/<user_id>.db），保存进度、复习计划、笔记和标签；
+  不同用户的写事务落在不同文件上，互不争用写锁
+- 分片连接上以 catalog 名称附加目录库；SQLite 按 main、附加库的顺序解析未限定库名的表，
+  分片库中没有 problems 表，现有的联表查询无需修改
+- 打开的分片引擎按 LRU 最多保留 SHARD_MAX_OPEN 个
+- 启用后由 main.py 通过 dependency_overrides 把 get_db / get_read_db 换成按用户路由的版本
+"""
+import asyncio
+import re
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base, create_engine_with_profile
+from app.core.migrations import run_migrations
+from app.services.init_data import init_user_data
+from app.services.search_service import init_search_index, NOTE_SEARCH_INDEXES
+
+USER_HEADER = "X-User-Id"
+# EventSource 等无法设置请求头的场景使用查询参数
+USER_QUERY_PARAM = "user"
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+CATALOG_SCHEMA = "catalog"
+
+# 分片库中的表；其余表（problems）从附加的目录库读取
+SHARD_TABLES = (
+    "progress", "review_plans", "notes", "tags", "problem_tags", "attempts", "daily_activity", "app_meta",
+)
+
+T = TypeVar("T")
+
+
+@dataclass
+class Shard:
+    """一个用户的分片库：引擎、会话工厂，以及按用户隔离的进程内状态（待复习队列、缓存等）"""
+    user_id: str
+    engine: AsyncEngine
+    read_engine: AsyncEngine
+    session_factory: async_sessionmaker
+    read_session_factory: async_sessionmaker
+    state: dict[str, Any] = field(default_factory=dict)
+    # 打开时执行的迁移版本号
+    migrations: list[int] = field(default_factory=list)
+
+    async def dispose(self) -> None:
+        """关闭连接池（已借出的连接归还时关闭，进行中的请求不受影响）"""
+        if self.read_engine is not self.engine:
+            await self.read_engine.dispose()
+        await self.engine.dispose()
+
+
+# 当前请求路由到的分片（单用户模式下为 None）
+current_shard: ContextVar[Optional[Shard]] = ContextVar("current_shard", default=None)
+
+
+def shard_local(key: str, factory: Callable[[], T], default: T) -> T:
+    """当前用户分片上的进程内状态，首次访问时创建；单用户模式（或请求之外）返回 default"""
+    shard = current_shard.get()
+    if shard is None:
+        return default
+    value = shard.state.get(key)
+    if value is None:
+        value = shard.state[key] = factory()
+    return value
+
+
+def request_user_id(request: Request) -> Optional[str]:
+    """请求指定的用户（X-User-Id 头或 user 查询参数）；未指定或格式不合法时返回 None"""
+    user_id = request.headers.get(USER_HEADER) or request.query_params.get(USER_QUERY_PARAM)
+    if user_id and USER_ID_PATTERN.match(user_id):
+        return user_id
+    return None
+
+
+def require_user_id(request: Request) -> str:
+    """多用户模式下请求必须指定用户"""
+    user_id = request_user_id(request)
+    if user_id is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"多用户模式下需通过 {USER_HEADER} 请求头指定用户（字母、数字、-、_，最长 64 位）",
+        )
+    return user_id
+
+
+def catalog_path() -> str:
+    """目录库文件的绝对路径"""
+    return str(Path(make_url(settings.DATABASE_URL).database).resolve())
+
+
+class ShardRouter:
+    """按用户打开分片库，LRU 淘汰最久未用的引擎"""
+
+    def __init__(self, shard_dir: str, max_open: int = 64):
+        self.shard_dir = Path(shard_dir)
+        self.max_open = max_open
+        # 新建引擎时调用（请求统计、慢查询日志等钩子）
+        self.engine_hooks: list[Callable[[AsyncEngine], None]] = []
+        self._shards: OrderedDict[str, Shard] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+    def user_ids(self) -> list[str]:
+        """SHARD_DIR 中已有分片库的用户"""
+        if not self.shard_dir.is_dir():
+            return []
+        return sorted(path.stem for path in self.shard_dir.glob("*.db") if USER_ID_PATTERN.match(path.stem))
+
+    async def get(self, user_id: str) -> Shard:
+        """取用户的分片（未打开时打开并初始化）"""
+        shard = self._shards.get(user_id)
+        if shard is None:
+            async with self._lock:
+                shard = self._shards.get(user_id)
+                if shard is None:
+                    shard = await self._open(user_id)
+                    self._shards[user_id] = shard
+                    while len(self._shards) > self.max_open:
+                        _, evicted = self._shards.popitem(last=False)
+                        await evicted.dispose()
+        self._shards.move_to_end(user_id)
+        return shard
+
+    async def _open(self, user_id: str) -> Shard:
+        """创建分片引擎，建表/迁移并补齐用户数据"""
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        url = f"sqlite+aiosqlite:///{(self.shard_dir / f'{user_id}.db').resolve()}"
+        attach = {CATALOG_SCHEMA: catalog_path()}
+
+        engine = create_engine_with_profile(settings.SHARD_POOL_SIZE, url=url, attach=attach)
+        read_engine = (
+            create_engine_with_profile(settings.SHARD_POOL_SIZE, read_only=True, url=url, attach=attach)
+            if settings.DB_READ_ENGINE
+            else engine
+        )
+        for hook in self.engine_hooks:
+            hook(engine)
+            hook(read_engine)
+
+        shard = Shard(
+            user_id=user_id,
+            engine=engine,
+            read_engine=read_engine,
+            session_factory=async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+            read_session_factory=async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False),
+        )
+        try:
+            async with engine.begin() as conn:
+                shard.migrations = await conn.run_sync(run_migrations, Base.metadata, SHARD_TABLES)
+            await init_search_index(engine, indexes=NOTE_SEARCH_INDEXES)
+            async with shard.session_factory() as db:
+                await init_user_data(db)
+        except Exception:
+            await shard.dispose()
+            raise
+        return shard
+
+    async def close(self) -> None:
+        """关闭全部分片引擎"""
+        while self._shards:
+            _, shard = self._shards.popitem()
+            await shard.dispose()
+
+
+shard_router = ShardRouter(settings.SHARD_DIR, max_open=settings.SHARD_MAX_OPEN)
+
+
+async def get_shard_db(request: Request):
+    """按请求用户路由的数据库会话（多用户模式下替换 get_db）"""
+    shard = await shard_router.get(require_user_id(request))
+    current_shard.set(shard)
+    async with shard.session_factory() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+async def get_shard_read_db(request: Request):
+    """按请求用户路由的只读会话（多用户模式下替换 get_read_db）"""
+    shard = await shard_router.get(require_user_id(request))
+    current_shard.set(shard)
+    async with shard.read_session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_shard_read_session_factory(request: Request) -> async_sessionmaker:
+    """按请求用户路由的只读会话工厂（多用户模式下替换 get_read_session_factory）"""
+    shard = await shard_router.get(require_user_id(request))
+    current_shard.set(shard)
+    return shard.read_session_factory
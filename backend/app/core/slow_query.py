@@ -0,0 +1,171 @@
+"""慢查询日志
+
+超过阈值的 SQL 语句写入滚动的 JSON 行日志，记录耗时、脱敏后的参数、来源路由，
+并在后台执行 EXPLAIN QUERY PLAN 附上执行计划（同一语句的计划只查询一次）。
+"""
+import asyncio
+import logging
+import time
+import weakref
+from contextvars import ContextVar
+from datetime import date, datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.responses import dumps
+
+logger = logging.getLogger("app.slow_query")
+
+# 可以执行 EXPLAIN QUERY PLAN 的语句类型
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+# 已查询过的执行计划（按语句文本缓存）
+PLAN_CACHE_SIZE = 256
+
+# 批量语句日志中最多保留的参数组数
+MAX_LOGGED_ROWS = 10
+
+_current_request: ContextVar[Optional[Request]] = ContextVar("slow_query_request", default=None)
+_plan_cache: dict[str, list[str]] = {}
+_pending_tasks: set[asyncio.Task] = set()
+# 已注册钩子的引擎（弱引用：多用户模式下分片引擎关闭后释放）
+_instrumented: weakref.WeakSet = weakref.WeakSet()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {"ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")}
+        payload.update(getattr(record, "payload", {"message": record.getMessage()}))
+        return dumps(payload).decode("utf-8")
+
+
+def setup_slow_query_log() -> None:
+    """配置滚动日志文件（重复调用不会重复添加 handler）"""
+    if logger.handlers:
+        return
+    log_file = Path(settings.SLOW_QUERY_LOG_FILE)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(
+        log_file,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+        encoding="utf-8",
+    )
+    handler.setFormatter(JsonLineFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+
+
+def redact(value: Any) -> Any:
+    """参数脱敏：保留数字、布尔、空值和时间（便于分析执行计划），文本只保留类型和长度"""
+    if value is None or isinstance(value, (bool, int, float, datetime, date)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _route_info() -> dict:
+    """当前请求的方法和路由模板"""
+    request = _current_request.get()
+    if request is None:
+        return {"method": None, "route": None}
+    route = request.scope.get("route")
+    return {"method": request.method, "route": getattr(route, "path", None) or request.url.path}
+
+
+def _is_explain(statement: str) -> bool:
+    return statement.lstrip().upper().startswith("EXPLAIN")
+
+
+def _is_explainable(statement: str) -> bool:
+    return statement.lstrip().upper().startswith(EXPLAINABLE_PREFIXES)
+
+
+async def _explain_and_log(target_engine: AsyncEngine, statement: str, parameters, payload: dict) -> None:
+    """后台获取执行计划后写日志；获取失败时仍记录慢查询本身"""
+    plan = _plan_cache.get(statement)
+    if plan is None:
+        try:
+            async with target_engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                plan = [row.detail for row in result]
+        except Exception as exc:
+            payload["plan_error"] = str(exc)
+        else:
+            if len(_plan_cache) >= PLAN_CACHE_SIZE:
+                _plan_cache.pop(next(iter(_plan_cache)))
+            _plan_cache[statement] = plan
+    payload["plan"] = plan
+    logger.warning("slow query", extra={"payload": payload})
+
+
+def instrument_engine(target_engine: AsyncEngine) -> None:
+    """为引擎注册慢查询钩子"""
+    sync_engine = target_engine.sync_engine
+    if sync_engine in _instrumented:
+        return
+    _instrumented.add(sync_engine)
+    explain = settings.SLOW_QUERY_EXPLAIN and sync_engine.dialect.name == "sqlite"
+    threshold = settings.SLOW_QUERY_MS / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["slow_query_start"].pop()
+        if duration < threshold or _is_explain(statement):
+            return
+
+        payload = {
+            "duration_ms": round(duration * 1000, 3),
+            **_route_info(),
+            "statement": statement,
+            "parameters": redact(parameters[:MAX_LOGGED_ROWS] if executemany else parameters),
+            "executemany": executemany,
+        }
+        if executemany:
+            payload["rows"] = len(parameters)
+        # 批量语句只解释第一组参数
+        plan_parameters = parameters[0] if executemany and parameters else parameters
+        if explain and _is_explainable(statement):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                task = loop.create_task(_explain_and_log(target_engine, statement, plan_parameters, payload))
+                _pending_tasks.add(task)
+                task.add_done_callback(_pending_tasks.discard)
+                return
+        logger.warning("slow query", extra={"payload": payload})
+
+
+async def wait_pending() -> None:
+    """等待后台执行计划查询完成（关闭引擎前调用）"""
+    if _pending_tasks:
+        await asyncio.gather(*_pending_tasks, return_exceptions=True)
+
+
+async def slow_query_middleware(request: Request, call_next):
+    """记录当前请求，供慢查询日志标注来源路由"""
+    token = _current_request.set(request)
+    try:
+        return await call_next(request)
+    finally:
+        _current_request.reset(token)
@@ -7,8 +7,18 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from app.core.config import settings
-from app.core.database import init_db
-from app.api import problems, progress, notes, tags, reviews, stats
+from app.core.database import (
+    init_db, AsyncSessionLocal, ReadSessionLocal, engine, read_engine,
+    get_db, get_read_db, get_read_session_factory,
+)
+from app.core.sharding import shard_router, get_shard_db, get_shard_read_db, get_shard_read_session_factory
+from app.core.etag import etag_middleware
+from app.core.metrics import instrument_engine, metrics_middleware
+from app.core import slow_query
+from app.api import problems, progress, notes, tags, reviews, stats, search, export, metrics, events, backup
+from app.services.init_data import init_all_data
+from app.services.search_service import init_search_index
+from app.services.review_queue import review_queue, queue_enabled
 
 # 前端静态文件目录
 STATIC_DIR = Path(__file__).parent.parent.parent / "static"
@@ -19,8 +29,20 @@ async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时初始化数据库
     await init_db()
+    await init_search_index()
+    # 写入种子数据（按版本标记，仅首次或数据版本升级时执行）
+    async with AsyncSessionLocal() as db:
+        await init_all_data(db)
+    # 加载待复习队列（多用户模式下各用户的队列在首次读取时加载）
+    if queue_enabled() and not settings.MULTI_USER:
+        async with ReadSessionLocal() as db:
+            await review_queue.rebuild(db)
     yield
     # 关闭时清理资源
+    await slow_query.wait_pending()
+    await shard_router.close()
+    await read_engine.dispose()
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -38,6 +60,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 条件请求（ETag / 304）
+app.middleware("http")(etag_middleware)
+
+# 慢查询日志（在请求统计之前注册，由请求统计包裹）
+if settings.SLOW_QUERY_MS > 0:
+    slow_query.setup_slow_query_log()
+    slow_query.instrument_engine(engine)
+    slow_query.instrument_engine(read_engine)
+    shard_router.engine_hooks.append(slow_query.instrument_engine)
+    app.middleware("http")(slow_query.slow_query_middleware)
+
+# 请求统计（Starlette 按注册的相反顺序包裹中间件，最后注册即最外层：304 也计入，延迟包含慢查询日志和 ETag 处理）
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(read_engine)
+    shard_router.engine_hooks.append(instrument_engine)
+    app.middleware("http")(metrics_middleware)
+
+# 多用户模式：数据库会话按请求中的用户路由到各自的分片库
+if settings.MULTI_USER:
+    app.dependency_overrides[get_db] = get_shard_db
+    app.dependency_overrides[get_read_db] = get_shard_read_db
+    app.dependency_overrides[get_read_session_factory] = get_shard_read_session_factory
+
 # 注册路由
 app.include_router(problems.router, prefix="/api/problems", tags=["题目"])
 app.include_router(progress.router, prefix="/api/progress", tags=["进度"])
@@ -45,6 +91,11 @@ app.include_router(notes.router, prefix="/api/notes", tags=["笔记"])
 app.include_router(tags.router, prefix="/api/tags", tags=["标签"])
 app.include_router(reviews.router, prefix="/api/reviews", tags=["复习"])
 app.include_router(stats.router, prefix="/api/stats", tags=["统计"])
+app.include_router(search.router, prefix="/api/search", tags=["搜索"])
+app.include_router(export.router, prefix="/api/export", tags=["导出"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["监控"])
+app.include_router(events.router, prefix="/api/events", tags=["事件"])
+app.include_router(backup.router, prefix="/api/backup", tags=["备份"])
 
 
 @app.get("/api")
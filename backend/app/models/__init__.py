@@ -4,5 +4,7 @@ from app.models.progress import Progress
 from app.models.note import Note
 from app.models.tag import Tag, ProblemTag
 from app.models.review import ReviewPlan
+from app.models.meta import AppMeta
+from app.models.activity import Attempt, DailyActivity
 
-__all__ = ["Problem", "Progress", "Note", "Tag", "ProblemTag", "ReviewPlan"]
+__all__ = ["Problem", "Progress", "Note", "Tag", "ProblemTag", "ReviewPlan", "AppMeta", "Attempt", "DailyActivity"]
@@ -0,0 +1,38 @@
+"""做题活动模型"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+
+from app.core.database import Base
+
+
+class Attempt(Base):
+    """做题/复习事件（只追加，不修改）"""
+    
+    __tablename__ = "attempts"
+    
+    id = Column(Integer, primary_key=True)
+    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False, index=True)
+    
+    # 事件类型: complete(一键完成) / update(手动更新进度) / review(完成复习)
+    kind = Column(String(20), nullable=False, comment="事件类型")
+    # 复习质量评分（仅 review，且调用方提供时）
+    quality = Column(Integer, nullable=True, comment="复习质量评分 0-5")
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<Attempt problem_id={self.problem_id} kind={self.kind}>"
+
+
+class DailyActivity(Base):
+    """每日活动汇总（随事件写入在同一事务内增量维护）"""
+    
+    __tablename__ = "daily_activity"
+    
+    day = Column(Date, primary_key=True, comment="日期（UTC）")
+    total = Column(Integer, default=0, server_default="0", nullable=False, comment="事件总数")
+    completes = Column(Integer, default=0, server_default="0", nullable=False, comment="完成次数（complete/update）")
+    reviews = Column(Integer, default=0, server_default="0", nullable=False, comment="复习次数")
+    
+    def __repr__(self):
+        return f"<DailyActivity {self.day} total={self.total}>"
@@ -0,0 +1,16 @@
+"""应用元数据模型"""
+from sqlalchemy import Column, String
+
+from app.core.database import Base
+
+
+class AppMeta(Base):
+    """键值形式的应用元数据（如数据版本标记）"""
+    
+    __tablename__ = "app_meta"
+    
+    key = Column(String(50), primary_key=True, comment="键")
+    value = Column(String(200), nullable=False, comment="值")
+    
+    def __repr__(self):
+        return f"<AppMeta {self.key}={self.value}>"
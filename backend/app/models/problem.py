@@ -14,8 +14,8 @@ class Problem(Base):
     leetcode_id = Column(Integer, unique=True, index=True, comment="LeetCode 题目编号")
     title = Column(String(200), nullable=False, comment="英文标题")
     title_cn = Column(String(200), nullable=False, comment="中文标题")
-    difficulty = Column(String(20), nullable=False, comment="难度: Easy/Medium/Hard")
-    category = Column(String(50), nullable=False, comment="题目分类")
+    difficulty = Column(String(20), nullable=False, index=True, comment="难度: Easy/Medium/Hard")
+    category = Column(String(50), nullable=False, index=True, comment="题目分类")
     url = Column(String(500), comment="LeetCode 链接")
     
     # 关联关系
@@ -1,6 +1,6 @@
 """进度模型"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -15,7 +15,7 @@ class Progress(Base):
     problem_id = Column(Integer, ForeignKey("problems.id"), unique=True, nullable=False)
     
     # 状态: not_started / in_progress / mastered
-    status = Column(String(20), default="not_started", comment="做题状态")
+    status = Column(String(20), default="not_started", index=True, comment="做题状态")
     
     # 尝试次数
     attempt_count = Column(Integer, default=0, comment="尝试次数")
@@ -23,6 +23,16 @@ class Progress(Base):
     # 掌握程度（已完成复习轮次）0-5
     mastery_level = Column(Integer, default=0, comment="掌握程度(复习轮次) 0-5")
     
+    # 复习计数（冗余字段，由复习服务在同一事务内维护）
+    completed_reviews = Column(Integer, default=0, server_default="0", nullable=False, comment="已完成复习轮次")
+    total_reviews = Column(Integer, default=0, server_default="0", nullable=False, comment="复习计划总轮次")
+    
+    # 复习调度状态：当前待复习轮次及到期时间（0 / NULL 表示没有待复习）
+    review_round = Column(Integer, default=0, server_default="0", nullable=False, comment="当前待复习轮次")
+    next_due = Column(DateTime, nullable=True, index=True, comment="下一轮复习时间")
+    review_interval = Column(Integer, default=0, server_default="0", nullable=False, comment="当前轮次间隔(天)")
+    ease_factor = Column(Float, default=0.0, server_default="0", nullable=False, comment="SM-2 难度系数")
+    
     # 时间记录
     first_solved = Column(DateTime, nullable=True, comment="首次完成时间")
     last_attempt = Column(DateTime, nullable=True, comment="最后尝试时间")
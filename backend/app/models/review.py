@@ -1,6 +1,6 @@
 """复习计划模型"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -10,6 +10,12 @@ class ReviewPlan(Base):
     """艾宾浩斯复习计划"""
     
     __tablename__ = "review_plans"
+    __table_args__ = (
+        # 今日/逾期/即将复习：completed = 0 AND scheduled_date 范围
+        Index("ix_review_plans_completed_scheduled", "completed", "scheduled_date"),
+        # 按进度查找未完成计划（重新生成计划、取最早的下一轮），含 scheduled_date 免排序
+        Index("ix_review_plans_progress_pending", "progress_id", "completed", "scheduled_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     progress_id = Column(Integer, ForeignKey("progress.id"), nullable=False)
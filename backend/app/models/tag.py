@@ -1,5 +1,5 @@
 """标签模型"""
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -25,6 +25,12 @@ class ProblemTag(Base):
     """题目-标签关联表"""
     
     __tablename__ = "problem_tags"
+    __table_args__ = (
+        # 同一题目不重复关联同一标签（SQLite 无法对已有表追加约束，使用唯一索引）
+        Index("uq_problem_tags_problem_tag", "problem_id", "tag_id", unique=True),
+        # 按标签筛选题目
+        Index("ix_problem_tags_tag_problem", "tag_id", "problem_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False)
@@ -1,14 +1,22 @@
 # Pydantic 数据模式
 from app.schemas.problem import ProblemBase, ProblemCreate, ProblemResponse, ProblemListResponse
-from app.schemas.progress import ProgressBase, ProgressUpdate, ProgressResponse
+from app.schemas.progress import ProgressBase, ProgressUpdate, ProgressResponse, ProgressBatchComplete, ProgressBatchResponse
 from app.schemas.note import NoteBase, NoteCreate, NoteUpdate, NoteResponse
-from app.schemas.tag import TagBase, TagCreate, TagResponse
-from app.schemas.review import ReviewPlanBase, ReviewPlanResponse, TodayReviewResponse
+from app.schemas.tag import TagBase, TagCreate, TagResponse, TagBulkUpdate
+from app.schemas.review import (
+    ReviewPlanBase, ReviewPlanResponse, ReviewPlanListResponse, TodayReviewResponse, ReviewQueueCheckResponse,
+    ReviewBatchComplete, ReviewBatchResponse,
+)
+from app.schemas.backup import (
+    ProgressRecord, ReviewPlanRecord, NoteRecord, ProblemTagRecord, BackupImportResponse,
+)
 
 __all__ = [
     "ProblemBase", "ProblemCreate", "ProblemResponse", "ProblemListResponse",
-    "ProgressBase", "ProgressUpdate", "ProgressResponse",
+    "ProgressBase", "ProgressUpdate", "ProgressResponse", "ProgressBatchComplete", "ProgressBatchResponse",
     "NoteBase", "NoteCreate", "NoteUpdate", "NoteResponse",
-    "TagBase", "TagCreate", "TagResponse",
-    "ReviewPlanBase", "ReviewPlanResponse", "TodayReviewResponse",
+    "TagBase", "TagCreate", "TagResponse", "TagBulkUpdate",
+    "ReviewPlanBase", "ReviewPlanResponse", "ReviewPlanListResponse", "TodayReviewResponse", "ReviewQueueCheckResponse",
+    "ReviewBatchComplete", "ReviewBatchResponse",
+    "ProgressRecord", "ReviewPlanRecord", "NoteRecord", "ProblemTagRecord", "BackupImportResponse",
 ]
@@ -0,0 +1,66 @@
+"""备份导入/导出数据模式
+
+备份文件为 JSON Lines，每行一条记录，type 字段区分记录类型；
+题目用 leetcode_id、标签用名称关联，不依赖数据库内部 ID，可在不同数据库之间迁移。
+"""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class ProgressRecord(BaseModel):
+    """进度记录（type=progress）"""
+    leetcode_id: int
+    status: str = Field(default="not_started", pattern="^(not_started|in_progress|mastered)$")
+    attempt_count: int = Field(default=0, ge=0)
+    mastery_level: int = Field(default=0, ge=0, le=5)
+    completed_reviews: int = Field(default=0, ge=0)
+    total_reviews: int = Field(default=0, ge=0)
+    review_round: int = Field(default=0, ge=0)
+    next_due: Optional[datetime] = None
+    review_interval: int = Field(default=0, ge=0)
+    ease_factor: float = Field(default=0.0, ge=0)
+    first_solved: Optional[datetime] = None
+    last_attempt: Optional[datetime] = None
+
+
+class ReviewPlanRecord(BaseModel):
+    """复习计划记录（type=review_plan）"""
+    leetcode_id: int
+    review_round: int = Field(ge=1)
+    scheduled_date: datetime
+    completed: bool = False
+    completed_at: Optional[datetime] = None
+
+
+class NoteRecord(BaseModel):
+    """笔记记录（type=note）"""
+    leetcode_id: int
+    approach: Optional[str] = None
+    code: Optional[str] = None
+    language: str = Field(default="python", max_length=20)
+    time_complexity: Optional[str] = Field(default=None, max_length=50)
+    space_complexity: Optional[str] = Field(default=None, max_length=50)
+    key_points: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class ProblemTagRecord(BaseModel):
+    """题目标签记录（type=problem_tag），标签不存在时按名称创建"""
+    leetcode_id: int
+    tag: str = Field(min_length=1, max_length=50)
+    color: str = Field(default="#409EFF", max_length=20)
+
+
+class BackupImportError(BaseModel):
+    """导入时被跳过的行"""
+    line: int
+    detail: str
+
+
+class BackupImportResponse(BaseModel):
+    """导入结果"""
+    imported: dict[str, int] = Field(description="按记录类型统计的导入行数")
+    skipped: int = Field(description="校验失败或题目不存在而跳过的行数")
+    errors: list[BackupImportError] = Field(description="跳过原因（最多保留前 100 条）")
@@ -57,5 +57,8 @@ class ProblemResponse(ProblemBase):
 
 class ProblemListResponse(BaseModel):
     """题目列表响应"""
-    total: int
+    # 仅在 include_total=true 时返回
+    total: Optional[int] = None
     items: list[ProblemResponse]
+    # 下一页游标，为空表示没有更多数据
+    next_cursor: Optional[str] = None
@@ -26,8 +26,31 @@ class ProgressResponse(ProgressBase):
     # 新增: 复习进度信息
     completed_reviews: int = Field(default=0, description="已完成复习轮次")
     total_reviews: int = Field(default=5, description="总复习轮次")
+    # 复习调度状态
+    review_round: int = Field(default=0, description="当前待复习轮次，0 表示没有待复习")
+    next_due: Optional[datetime] = Field(default=None, description="下一轮复习时间")
     # 标记是否首次完成（用于前端显示不同提示）
     is_first_complete: bool = Field(default=False, description="是否首次完成")
     
     class Config:
         from_attributes = True
+
+
+class ProgressBatchComplete(BaseModel):
+    """批量标记完成请求"""
+    problem_ids: list[int] = Field(min_length=1, max_length=1000, description="题目ID列表")
+
+
+class ProgressBatchItem(BaseModel):
+    """批量标记完成的单项结果"""
+    problem_id: int
+    success: bool
+    detail: Optional[str] = None
+    progress: Optional[ProgressResponse] = None
+
+
+class ProgressBatchResponse(BaseModel):
+    """批量标记完成响应"""
+    succeeded: int
+    failed: int
+    items: list[ProgressBatchItem]
@@ -1,7 +1,7 @@
 """复习计划数据模式"""
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ReviewPlanBase(BaseModel):
@@ -40,3 +40,44 @@ class TodayReviewResponse(BaseModel):
     today: list[ReviewPlanResponse]
     overdue: list[ReviewPlanResponse]
     upcoming: list[ReviewPlanResponse]
+
+
+class ReviewPlanListResponse(BaseModel):
+    """复习计划分页响应"""
+    # 仅在 include_total=true 时返回
+    total: Optional[int] = None
+    items: list[ReviewPlanResponse]
+    # 下一页游标，为空表示没有更多数据
+    next_cursor: Optional[str] = None
+
+
+class ReviewBatchComplete(BaseModel):
+    """批量标记复习完成请求"""
+    review_ids: list[int] = Field(min_length=1, max_length=1000, description="复习计划ID列表")
+    quality: Optional[int] = Field(default=None, ge=0, le=5, description="复习质量评分 0-5（SM-2 调度器使用）")
+
+
+class ReviewBatchItem(BaseModel):
+    """批量标记复习完成的单项结果"""
+    review_id: int
+    success: bool
+    detail: Optional[str] = None
+    review: Optional[ReviewPlanResponse] = None
+
+
+class ReviewBatchResponse(BaseModel):
+    """批量标记复习完成响应"""
+    succeeded: int
+    failed: int
+    items: list[ReviewBatchItem]
+
+
+class ReviewQueueCheckResponse(BaseModel):
+    """待复习队列一致性检查结果"""
+    consistent: bool
+    # 数据库中有、队列中缺失的计划数
+    missing: int
+    # 队列中有、数据库中已不存在（或已完成）的计划数
+    extra: int
+    # 检查（及必要的重建）后的队列大小
+    size: int
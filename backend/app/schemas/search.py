@@ -0,0 +1,28 @@
+"""搜索数据模式"""
+from pydantic import BaseModel, Field
+
+
+class ProblemInSearch(BaseModel):
+    """搜索结果中的题目信息"""
+    id: int
+    leetcode_id: int
+    title: str
+    title_cn: str
+    difficulty: str
+    category: str
+    
+    class Config:
+        from_attributes = True
+
+
+class SearchHit(BaseModel):
+    """搜索命中"""
+    source: str = Field(description="命中来源: problem(题目标题)/note(笔记)")
+    snippet: str = Field(description="高亮片段（HTML，内容已转义），命中部分以 <mark></mark> 包裹")
+    score: float = Field(description="相关度（bm25，越小越相关）")
+    problem: ProblemInSearch
+
+
+class SearchResponse(BaseModel):
+    """搜索响应"""
+    items: list[SearchHit]
@@ -29,6 +29,22 @@ class DailyStats(BaseModel):
     count: int
 
 
+class HeatmapDay(BaseModel):
+    """热力图中的一天"""
+    date: str
+    total: int
+    completes: int
+    reviews: int
+
+
+class HeatmapResponse(BaseModel):
+    """活动热力图（只包含有活动的日期）"""
+    start: str
+    end: str
+    total: int
+    days: list[HeatmapDay]
+
+
 class StatsResponse(BaseModel):
     """统计响应"""
     total_problems: int
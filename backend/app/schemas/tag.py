@@ -1,5 +1,6 @@
 """标签数据模式"""
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, Field
 
 
 class TagBase(BaseModel):
@@ -16,6 +17,14 @@ class TagCreate(TagBase):
 class TagResponse(TagBase):
     """标签响应"""
     id: int
+    # 使用该标签的题目数，仅在 with_counts=true 时返回
+    problem_count: Optional[int] = None
     
     class Config:
         from_attributes = True
+
+
+class TagBulkUpdate(BaseModel):
+    """批量添加/移除标签"""
+    problem_ids: list[int] = Field(min_length=1, max_length=1000, description="题目ID列表")
+    tag_ids: list[int] = Field(min_length=1, max_length=100, description="标签ID列表")
@@ -0,0 +1,94 @@
+"""做题活动服务：只追加的事件日志 + 每日汇总
+
+每次完成题目、手动更新进度或完成复习都会追加一条 attempts 事件，
+同一事务内累加 daily_activity 当天的计数；热力图只读取汇总表，行数与天数成正比。
+"""
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import select, insert, delete, func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Attempt, DailyActivity
+
+# 事件类型
+ATTEMPT_COMPLETE = "complete"
+ATTEMPT_UPDATE = "update"
+ATTEMPT_REVIEW = "review"
+
+
+async def record_attempts(
+    db: AsyncSession,
+    problem_ids: Iterable[int],
+    kind: str,
+    now: datetime,
+    quality: Optional[int] = None,
+) -> int:
+    """
+    追加做题事件并累加当日汇总（不提交事务，由调用方统一提交）
+    - 一次批量 INSERT 写入事件（同一题目可以出现多次）
+    - 一条 UPSERT 累加当天的计数
+    返回写入的事件数
+    """
+    rows = [
+        {"problem_id": problem_id, "kind": kind, "quality": quality, "created_at": now}
+        for problem_id in problem_ids
+    ]
+    if not rows:
+        return 0
+    await db.execute(insert(Attempt), rows)
+
+    count = len(rows)
+    is_review = kind == ATTEMPT_REVIEW
+    upsert = sqlite_insert(DailyActivity).values(
+        day=now.date(),
+        total=count,
+        completes=0 if is_review else count,
+        reviews=count if is_review else 0,
+    )
+    await db.execute(upsert.on_conflict_do_update(
+        index_elements=[DailyActivity.day],
+        set_={
+            "total": DailyActivity.total + upsert.excluded.total,
+            "completes": DailyActivity.completes + upsert.excluded.completes,
+            "reviews": DailyActivity.reviews + upsert.excluded.reviews,
+        },
+    ))
+    return count
+
+
+def _rollup_query():
+    """由事件日志按天聚合"""
+    day = func.date(Attempt.created_at)
+    return (
+        select(
+            day,
+            func.count(Attempt.id),
+            func.sum(case((Attempt.kind != ATTEMPT_REVIEW, 1), else_=0)),
+            func.sum(case((Attempt.kind == ATTEMPT_REVIEW, 1), else_=0)),
+        )
+        .group_by(day)
+    )
+
+
+async def rebuild_daily_activity(db: AsyncSession) -> int:
+    """由事件日志重建每日汇总（修复用），返回汇总的天数"""
+    await db.execute(delete(DailyActivity))
+    result = await db.execute(
+        insert(DailyActivity).from_select(["day", "total", "completes", "reviews"], _rollup_query())
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def get_daily_activity(db: AsyncSession, days: int, today: Optional[date] = None) -> list[DailyActivity]:
+    """最近 days 天（含今天）有活动的日期汇总，按日期升序；只按主键范围读取汇总表"""
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    result = await db.execute(
+        select(DailyActivity)
+        .where(DailyActivity.day >= start, DailyActivity.day <= today)
+        .order_by(DailyActivity.day)
+    )
+    return list(result.scalars().all())
@@ -0,0 +1,286 @@
+"""备份导入/导出服务（JSON Lines）
+
+导出：按 进度、复习计划、笔记、题目标签 的顺序流式输出，同一只读事务内用服务端游标分批读取
+导入：流式读取上传内容，逐行校验后按块（行数/字节数上限）写入，每块一个事务、每类记录一次 executemany，
+内存占用与文件大小无关
+- 进度：按题目 UPSERT
+- 复习计划、笔记：某题目在本次导入中第一次出现时先删除其已有数据再追加，重复导入同一文件结果不变
+  （每题只有一条笔记，同一题目后续的笔记行跳过并记录错误）
+- 题目标签：标签按名称补建，关联已存在时忽略
+"""
+import json
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Select, select, delete, insert, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.responses import dumps
+from app.models import Problem, Progress, ReviewPlan, Note, Tag, ProblemTag
+from app.schemas.backup import ProgressRecord, ReviewPlanRecord, NoteRecord, ProblemTagRecord
+from app.services.init_data import init_progress
+from app.services.review_queue import record_queue_changes
+from app.services.review_service import invalidate_review_totals
+
+# 记录类型（同时也是导入时的写入顺序）
+RECORD_TYPES: dict[str, type[BaseModel]] = {
+    "progress": ProgressRecord,
+    "review_plan": ReviewPlanRecord,
+    "note": NoteRecord,
+    "problem_tag": ProblemTagRecord,
+}
+
+# 导出时每批从游标读取的行数
+EXPORT_BATCH_SIZE = 1000
+
+# 导入时每个事务最多写入的行数 / 原始字节数（大笔记按字节数提前切块）
+IMPORT_CHUNK_ROWS = 5000
+IMPORT_CHUNK_BYTES = 8 * 1024 * 1024
+
+# 导入结果中最多保留的错误条数
+MAX_REPORTED_ERRORS = 100
+
+PROGRESS_FIELDS = [name for name in ProgressRecord.model_fields if name != "leetcode_id"]
+NOTE_FIELDS = [name for name in NoteRecord.model_fields if name != "leetcode_id"]
+
+
+def progress_backup_query() -> Select:
+    """做过的题目的进度（未开始且未尝试的进度与新建时相同，不导出）"""
+    return (
+        select(Problem.leetcode_id, *(getattr(Progress, name) for name in PROGRESS_FIELDS))
+        .select_from(Progress)
+        .join(Problem, Problem.id == Progress.problem_id)
+        .where(or_(Progress.status != "not_started", Progress.attempt_count > 0))
+        .order_by(Progress.id)
+    )
+
+
+def review_plan_backup_query() -> Select:
+    return (
+        select(
+            Problem.leetcode_id, ReviewPlan.review_round, ReviewPlan.scheduled_date,
+            ReviewPlan.completed, ReviewPlan.completed_at,
+        )
+        .select_from(ReviewPlan)
+        .join(Progress, Progress.id == ReviewPlan.progress_id)
+        .join(Problem, Problem.id == Progress.problem_id)
+        .order_by(ReviewPlan.id)
+    )
+
+
+def note_backup_query() -> Select:
+    return (
+        select(Problem.leetcode_id, *(getattr(Note, name) for name in NOTE_FIELDS))
+        .select_from(Note)
+        .join(Problem, Problem.id == Note.problem_id)
+        .order_by(Note.id)
+    )
+
+
+def problem_tag_backup_query() -> Select:
+    return (
+        select(Problem.leetcode_id, Tag.name.label("tag"), Tag.color)
+        .select_from(ProblemTag)
+        .join(Problem, Problem.id == ProblemTag.problem_id)
+        .join(Tag, Tag.id == ProblemTag.tag_id)
+        .order_by(ProblemTag.id)
+    )
+
+
+BACKUP_QUERIES = {
+    "progress": progress_backup_query,
+    "review_plan": review_plan_backup_query,
+    "note": note_backup_query,
+    "problem_tag": problem_tag_backup_query,
+}
+
+
+async def stream_backup(session_factory: async_sessionmaker) -> AsyncIterator[bytes]:
+    """流式导出备份（会话在生成器内部创建，全部记录来自同一快照）"""
+    async with session_factory() as db:
+        async with db.begin():
+            for record_type, build_query in BACKUP_QUERIES.items():
+                result = await db.stream(build_query().execution_options(yield_per=EXPORT_BATCH_SIZE))
+                columns = list(result.keys())
+                async for rows in result.partitions():
+                    yield b"".join(
+                        dumps({"type": record_type, **dict(zip(columns, row))}) + b"\n"
+                        for row in rows
+                    )
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """把任意切分的字节流还原为行"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+class BackupImporter:
+    """一次导入的状态：题目/进度/标签映射、已清空旧数据（已导入笔记）的题目、统计结果"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.problem_ids: dict[int, int] = {}
+        self.progress_ids: dict[int, int] = {}
+        self.tag_ids: dict[str, int] = {}
+        self.cleared_plans: set[int] = set()
+        self.cleared_notes: set[int] = set()
+        self.seen_notes: set[int] = set()
+        self.imported = {record_type: 0 for record_type in RECORD_TYPES}
+        self.skipped = 0
+        self.errors: list[dict] = []
+
+    async def prepare(self) -> None:
+        """补齐缺失的进度行并加载映射（映射大小与题目数成正比，与导入文件无关）"""
+        await init_progress(self.db)
+        result = await self.db.execute(
+            select(Problem.leetcode_id, Problem.id, Progress.id).join(Progress, Progress.problem_id == Problem.id)
+        )
+        for leetcode_id, problem_id, progress_id in result:
+            self.problem_ids[leetcode_id] = problem_id
+            self.progress_ids[problem_id] = progress_id
+        result = await self.db.execute(select(Tag.name, Tag.id))
+        self.tag_ids = {name: tag_id for name, tag_id in result}
+        await self.db.commit()
+
+    def skip(self, line_no: int, detail: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "detail": detail})
+
+    def parse(self, line_no: int, line: bytes) -> Optional[tuple[str, int, BaseModel]]:
+        """解析并校验一行，返回 (记录类型, 题目ID, 记录)；无效时记录原因并返回 None"""
+        try:
+            data = json.loads(line)
+        except ValueError:
+            self.skip(line_no, "不是合法的 JSON")
+            return None
+        if not isinstance(data, dict) or data.get("type") not in RECORD_TYPES:
+            self.skip(line_no, "未知的记录类型")
+            return None
+        record_type = data.pop("type")
+        try:
+            record = RECORD_TYPES[record_type].model_validate(data)
+        except ValidationError as exc:
+            self.skip(line_no, "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()
+            ))
+            return None
+        problem_id = self.problem_ids.get(record.leetcode_id)
+        if problem_id is None:
+            self.skip(line_no, f"题目 {record.leetcode_id} 不存在")
+            return None
+        if record_type == "note":
+            if problem_id in self.seen_notes:
+                self.skip(line_no, f"题目 {record.leetcode_id} 的笔记重复")
+                return None
+            self.seen_notes.add(problem_id)
+        return record_type, problem_id, record
+
+    async def write(self, chunk: list[tuple[str, int, BaseModel]]) -> None:
+        """在一个事务内写入一块记录，每类记录一次 executemany"""
+        grouped: dict[str, list[tuple[int, BaseModel]]] = {record_type: [] for record_type in RECORD_TYPES}
+        for record_type, problem_id, record in chunk:
+            grouped[record_type].append((problem_id, record))
+
+        if grouped["progress"]:
+            await self._write_progress(grouped["progress"])
+        if grouped["review_plan"]:
+            await self._write_review_plans(grouped["review_plan"])
+        if grouped["note"]:
+            await self._write_notes(grouped["note"])
+        if grouped["problem_tag"]:
+            await self._write_problem_tags(grouped["problem_tag"])
+        await self.db.commit()
+
+        for record_type, rows in grouped.items():
+            self.imported[record_type] += len(rows)
+
+    async def _write_progress(self, rows: list[tuple[int, ProgressRecord]]) -> None:
+        upsert = sqlite_insert(Progress)
+        await self.db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[Progress.problem_id],
+                set_={name: upsert.excluded[name] for name in PROGRESS_FIELDS},
+            ),
+            [{"problem_id": problem_id, **record.model_dump(include=set(PROGRESS_FIELDS))} for problem_id, record in rows],
+        )
+
+    async def _write_review_plans(self, rows: list[tuple[int, ReviewPlanRecord]]) -> None:
+        progress_ids = [self.progress_ids[problem_id] for problem_id, _ in rows]
+        new_ids = set(progress_ids) - self.cleared_plans
+        if new_ids:
+            await self.db.execute(delete(ReviewPlan).where(ReviewPlan.progress_id.in_(new_ids)))
+            self.cleared_plans |= new_ids
+        await self.db.execute(insert(ReviewPlan), [
+            {"progress_id": progress_id, **record.model_dump(exclude={"leetcode_id"})}
+            for progress_id, (_, record) in zip(progress_ids, rows)
+        ])
+        # 未完成计划整体变化，待复习队列按版本号重建
+        await record_queue_changes(self.db, ("reload",))
+
+    async def _write_notes(self, rows: list[tuple[int, NoteRecord]]) -> None:
+        new_ids = {problem_id for problem_id, _ in rows} - self.cleared_notes
+        if new_ids:
+            await self.db.execute(delete(Note).where(Note.problem_id.in_(new_ids)))
+            self.cleared_notes |= new_ids
+        await self.db.execute(insert(Note), [
+            # created_at / updated_at 为空时由模型默认值填充
+            {"problem_id": problem_id, **record.model_dump(include=set(NOTE_FIELDS), exclude_none=True)}
+            for problem_id, record in rows
+        ])
+
+    async def _write_problem_tags(self, rows: list[tuple[int, ProblemTagRecord]]) -> None:
+        missing = {record.tag: record.color for _, record in rows if record.tag not in self.tag_ids}
+        if missing:
+            await self.db.execute(
+                sqlite_insert(Tag).on_conflict_do_nothing(index_elements=[Tag.name]),
+                [{"name": name, "color": color} for name, color in missing.items()],
+            )
+            result = await self.db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing)))
+            self.tag_ids.update({name: tag_id for name, tag_id in result})
+        await self.db.execute(
+            sqlite_insert(ProblemTag).on_conflict_do_nothing(index_elements=[ProblemTag.problem_id, ProblemTag.tag_id]),
+            [{"problem_id": problem_id, "tag_id": self.tag_ids[record.tag]} for problem_id, record in rows],
+        )
+
+    def result(self) -> dict:
+        return {"imported": self.imported, "skipped": self.skipped, "errors": self.errors}
+
+
+async def import_backup(db: AsyncSession, chunks: AsyncIterator[bytes]) -> dict:
+    """
+    流式导入备份，返回 {imported: {类型: 行数}, skipped, errors}
+    已写入的块各自提交；中途失败时之前的块保留（重新导入同一文件可覆盖）
+    """
+    importer = BackupImporter(db)
+    await importer.prepare()
+
+    chunk: list[tuple[str, int, BaseModel]] = []
+    chunk_bytes = 0
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        item = importer.parse(line_no, line)
+        if item is None:
+            continue
+        chunk.append(item)
+        chunk_bytes += len(line)
+        if len(chunk) >= IMPORT_CHUNK_ROWS or chunk_bytes >= IMPORT_CHUNK_BYTES:
+            await importer.write(chunk)
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        await importer.write(chunk)
+
+    if importer.imported["review_plan"]:
+        invalidate_review_totals()
+    return importer.result()
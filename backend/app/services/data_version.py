@@ -0,0 +1,80 @@
+"""数据版本号（app_meta）
+
+- 每个有写入的事务在提交前（Session before_commit）于同一事务内递增 data_version，
+  ETag 和进程内缓存比对该版本号判断数据是否变化
+- 版本号保存在数据库中，其他进程（多 worker、命令行）经 ORM 会话的写入同样可见；
+  原生 SQL 文本（text()、迁移）的写入不会递增
+- 同一事务需要一起递增的其他版本号（待复习队列）通过 bump_on_commit 登记，与 data_version 合并为一条 UPSERT
+"""
+from typing import Optional
+
+from sqlalchemy import Integer, String, cast, event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.models import AppMeta
+
+DATA_VERSION_KEY = "data_version"
+
+# 记录在 Session.info 中的状态
+_WRITTEN_KEY = "data_written"
+_BUMP_KEYS_KEY = "bump_version_keys"
+_COMMITTED_KEY = "committed_versions"
+
+
+async def read_version(db, key: str = DATA_VERSION_KEY) -> int:
+    """读取数据库中的版本号（db 为会话或连接；从未递增时为 0）"""
+    result = await db.execute(select(AppMeta.value).where(AppMeta.key == key))
+    value = result.scalar_one_or_none()
+    return int(value) if value is not None else 0
+
+
+def bump_on_commit(db, key: str) -> None:
+    """登记本事务提交时一起递增的版本号（db 为会话）"""
+    db.info.setdefault(_BUMP_KEYS_KEY, set()).add(key)
+
+
+def committed_version(session: Session, key: str = DATA_VERSION_KEY) -> Optional[int]:
+    """本次提交递增后的版本号（在 after_commit 中读取；未递增时为 None）"""
+    return session.info.get(_COMMITTED_KEY, {}).get(key)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WRITTEN_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info[_WRITTEN_KEY] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session) -> None:
+    # 先写出待提交的 ORM 变更，再判断本事务是否有写入
+    session.flush()
+    keys = session.info.pop(_BUMP_KEYS_KEY, set())
+    if session.info.pop(_WRITTEN_KEY, False):
+        keys.add(DATA_VERSION_KEY)
+    session.info[_COMMITTED_KEY] = {}
+    if not keys:
+        return
+    upsert = sqlite_insert(AppMeta).values([{"key": key, "value": "1"} for key in sorted(keys)])
+    result = session.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[AppMeta.key],
+            set_={"value": cast(cast(AppMeta.value, Integer) + 1, String)},
+        )
+        .returning(AppMeta.key, AppMeta.value)
+    )
+    session.info[_COMMITTED_KEY] = {key: int(value) for key, value in result}
+    # 递增语句本身不算作下一个事务的写入
+    session.info.pop(_WRITTEN_KEY, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_versions(session: Session) -> None:
+    session.info.pop(_WRITTEN_KEY, None)
+    session.info.pop(_BUMP_KEYS_KEY, None)
+    session.info.pop(_COMMITTED_KEY, None)
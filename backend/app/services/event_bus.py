@@ -0,0 +1,153 @@
+"""进程内变更事件发布/订阅（供 SSE 推送）"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.core.sharding import current_shard
+
+# 客户端跟不上（队列已满）或重连时缺失的事件已被淘汰时，通知其整体刷新
+RESYNC_EVENT = "resync"
+
+
+@dataclass
+class Event:
+    """一条已编号的变更事件"""
+    id: int
+    type: str
+    data: dict
+
+    def encode(self) -> bytes:
+        """编码为 SSE 消息"""
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (self.id, self.type.encode(), dumps(self.data))
+
+
+class EventBus:
+    """
+    变更事件总线
+    - 每个订阅者一个有界队列，发布时 put_nowait，不阻塞写接口
+    - 订阅者队列满时清空并放入 resync 事件，由客户端整体刷新
+    - 保留最近的事件，客户端带 Last-Event-ID 重连时补发
+    """
+
+    def __init__(self, queue_size: int = 256, history_size: int = 1000):
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._history: deque[Event] = deque(maxlen=history_size)
+        self._next_id = 1
+        # 事件编号按进程启动时间起算，重启后旧的 Last-Event-ID 不会误命中
+        self._epoch = int(time.time() * 1000) << 20
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, data: dict[str, Any]) -> None:
+        """发布事件（写操作提交后调用）"""
+        event = Event(id=self._epoch + self._next_id, type=event_type, data=data)
+        self._next_id += 1
+        self._history.append(event)
+        for queue in self._subscribers:
+            self._offer(queue, event)
+
+    def _offer(self, queue: asyncio.Queue, event: Event) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(Event(id=event.id, type=RESYNC_EVENT, data={}))
+
+    def _replay(self, queue: asyncio.Queue, last_event_id: int) -> None:
+        """补发 last_event_id 之后的事件；已被淘汰或来自此前的总线（进程重启、总线被淘汰）时发送 resync"""
+        if last_event_id < self._epoch or (self._history and self._history[0].id > last_event_id + 1):
+            self._offer(queue, Event(id=self._epoch + self._next_id - 1, type=RESYNC_EVENT, data={}))
+            return
+        for event in self._history:
+            if event.id > last_event_id:
+                self._offer(queue, event)
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> AsyncIterator[Event]:
+        """订阅事件流；heartbeat 秒内没有事件时产出 None（用于发送心跳）"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if last_event_id is not None:
+            self._replay(queue, last_event_id)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._subscribers.discard(queue)
+
+
+event_bus = EventBus(queue_size=settings.EVENTS_QUEUE_SIZE)
+
+
+class UserEventBuses:
+    """
+    多用户模式下各用户的事件总线，LRU 最多保留 max_size 个
+    - 不随分片引擎淘汰；有订阅者的总线不淘汰，保证订阅中的连接继续收到事件（因此可能暂时超过上限）
+    - 被淘汰用户的客户端重连时 Last-Event-ID 早于新总线的编号，收到 resync 整体刷新
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._buses: OrderedDict[str, EventBus] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buses)
+
+    def get(self, user_id: str) -> EventBus:
+        bus = self._buses.get(user_id)
+        if bus is None:
+            bus = self._buses[user_id] = EventBus(queue_size=settings.EVENTS_QUEUE_SIZE)
+            self._evict()
+        self._buses.move_to_end(user_id)
+        return bus
+
+    def _evict(self) -> None:
+        """从最久未用的开始淘汰没有订阅者的总线，直到不超过上限"""
+        excess = len(self._buses) - self.max_size
+        if excess <= 0:
+            return
+        idle = [user_id for user_id, bus in self._buses.items() if bus.subscriber_count == 0]
+        for user_id in idle[:excess]:
+            del self._buses[user_id]
+
+
+_user_buses = UserEventBuses(max_size=settings.EVENTS_MAX_USER_BUSES)
+
+
+def get_event_bus(user_id: Optional[str] = None) -> EventBus:
+    """用户的事件总线；未指定时取当前请求的用户，单用户模式为全局总线"""
+    if user_id is None:
+        shard = current_shard.get()
+        user_id = shard.user_id if shard is not None else None
+    if user_id is None:
+        return event_bus
+    return _user_buses.get(user_id)
+
+
+# 进度变化事件包含的字段
+PROGRESS_EVENT_FIELDS = (
+    "problem_id", "status", "mastery_level", "attempt_count",
+    "completed_reviews", "total_reviews", "next_due",
+)
+
+
+def progress_event_data(progress) -> dict:
+    """由进度对象（ORM 对象或包含相同字段的行）构建进度变化事件"""
+    return {field: getattr(progress, field) for field in PROGRESS_EVENT_FIELDS}
+
+
+def publish_progress(progresses) -> None:
+    """发布一组进度变化（ORM 对象，或 progress_event_data 结构的 dict）"""
+    bus = get_event_bus()
+    for progress in progresses:
+        bus.publish("progress", progress if isinstance(progress, dict) else progress_event_data(progress))
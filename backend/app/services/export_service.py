@@ -0,0 +1,94 @@
+"""数据导出服务（流式 NDJSON / CSV）"""
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select, Select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.responses import dumps
+from app.models import Problem, Progress, ReviewPlan
+from app.services.review_service import review_feed_query
+
+# 每批从数据库游标读取并输出的行数
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def review_export_query() -> Select:
+    """复习计划导出查询"""
+    return review_feed_query().order_by(ReviewPlan.id)
+
+
+def progress_export_query() -> Select:
+    """进度导出查询"""
+    return (
+        select(
+            Progress.id,
+            Problem.id.label("problem_id"),
+            Problem.leetcode_id,
+            Problem.title,
+            Problem.title_cn,
+            Progress.status,
+            Progress.attempt_count,
+            Progress.mastery_level,
+            Progress.completed_reviews,
+            Progress.total_reviews,
+            Progress.first_solved,
+            Progress.last_attempt,
+        )
+        .select_from(Progress)
+        .join(Problem, Problem.id == Progress.problem_id)
+        .order_by(Progress.id)
+    )
+
+
+EXPORT_QUERIES = {
+    "reviews": review_export_query,
+    "progress": progress_export_query,
+}
+
+
+def _to_plain(value):
+    """将数据库值转为 CSV 单元格的基础类型"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_ndjson(columns: list[str], rows) -> bytes:
+    return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def _encode_csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([[_to_plain(value) for value in row] for row in rows])
+    return buffer.getvalue()
+
+
+async def stream_export(dataset: str, fmt: str, session_factory: async_sessionmaker) -> AsyncIterator[bytes]:
+    """
+    按批次流式导出数据
+    - 使用服务端游标（yield_per）分批读取，内存占用与数据量无关
+    - 会话在生成器内部创建，生命周期覆盖整个响应
+    """
+    query = EXPORT_QUERIES[dataset]().execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async with session_factory() as db:
+        result = await db.stream(query)
+        columns = list(result.keys())
+
+        if fmt == "csv":
+            # 带 BOM，方便 Excel 直接打开中文内容
+            yield ("\ufeff" + _encode_csv([columns])).encode()
+
+        async for rows in result.partitions():
+            if fmt == "csv":
+                yield _encode_csv(rows).encode()
+            else:
+                yield _encode_ndjson(columns, rows)
@@ -1,60 +1,88 @@
 """初始化数据服务"""
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, exists
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from app.models import Problem, Progress, Tag
+from app.models import Problem, Progress, Tag, AppMeta
 from app.data.hot100 import HOT_100_PROBLEMS, DEFAULT_TAGS, get_leetcode_url
 
+# 种子数据版本：修改 HOT_100_PROBLEMS / DEFAULT_TAGS 后递增，启动时自动补齐
+SEED_VERSION = "1"
+SEED_VERSION_KEY = "seed_version"
+
+
+async def get_seed_version(db: AsyncSession) -> str | None:
+    """读取已写入的种子数据版本"""
+    result = await db.execute(
+        select(AppMeta.value).where(AppMeta.key == SEED_VERSION_KEY)
+    )
+    return result.scalar_one_or_none()
+
 
 async def init_problems(db: AsyncSession) -> None:
-    """初始化 Hot 100 题目数据"""
-    # 检查是否已有数据
-    result = await db.execute(select(Problem).limit(1))
-    if result.scalar_one_or_none():
-        return  # 已有数据，跳过
-    
-    # 插入题目数据
-    for problem_data in HOT_100_PROBLEMS:
-        url = get_leetcode_url(problem_data["leetcode_id"], problem_data["title"])
-        problem = Problem(
-            leetcode_id=problem_data["leetcode_id"],
-            title=problem_data["title"],
-            title_cn=problem_data["title_cn"],
-            difficulty=problem_data["difficulty"],
-            category=problem_data["category"],
-            url=url,
+    """初始化 Hot 100 题目数据（批量插入，已存在的题目跳过）"""
+    rows = [
+        {
+            "leetcode_id": problem_data["leetcode_id"],
+            "title": problem_data["title"],
+            "title_cn": problem_data["title_cn"],
+            "difficulty": problem_data["difficulty"],
+            "category": problem_data["category"],
+            "url": get_leetcode_url(problem_data["leetcode_id"], problem_data["title"]),
+        }
+        for problem_data in HOT_100_PROBLEMS
+    ]
+    await db.execute(
+        sqlite_insert(Problem).on_conflict_do_nothing(index_elements=["leetcode_id"]),
+        rows,
+    )
+    await init_progress(db)
+
+
+async def init_progress(db: AsyncSession) -> None:
+    """为尚无进度记录的题目创建初始进度（INSERT ... SELECT）"""
+    await db.execute(
+        insert(Progress).from_select(
+            ["problem_id"],
+            select(Problem.id).where(~exists().where(Progress.problem_id == Problem.id)),
         )
-        db.add(problem)
-    
-    await db.commit()
-    
-    # 为每个题目创建初始进度记录
-    result = await db.execute(select(Problem))
-    problems = result.scalars().all()
-    
-    for problem in problems:
-        progress = Progress(problem_id=problem.id)
-        db.add(progress)
-    
-    await db.commit()
+    )
 
 
 async def init_tags(db: AsyncSession) -> None:
-    """初始化默认标签"""
-    # 检查是否已有标签
-    result = await db.execute(select(Tag).limit(1))
+    """初始化默认标签（仅在没有任何标签时插入，避免恢复用户已删除的标签）"""
+    result = await db.execute(select(Tag.id).limit(1))
     if result.scalar_one_or_none():
         return  # 已有数据，跳过
-    
-    # 插入默认标签
-    for tag_data in DEFAULT_TAGS:
-        tag = Tag(name=tag_data["name"], color=tag_data["color"])
-        db.add(tag)
-    
-    await db.commit()
+
+    await db.execute(
+        insert(Tag),
+        [{"name": tag_data["name"], "color": tag_data["color"]} for tag_data in DEFAULT_TAGS],
+    )
 
 
 async def init_all_data(db: AsyncSession) -> None:
-    """初始化所有数据"""
+    """
+    初始化所有数据（应用启动时执行一次）
+    - 种子版本一致时直接跳过
+    - 否则在同一事务内批量补齐题目、进度和标签，并写入版本标记
+    """
+    if await get_seed_version(db) == SEED_VERSION:
+        return
+
     await init_problems(db)
     await init_tags(db)
+    await db.merge(AppMeta(key=SEED_VERSION_KEY, value=SEED_VERSION))
+
+    await db.commit()
+
+
+async def init_user_data(db: AsyncSession) -> None:
+    """
+    初始化多用户模式下的用户分片库（每次打开分片时执行）
+    - 题目来自共享目录库，目录中新增的题目在此补齐进度
+    - 新分片写入默认标签
+    """
+    await init_progress(db)
+    await init_tags(db)
+    await db.commit()
@@ -0,0 +1,23 @@
+"""游标（keyset）分页工具"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(values: list) -> str:
+    """将最后一行的排序键编码为不透明游标"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """解码游标，格式非法时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("无效的分页游标") from e
+    if not isinstance(values, list):
+        raise ValueError("无效的分页游标")
+    return values
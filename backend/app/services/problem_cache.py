@@ -0,0 +1,161 @@
+"""题目列表缓存服务"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.core.sharding import shard_local
+from app.services.data_version import committed_version, read_version
+
+# 缓存对应的数据版本号未知（启动时、其他进程写入后）
+STALE = -1
+
+
+@dataclass
+class _CacheEntry:
+    """缓存条目：已编码的响应（或总数）+ 失效所需的依赖信息"""
+    value: bytes | int
+    status_filter: Optional[str]
+    tag_filter: Optional[int]
+    problem_ids: set[int] = field(default_factory=set)
+    tag_ids: set[int] = field(default_factory=set)
+
+
+class ProblemListCache:
+    """
+    题目列表的进程内读穿缓存
+    - 按筛选/排序/分页参数缓存已编码的列表响应（JSON bytes），命中时直接输出
+    - 按筛选参数缓存总数，供按需返回 total 的分页请求复用
+    - 写操作按题目/标签精确失效受影响的条目
+    - 每次失效都会递增版本号，查询期间发生写入时丢弃过期结果
+    - 读取前与数据库中的数据版本号比对，其他进程（多 worker、命令行）写入过时整体清空；
+      本进程的写事务提交后版本号连续递增，沿用已精确失效后的条目
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.version = 0
+        self.data_version = STALE
+        self._entries: OrderedDict[tuple, _CacheEntry] = OrderedDict()
+
+    @staticmethod
+    def make_key(**params) -> tuple:
+        """由查询参数生成缓存键"""
+        return tuple(sorted(params.items()))
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        """读取缓存，命中时刷新 LRU 顺序"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(
+        self,
+        key: tuple,
+        response: dict,
+        version: int,
+        status_filter: Optional[str] = None,
+        tag_filter: Optional[int] = None,
+    ) -> bytes:
+        """编码并写入缓存，返回编码结果；若查询开始后版本已变化则放弃写入"""
+        content = dumps(response)
+        if version != self.version:
+            return content
+        self._store(key, _CacheEntry(
+            value=content,
+            status_filter=status_filter,
+            tag_filter=tag_filter,
+            problem_ids={item["id"] for item in response["items"]},
+            tag_ids={tag["id"] for item in response["items"] for tag in item["tags"]},
+        ))
+        return content
+
+    def get_total(self, key: tuple) -> Optional[int]:
+        """读取缓存的总数"""
+        return self.get(("total", key))
+
+    def set_total(
+        self,
+        key: tuple,
+        total: int,
+        version: int,
+        status_filter: Optional[str] = None,
+        tag_filter: Optional[int] = None,
+    ) -> None:
+        """写入总数；只依赖筛选条件，由状态/标签筛选的失效规则覆盖"""
+        if version != self.version:
+            return
+        self._store(("total", key), _CacheEntry(
+            value=total,
+            status_filter=status_filter,
+            tag_filter=tag_filter,
+        ))
+
+    def _store(self, key: tuple, entry: _CacheEntry) -> None:
+        """写入条目并按 LRU 淘汰"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_problems(self, problem_ids: Iterable[int]) -> None:
+        """题目进度变化：失效包含这些题目的条目，以及按状态筛选的条目"""
+        ids = set(problem_ids)
+        self.version += 1
+        for key in [
+            key for key, entry in self._entries.items()
+            if entry.status_filter or entry.problem_ids & ids
+        ]:
+            del self._entries[key]
+
+    def invalidate_tag(self, tag_id: int, problem_ids: Iterable[int] = ()) -> None:
+        """标签变化：失效按该标签筛选、展示该标签或包含相关题目的条目"""
+        ids = set(problem_ids)
+        self.version += 1
+        for key in [
+            key for key, entry in self._entries.items()
+            if entry.tag_filter == tag_id or tag_id in entry.tag_ids or entry.problem_ids & ids
+        ]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """清空所有缓存"""
+        self.version += 1
+        self._entries.clear()
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """与数据库中的数据版本号比对（一次主键查询），不一致时清空"""
+        data_version = await read_version(db)
+        if data_version != self.data_version:
+            self.clear()
+            self.data_version = data_version
+
+    def advance(self, data_version: int) -> None:
+        """本进程的写事务提交后调用；版本号不连续（期间有其他进程写入）时标记为过期"""
+        self.data_version = data_version if self.data_version == data_version - 1 else STALE
+
+
+problem_list_cache = ProblemListCache(max_entries=settings.PROBLEM_CACHE_SIZE)
+
+
+def get_problem_cache() -> ProblemListCache:
+    """当前用户的题目列表缓存（单用户模式为全局缓存）"""
+    return shard_local(
+        "problem_cache",
+        lambda: ProblemListCache(max_entries=settings.PROBLEM_CACHE_SIZE),
+        problem_list_cache,
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _advance_committed_version(session: Session) -> None:
+    data_version = committed_version(session)
+    if data_version is not None:
+        get_problem_cache().advance(data_version)
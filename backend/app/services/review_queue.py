@@ -0,0 +1,215 @@
+"""待复习队列（进程内）
+
+未完成的复习计划按 (scheduled_date, id) 有序保存在内存中，今日/逾期/即将复习直接按时间切片，不再查询 review_plans。
+- 启动时整体加载；本进程的写操作在事务提交后（Session after_commit）增量应用
+- 每个写事务提交前在同一事务内递增 app_meta 中的队列版本号（见 data_version）；读取前比对版本号（一次主键查询），
+  发现其他进程（多 worker、命令行）写入过时整体重建
+- 多用户模式下每个用户分片各有一个队列（get_review_queue）
+"""
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sharding import shard_local
+from app.models import Problem, Progress, ReviewPlan
+from app.services.data_version import bump_on_commit, committed_version, read_version
+
+QUEUE_VERSION_KEY = "review_queue_version"
+
+# 记录在 Session.info 中、等待提交后应用的变更
+_PENDING_CHANGES_KEY = "review_queue_changes"
+_PENDING_QUEUE_KEY = "review_queue"
+
+# 版本号不连续（期间有其他进程写入）时置为该值，下次读取时重建
+STALE = -1
+
+
+class QueueEntry(NamedTuple):
+    """队列中的一条复习计划，字段与复习计划扁平查询行一致"""
+    id: int
+    progress_id: int
+    scheduled_date: datetime
+    review_round: int
+    completed: bool
+    completed_at: Optional[datetime]
+    problem_id: Optional[int]
+    leetcode_id: Optional[int]
+    title: Optional[str]
+    title_cn: Optional[str]
+    difficulty: Optional[str]
+    category: Optional[str]
+
+
+class ReviewDueQueue:
+    """按计划时间排序的未完成复习计划"""
+
+    def __init__(self):
+        self.version = STALE
+        self._keys: list[tuple[datetime, int]] = []
+        self._entries: dict[int, QueueEntry] = {}
+        self._by_progress: dict[int, set[int]] = {}
+        # 题目信息（题目数据只在启动时写入，随队列一起加载）
+        self._problems: dict[int, tuple] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def due_until(self, until: datetime) -> list[QueueEntry]:
+        """计划时间不晚于 until 的全部条目（按时间顺序），O(log n + k)"""
+        end = bisect_right(self._keys, (until, float("inf")))
+        return [self._entries[plan_id] for _, plan_id in self._keys[:end]]
+
+    def add(self, plan_id: int, progress_id: int, problem_id: Optional[int],
+            scheduled_date: datetime, review_round: int) -> None:
+        """加入一条未完成计划（已存在则替换）"""
+        self.remove(plan_id)
+        problem = self._problems.get(problem_id, (None,) * 6)
+        entry = QueueEntry(plan_id, progress_id, scheduled_date, review_round, False, None, *problem)
+        self._entries[plan_id] = entry
+        self._by_progress.setdefault(progress_id, set()).add(plan_id)
+        insort(self._keys, (scheduled_date, plan_id))
+
+    def remove(self, plan_id: int) -> None:
+        """移除一条计划（不存在时忽略）"""
+        entry = self._entries.pop(plan_id, None)
+        if entry is None:
+            return
+        key = (entry.scheduled_date, plan_id)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+        plan_ids = self._by_progress.get(entry.progress_id)
+        if plan_ids is not None:
+            plan_ids.discard(plan_id)
+            if not plan_ids:
+                del self._by_progress[entry.progress_id]
+
+    def remove_progress(self, progress_id: int) -> None:
+        """移除某个进度的全部未完成计划"""
+        for plan_id in list(self._by_progress.get(progress_id, ())):
+            self.remove(plan_id)
+
+    def apply(self, changes: list[tuple], version: Optional[int]) -> None:
+        """应用一个已提交事务的变更；版本号不连续时标记为过期"""
+        for op, *args in changes:
+            if op == "add":
+                self.add(*args)
+            elif op == "remove":
+                self.remove(*args)
+            elif op == "remove_progress":
+                self.remove_progress(*args)
+            elif op == "reload":
+                self.version = STALE
+                return
+        if version is not None:
+            self.version = version if self.version == version - 1 else STALE
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """从数据库整体加载（先读版本号再读数据，期间的写入会在下次比对时触发重建）"""
+        version = await read_queue_version(db)
+
+        problem_result = await db.execute(select(
+            Problem.id, Problem.id, Problem.leetcode_id, Problem.title,
+            Problem.title_cn, Problem.difficulty, Problem.category,
+        ))
+        problems = {row[0]: tuple(row[1:]) for row in problem_result}
+
+        plan_result = await db.execute(
+            select(
+                ReviewPlan.id,
+                ReviewPlan.progress_id,
+                ReviewPlan.scheduled_date,
+                ReviewPlan.review_round,
+                Progress.problem_id,
+            )
+            .outerjoin(Progress, Progress.id == ReviewPlan.progress_id)
+            .where(ReviewPlan.completed == False)
+            .order_by(ReviewPlan.scheduled_date, ReviewPlan.id)
+        )
+
+        keys, entries, by_progress = [], {}, {}
+        empty = (None,) * 6
+        for plan_id, progress_id, scheduled_date, review_round, problem_id in plan_result:
+            keys.append((scheduled_date, plan_id))
+            entries[plan_id] = QueueEntry(
+                plan_id, progress_id, scheduled_date, review_round, False, None,
+                *problems.get(problem_id, empty),
+            )
+            by_progress.setdefault(progress_id, set()).add(plan_id)
+
+        self._problems = problems
+        self._keys, self._entries, self._by_progress = keys, entries, by_progress
+        self.version = version
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """与数据库版本号比对，不一致时重建"""
+        if self.version == await read_queue_version(db):
+            return
+        async with self._lock:
+            if self.version != await read_queue_version(db):
+                await self.rebuild(db)
+
+    async def check(self, db: AsyncSession) -> dict:
+        """与数据库逐条比对，不一致时重建；返回比对结果"""
+        result = await db.execute(
+            select(ReviewPlan.id, ReviewPlan.scheduled_date).where(ReviewPlan.completed == False)
+        )
+        expected = {(scheduled_date, plan_id) for plan_id, scheduled_date in result}
+        actual = set(self._keys)
+        missing, extra = len(expected - actual), len(actual - expected)
+        consistent = not missing and not extra
+        if not consistent:
+            async with self._lock:
+                await self.rebuild(db)
+        return {"consistent": consistent, "missing": missing, "extra": extra, "size": len(self)}
+
+
+review_queue = ReviewDueQueue()
+
+
+def get_review_queue() -> ReviewDueQueue:
+    """当前用户的待复习队列（单用户模式为全局队列）"""
+    return shard_local("review_queue", ReviewDueQueue, review_queue)
+
+
+def queue_enabled() -> bool:
+    return settings.REVIEW_QUEUE_ENABLED
+
+
+async def read_queue_version(db: AsyncSession) -> int:
+    """读取数据库中的队列版本号"""
+    return await read_version(db, QUEUE_VERSION_KEY)
+
+
+async def record_queue_changes(db: AsyncSession, *changes: tuple) -> None:
+    """
+    记录本事务对未完成复习计划的变更，提交后应用到队列
+    版本号在提交前于同一事务内递增（与数据版本号合并为一条语句）
+    """
+    if not queue_enabled():
+        return
+    if _PENDING_QUEUE_KEY not in db.info:
+        bump_on_commit(db, QUEUE_VERSION_KEY)
+        db.info[_PENDING_QUEUE_KEY] = get_review_queue()
+    db.info.setdefault(_PENDING_CHANGES_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_CHANGES_KEY, [])
+    queue = session.info.pop(_PENDING_QUEUE_KEY, None)
+    if queue is not None:
+        queue.apply(changes, committed_version(session, QUEUE_VERSION_KEY))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_CHANGES_KEY, None)
+    session.info.pop(_PENDING_QUEUE_KEY, None)
@@ -0,0 +1,108 @@
+"""复习调度器
+
+按需调度（REVIEW_MODE=lazy）时，每道题只保留下一轮复习，完成一轮后由调度器计算下一轮的间隔。
+调度器只做纯计算，不访问数据库；新增算法时实现 ReviewScheduler 并注册到 SCHEDULERS。
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+
+# SM-2 默认的复习质量评分（0-5，4 = 稍有犹豫但回答正确）
+DEFAULT_QUALITY = 4
+
+
+@dataclass
+class ReviewStep:
+    """一轮复习的安排"""
+    review_round: int
+    interval_days: int
+    ease_factor: float
+
+
+class ReviewScheduler(ABC):
+    """调度器接口（未实现全部抽象方法的子类在实例化时即报错）"""
+
+    name = ""
+
+    def __init__(self, total_rounds: int):
+        # 完成的轮次达到该值即视为掌握，不再安排复习
+        self.total_rounds = total_rounds
+
+    @abstractmethod
+    def first_step(self) -> ReviewStep:
+        """首次完成题目后的第一轮复习"""
+
+    @abstractmethod
+    def next_step(self, completed: ReviewStep, quality: Optional[int] = None) -> Optional[ReviewStep]:
+        """完成 completed 这一轮后的下一轮；全部轮次完成时返回 None"""
+
+
+class EbbinghausScheduler(ReviewScheduler):
+    """艾宾浩斯固定间隔（REVIEW_INTERVALS）"""
+
+    name = "ebbinghaus"
+
+    def __init__(self, intervals: list[int]):
+        super().__init__(total_rounds=len(intervals))
+        self.intervals = intervals
+
+    def first_step(self) -> ReviewStep:
+        return ReviewStep(review_round=1, interval_days=self.intervals[0], ease_factor=0.0)
+
+    def next_step(self, completed: ReviewStep, quality: Optional[int] = None) -> Optional[ReviewStep]:
+        if completed.review_round >= self.total_rounds:
+            return None
+        return ReviewStep(
+            review_round=completed.review_round + 1,
+            interval_days=self.intervals[completed.review_round],
+            ease_factor=completed.ease_factor,
+        )
+
+
+class SM2Scheduler(ReviewScheduler):
+    """
+    SM-2 间隔算法
+    - 第 1 轮 1 天，第 2 轮 6 天，之后为上次间隔 × 难度系数
+    - 难度系数按复习质量（0-5）调整，下限 1.3
+    - 质量低于 3 视为遗忘，间隔回到 1 天（轮次仍计入掌握程度）
+    """
+
+    name = "sm2"
+    INITIAL_EASE = 2.5
+    MIN_EASE = 1.3
+
+    def first_step(self) -> ReviewStep:
+        return ReviewStep(review_round=1, interval_days=1, ease_factor=self.INITIAL_EASE)
+
+    def next_step(self, completed: ReviewStep, quality: Optional[int] = None) -> Optional[ReviewStep]:
+        if completed.review_round >= self.total_rounds:
+            return None
+        quality = DEFAULT_QUALITY if quality is None else quality
+        ease = completed.ease_factor or self.INITIAL_EASE
+        ease = max(self.MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+        if quality < 3:
+            interval = 1
+        elif completed.review_round == 1:
+            interval = 6
+        else:
+            interval = max(1, round(completed.interval_days * ease))
+        return ReviewStep(review_round=completed.review_round + 1, interval_days=interval, ease_factor=ease)
+
+
+SCHEDULERS: dict[str, type[ReviewScheduler]] = {
+    EbbinghausScheduler.name: EbbinghausScheduler,
+    SM2Scheduler.name: SM2Scheduler,
+}
+
+
+def get_scheduler() -> ReviewScheduler:
+    """按配置创建调度器（REVIEW_SCHEDULER）"""
+    name = settings.REVIEW_SCHEDULER
+    if name == EbbinghausScheduler.name:
+        return EbbinghausScheduler(settings.REVIEW_INTERVALS)
+    if name not in SCHEDULERS:
+        raise ValueError(f"未知的复习调度器: {name}")
+    return SCHEDULERS[name](total_rounds=len(settings.REVIEW_INTERVALS))
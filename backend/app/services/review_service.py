@@ -1,143 +1,483 @@
 """复习计划服务"""
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, func, update, or_, delete, insert, case
 
-from app.models import ReviewPlan, Progress
+from app.models import ReviewPlan, Progress, Problem
 from app.core.config import settings
+from app.services.review_scheduler import ReviewStep, get_scheduler
+from app.core.sharding import shard_local
+from app.services.review_queue import get_review_queue, queue_enabled, record_queue_changes
+from app.services.event_bus import progress_event_data
+from app.services.activity_service import record_attempts, ATTEMPT_REVIEW
 
+# 掌握程度上限（与 ProgressBase.mastery_level 的取值范围一致）
+MAX_MASTERY_LEVEL = 5
 
-async def generate_review_plans(db: AsyncSession, progress_id: int) -> None:
+
+class ReviewTotals:
+    """复习计划总数缓存（按 completed 筛选条件），复习计划变化时清空并递增版本"""
+
+    def __init__(self):
+        self.version = 0
+        self.totals: dict[bool | None, int] = {}
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self.totals.clear()
+
+
+_review_totals = ReviewTotals()
+
+
+def get_review_totals() -> ReviewTotals:
+    """当前用户的复习计划总数缓存（单用户模式为全局缓存）"""
+    return shard_local("review_totals", ReviewTotals, _review_totals)
+
+
+def invalidate_review_totals() -> None:
+    """清空复习计划总数缓存"""
+    get_review_totals().invalidate()
+
+
+async def count_review_plans(db: AsyncSession, completed: bool | None = None) -> int:
+    """统计复习计划总数（结果缓存，统计期间发生写入则不缓存）"""
+    cache = get_review_totals()
+    if completed in cache.totals:
+        return cache.totals[completed]
+    
+    version = cache.version
+    query = select(func.count(ReviewPlan.id))
+    if completed is not None:
+        query = query.where(ReviewPlan.completed == completed)
+    result = await db.execute(query)
+    total = result.scalar() or 0
+    
+    if version == cache.version:
+        cache.totals[completed] = total
+    return total
+
+
+def is_lazy_mode() -> bool:
+    """是否为按需调度模式（每题只保留下一轮复习）"""
+    return settings.REVIEW_MODE == "lazy"
+
+
+def total_review_rounds() -> int:
+    """复习总轮次：全部完成即视为掌握（lazy 模式以调度器为准）"""
+    if is_lazy_mode():
+        return get_scheduler().total_rounds
+    return len(settings.REVIEW_INTERVALS)
+
+
+def _apply_step(progress: Progress, step: ReviewStep | None, now: datetime) -> None:
+    """把调度结果写入进度上的复习状态"""
+    if step is None:
+        progress.review_round = 0
+        progress.next_due = None
+        return
+    progress.review_round = step.review_round
+    progress.review_interval = step.interval_days
+    progress.ease_factor = step.ease_factor
+    progress.next_due = now + timedelta(days=step.interval_days)
+
+
+async def replace_pending_review_plans(db: AsyncSession, progresses: list[Progress], now: datetime) -> int:
     """
-    为已完成的题目生成艾宾浩斯复习计划
-    复习间隔: 1天、2天、4天、7天、15天
+    批量重建复习计划（不提交事务，由调用方统一提交）
+    - 一条 DELETE 删除这些进度的全部未完成计划
+    - 一条多行 INSERT 写入新计划（eager 模式全部轮次，lazy 模式只有第一轮）
+    - 同步更新进度上的复习总轮次和调度状态
+    返回新插入的计划数
     """
-    # 删除该进度的所有未完成复习计划
-    existing_plans = await db.execute(
-        select(ReviewPlan).where(
-            and_(
-                ReviewPlan.progress_id == progress_id,
+    if not progresses:
+        return 0
+    
+    if is_lazy_mode():
+        scheduler = get_scheduler()
+        first_step = scheduler.first_step()
+        rounds = [(first_step.review_round, first_step.interval_days)]
+        total_rounds = scheduler.total_rounds
+    else:
+        first_step = ReviewStep(review_round=1, interval_days=settings.REVIEW_INTERVALS[0], ease_factor=0.0)
+        rounds = list(enumerate(settings.REVIEW_INTERVALS, start=1))
+        total_rounds = total_review_rounds()
+    
+    progress_ids = [progress.id for progress in progresses]
+    rows = [
+        {
+            "progress_id": progress_id,
+            "scheduled_date": now + timedelta(days=interval),
+            "review_round": round_num,
+            "completed": False,
+        }
+        for progress_id in progress_ids
+        for round_num, interval in rounds
+    ]
+    
+    # 进度上未提交的修改留到提交时与复习状态一起写入（只产生一条 UPDATE）
+    with db.no_autoflush:
+        await db.execute(
+            delete(ReviewPlan).where(
+                ReviewPlan.progress_id.in_(progress_ids),
                 ReviewPlan.completed == False
             )
         )
-    )
-    for plan in existing_plans.scalars().all():
-        await db.delete(plan)
-    
-    # 生成新的复习计划
-    now = datetime.utcnow()
-    for round_num, interval in enumerate(settings.REVIEW_INTERVALS, start=1):
-        scheduled_date = now + timedelta(days=interval)
-        review_plan = ReviewPlan(
-            progress_id=progress_id,
-            scheduled_date=scheduled_date,
-            review_round=round_num,
-            completed=False,
+        result = await db.execute(
+            insert(ReviewPlan).returning(
+                ReviewPlan.id, ReviewPlan.progress_id, ReviewPlan.scheduled_date, ReviewPlan.review_round
+            ),
+            rows,
+        )
+        
+        problem_ids = {progress.id: progress.problem_id for progress in progresses}
+        await record_queue_changes(
+            db,
+            *(("remove_progress", progress_id) for progress_id in progress_ids),
+            *(
+                ("add", row.id, row.progress_id, problem_ids[row.progress_id], row.scheduled_date, row.review_round)
+                for row in result
+            ),
         )
-        db.add(review_plan)
     
-    await db.commit()
+    for progress in progresses:
+        progress.total_reviews = progress.completed_reviews + total_rounds
+        _apply_step(progress, first_step, now)
+    
+    return len(rows)
+
+
+def review_feed_query():
+    """复习计划 ⨝ 进度 ⨝ 题目 的扁平查询，一次取回响应所需的全部字段"""
+    return (
+        select(
+            ReviewPlan.id,
+            ReviewPlan.progress_id,
+            ReviewPlan.scheduled_date,
+            ReviewPlan.review_round,
+            ReviewPlan.completed,
+            ReviewPlan.completed_at,
+            Problem.id.label("problem_id"),
+            Problem.leetcode_id,
+            Problem.title,
+            Problem.title_cn,
+            Problem.difficulty,
+            Problem.category,
+        )
+        .select_from(ReviewPlan)
+        .outerjoin(Progress, Progress.id == ReviewPlan.progress_id)
+        .outerjoin(Problem, Problem.id == Progress.problem_id)
+    )
+
+
+def pending_reviews_query(until: datetime):
+    """截至 until 的未完成复习计划（扁平行，按时间排序），命中 (completed, scheduled_date) 索引"""
+    return (
+        review_feed_query()
+        .where(ReviewPlan.scheduled_date <= until, ReviewPlan.completed == False)
+        .order_by(ReviewPlan.scheduled_date, ReviewPlan.id)
+    )
+
+
+def next_pending_plan_query(progress_id):
+    """
+    进度最早的一条未完成计划；progress_id 传 Progress.id 时为关联子查询
+    命中 (progress_id, completed, scheduled_date) 索引，无需排序
+    """
+    return (
+        select(ReviewPlan.scheduled_date)
+        .where(ReviewPlan.progress_id == progress_id, ReviewPlan.completed == False)
+        .order_by(ReviewPlan.scheduled_date, ReviewPlan.id)
+        .limit(1)
+    )
+
+
+def complete_plans_statement(review_ids: list[int], now: datetime):
+    """
+    把尚未完成的计划标记为完成并返回被标记的计划
+    completed 条件用 likely() 提示查询规划器按主键定位，否则没有统计信息时会选
+    (completed, scheduled_date) 索引扫描全部未完成计划
+    """
+    return (
+        update(ReviewPlan)
+        .where(ReviewPlan.id.in_(review_ids), func.likely(ReviewPlan.completed == False))
+        .values(completed=True, completed_at=now)
+        .returning(ReviewPlan.id, ReviewPlan.progress_id, ReviewPlan.review_round)
+        .execution_options(synchronize_session=False)
+    )
 
 
 async def get_today_reviews(db: AsyncSession) -> dict:
-    """获取今日待复习、逾期和即将复习的题目"""
+    """获取今日待复习、逾期和即将复习的题目（从待复习队列切片，或单次范围查询，再按日期分组）"""
     today = datetime.utcnow().date()
     today_start = datetime.combine(today, datetime.min.time())
     today_end = datetime.combine(today, datetime.max.time())
-    
-    # 今日待复习
-    today_result = await db.execute(
-        select(ReviewPlan).where(
-            and_(
-                ReviewPlan.scheduled_date >= today_start,
-                ReviewPlan.scheduled_date <= today_end,
-                ReviewPlan.completed == False
-            )
-        ).order_by(ReviewPlan.scheduled_date)
-    )
-    today_plans = today_result.scalars().all()
-    
-    # 逾期未复习
-    overdue_result = await db.execute(
-        select(ReviewPlan).where(
-            and_(
-                ReviewPlan.scheduled_date < today_start,
-                ReviewPlan.completed == False
-            )
-        ).order_by(ReviewPlan.scheduled_date)
-    )
-    overdue_plans = overdue_result.scalars().all()
-    
     # 未来7天待复习
     upcoming_end = today_start + timedelta(days=7)
-    upcoming_result = await db.execute(
-        select(ReviewPlan).where(
-            and_(
-                ReviewPlan.scheduled_date > today_end,
-                ReviewPlan.scheduled_date <= upcoming_end,
-                ReviewPlan.completed == False
-            )
-        ).order_by(ReviewPlan.scheduled_date)
-    )
-    upcoming_plans = upcoming_result.scalars().all()
     
-    return {
-        "today": today_plans,
-        "overdue": overdue_plans,
-        "upcoming": upcoming_plans,
-    }
+    if queue_enabled():
+        queue = get_review_queue()
+        await queue.ensure_fresh(db)
+        rows = queue.due_until(upcoming_end)
+    else:
+        result = await db.execute(pending_reviews_query(upcoming_end))
+        rows = result.fetchall()
+    
+    reviews = {"today": [], "overdue": [], "upcoming": []}
+    for row in rows:
+        if row.scheduled_date < today_start:
+            # 逾期未复习
+            reviews["overdue"].append(row)
+        elif row.scheduled_date <= today_end:
+            # 今日待复习
+            reviews["today"].append(row)
+        else:
+            reviews["upcoming"].append(row)
+    
+    return reviews
 
 
-async def count_completed_reviews(db: AsyncSession, progress_id: int) -> int:
-    """统计已完成的复习轮次数"""
-    result = await db.execute(
-        select(func.count()).where(
-            and_(
-                ReviewPlan.progress_id == progress_id,
-                ReviewPlan.completed == True
-            )
+async def _schedule_next_reviews(
+    db: AsyncSession,
+    progress_rows: list,
+    completed_rounds: dict[int, int],
+    quality: int | None,
+    now: datetime,
+) -> list[tuple]:
+    """
+    lazy 模式：由调度器计算下一轮，替换这些进度其余的未完成计划（不提交事务）
+    progress_rows 为进度更新的 RETURNING 行，completed_rounds 为各进度本次完成的最大轮次
+    返回 (待复习队列的变更, 各进度更新后的调度状态)
+    """
+    scheduler = get_scheduler()
+    progress_ids = [row.id for row in progress_rows]
+    
+    # 从 eager 模式切换过来的旧数据可能还有多轮未完成计划，一并替换
+    await db.execute(
+        delete(ReviewPlan).where(
+            ReviewPlan.progress_id.in_(progress_ids),
+            ReviewPlan.completed == False,
         )
     )
-    return result.scalar() or 0
+    
+    schedule_rows, plan_rows = [], []
+    for row in progress_rows:
+        step = scheduler.next_step(
+            ReviewStep(
+                review_round=completed_rounds[row.id],
+                interval_days=row.review_interval,
+                ease_factor=row.ease_factor,
+            ),
+            quality,
+        )
+        remaining = scheduler.total_rounds - step.review_round + 1 if step else 0
+        next_due = now + timedelta(days=step.interval_days) if step else None
+        schedule_rows.append({
+            "id": row.id,
+            "review_round": step.review_round if step else 0,
+            "next_due": next_due,
+            "review_interval": step.interval_days if step else row.review_interval,
+            "ease_factor": step.ease_factor if step else row.ease_factor,
+            "total_reviews": row.completed_reviews + remaining,
+        })
+        if step:
+            plan_rows.append({
+                "progress_id": row.id,
+                "scheduled_date": next_due,
+                "review_round": step.review_round,
+                "completed": False,
+            })
+    
+    # 按主键批量更新（executemany）
+    await db.execute(update(Progress), schedule_rows)
+    
+    changes = [("remove_progress", progress_id) for progress_id in progress_ids]
+    if plan_rows:
+        problem_ids = {row.id: row.problem_id for row in progress_rows}
+        result = await db.execute(
+            insert(ReviewPlan).returning(
+                ReviewPlan.id, ReviewPlan.progress_id, ReviewPlan.scheduled_date, ReviewPlan.review_round
+            ),
+            plan_rows,
+        )
+        changes += [
+            ("add", plan.id, plan.progress_id, problem_ids[plan.progress_id], plan.scheduled_date, plan.review_round)
+            for plan in result
+        ]
+    return changes, {row["id"]: row for row in schedule_rows}
 
 
-async def complete_review(db: AsyncSession, review_id: int) -> ReviewPlan | None:
+async def complete_reviews(
+    db: AsyncSession,
+    review_ids: list[int],
+    quality: int | None = None,
+) -> tuple[list, list[dict]]:
     """
-    标记复习完成
-    - 自动更新掌握程度（= 已完成复习轮次）
-    - 5轮全部完成时自动标记为已掌握
+    批量标记复习完成（单个事务，语句数与数量无关）
+    - 条件 UPDATE ... RETURNING 只标记尚未完成的计划，并发重复点击不会重复计数
+    - 进度上的复习计数、掌握程度、状态用算术 UPDATE 在数据库内递增
+    - 更新下一轮复习（eager 模式取剩余计划中最早的一轮，lazy 模式由调度器按复习质量 quality 计算）
+    返回 (复习计划扁平查询行, 本次变化的进度)；不存在的计划不在结果中，已完成的计划原样返回
+    进度为 progress_event_data 结构的 dict
     """
-    result = await db.execute(select(ReviewPlan).where(ReviewPlan.id == review_id))
-    review_plan = result.scalar_one_or_none()
+    now = datetime.utcnow()
     
-    if not review_plan:
-        return None
+    # 1. 标记完成：已完成的计划不满足条件，不会被重复计数
+    result = await db.execute(complete_plans_statement(review_ids, now))
+    completed_plans = result.fetchall()
     
-    # 标记复习完成
-    review_plan.completed = True
-    review_plan.completed_at = datetime.utcnow()
+    progress_updates = []
+    if completed_plans:
+        increments: dict[int, int] = {}
+        completed_rounds: dict[int, int] = {}
+        for plan in completed_plans:
+            increments[plan.progress_id] = increments.get(plan.progress_id, 0) + 1
+            completed_rounds[plan.progress_id] = max(completed_rounds.get(plan.progress_id, 0), plan.review_round)
+        
+        # 2. 进度计数在数据库内递增（SET 中引用的都是更新前的值）
+        increment = case(increments, value=Progress.id, else_=0)
+        completed_count = Progress.completed_reviews + increment
+        total_rounds = total_review_rounds()
+        values = {
+            "completed_reviews": completed_count,
+            # 掌握程度 = 已完成复习轮次（不超过总轮次和 MAX_MASTERY_LEVEL），全部轮次完成 → 自动标记为已掌握
+            "mastery_level": func.min(completed_count, min(total_rounds, MAX_MASTERY_LEVEL)),
+            "status": case((completed_count >= total_rounds, "mastered"), else_=Progress.status),
+            "last_attempt": now,
+        }
+        if not is_lazy_mode():
+            pending = next_pending_plan_query(Progress.id)
+            values["next_due"] = pending.scalar_subquery()
+            values["review_round"] = func.coalesce(
+                pending.with_only_columns(ReviewPlan.review_round).scalar_subquery(), 0
+            )
+        result = await db.execute(
+            update(Progress)
+            .where(Progress.id.in_(increments))
+            .values(**values)
+            .returning(
+                Progress.id, Progress.problem_id, Progress.status, Progress.mastery_level,
+                Progress.attempt_count, Progress.completed_reviews, Progress.total_reviews,
+                Progress.next_due, Progress.review_interval, Progress.ease_factor,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        progress_rows = result.fetchall()
+        progress_updates = [progress_event_data(row) for row in progress_rows]
+        
+        # 每个完成的复习计划记一条复习事件
+        problem_of = {row.id: row.problem_id for row in progress_rows}
+        await record_attempts(
+            db,
+            [problem_of[plan.progress_id] for plan in completed_plans if plan.progress_id in problem_of],
+            ATTEMPT_REVIEW, now, quality,
+        )
+        
+        changes = [("remove", plan.id) for plan in completed_plans]
+        if is_lazy_mode() and progress_rows:
+            schedule_changes, schedules = await _schedule_next_reviews(
+                db, progress_rows, completed_rounds, quality, now
+            )
+            changes += schedule_changes
+            for row, update_data in zip(progress_rows, progress_updates):
+                update_data["next_due"] = schedules[row.id]["next_due"]
+                update_data["total_reviews"] = schedules[row.id]["total_reviews"]
+        await record_queue_changes(db, *changes)
     
-    # 获取关联的进度记录
-    progress_result = await db.execute(
-        select(Progress).where(Progress.id == review_plan.progress_id)
+    # 3. 一次取回响应所需的全部字段
+    result = await db.execute(
+        review_feed_query().where(ReviewPlan.id.in_(review_ids)).order_by(ReviewPlan.id)
     )
-    progress = progress_result.scalar_one_or_none()
+    rows = result.fetchall()
     
-    if progress:
-        # 计算已完成的复习轮次（包括刚刚完成的这一轮）
-        completed_count = await count_completed_reviews(db, progress.id)
-        # 因为当前这轮还没提交，需要+1
-        completed_count += 1
-        
-        # 自动更新掌握程度
-        progress.mastery_level = min(completed_count, 5)
-        progress.last_attempt = datetime.utcnow()
-        
-        # 5轮全部完成 → 自动标记为已掌握
-        if completed_count >= 5:
-            progress.status = "mastered"
+    await db.commit()
+    if completed_plans:
+        invalidate_review_totals()
+    
+    return rows, progress_updates
+
+
+async def complete_review(db: AsyncSession, review_id: int, quality: int | None = None):
+    """标记单个复习完成，返回复习计划扁平查询行（不存在时为 None）和变化的进度"""
+    rows, progress_updates = await complete_reviews(db, [review_id], quality)
+    return (rows[0] if rows else None), progress_updates
+
+
+async def rebuild_review_counters(db: AsyncSession) -> int:
+    """
+    根据 review_plans 重新计算 Progress 上的复习计数（回填/修复）
+    返回被修正的进度记录数
+    """
+    completed_count = (
+        select(func.count())
+        .where(ReviewPlan.progress_id == Progress.id, ReviewPlan.completed == True)
+        .scalar_subquery()
+    )
+    total_count = (
+        select(func.count())
+        .where(ReviewPlan.progress_id == Progress.id)
+        .scalar_subquery()
+    )
+    if is_lazy_mode():
+        # lazy 模式未来轮次不落库：总轮次 = 已完成 + 当前轮次起剩余的轮次
+        remaining = get_scheduler().total_rounds - Progress.review_round + 1
+        total_count = completed_count + case((Progress.review_round > 0, remaining), else_=0)
+    result = await db.execute(
+        update(Progress)
+        .where(or_(
+            Progress.completed_reviews != completed_count,
+            Progress.total_reviews != total_count,
+        ))
+        .values(completed_reviews=completed_count, total_reviews=total_count)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
     
+    return result.rowcount
+
+
+async def compact_pending_review_plans(db: AsyncSession) -> int:
+    """
+    切换到 lazy 模式后压缩已有数据：每个进度只保留最早的一条未完成计划，
+    并据此同步进度上的下一轮复习时间。返回删除的计划数
+    """
+    ranked = (
+        select(
+            ReviewPlan.id,
+            func.row_number().over(
+                partition_by=ReviewPlan.progress_id,
+                order_by=(ReviewPlan.scheduled_date, ReviewPlan.id),
+            ).label("position"),
+        )
+        .where(ReviewPlan.completed == False)
+        .subquery()
+    )
+    result = await db.execute(
+        delete(ReviewPlan)
+        .where(
+            ReviewPlan.completed == False,
+            ReviewPlan.id.not_in(select(ranked.c.id).where(ranked.c.position == 1)),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    
+    next_due = (
+        select(func.min(ReviewPlan.scheduled_date))
+        .where(ReviewPlan.progress_id == Progress.id, ReviewPlan.completed == False)
+        .scalar_subquery()
+    )
+    next_round = (
+        select(func.min(ReviewPlan.review_round))
+        .where(ReviewPlan.progress_id == Progress.id, ReviewPlan.completed == False)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Progress)
+        .values(next_due=next_due, review_round=func.coalesce(next_round, 0))
+        .execution_options(synchronize_session=False)
+    )
+    await record_queue_changes(db, ("reload",))
     await db.commit()
-    await db.refresh(review_plan)
+    invalidate_review_totals()
     
-    return review_plan
+    return result.rowcount
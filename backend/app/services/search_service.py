@@ -0,0 +1,314 @@
+"""全文搜索服务（SQLite FTS5）
+
+- 三个字符及以上的关键词：trigram 分词的 problems_fts / notes_fts
+- 两个字符的关键词（如「哈希」「链表」）：trigram 无法匹配，笔记走 notes_bigram（相邻两字切词）索引，
+  题目标题是固定的题库，直接匹配
+- 单个字符或含标点的两字符关键词：回退到 LIKE（全表扫描）
+- 高亮片段中的内容一律经过 HTML 转义，只有 <mark></mark> 是标签
+"""
+import html
+
+from sqlalchemy import select, text, literal_column, or_, table, column
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.database import engine, register_sql_functions
+from app.models import Problem, Note
+
+# trigram 分词器按 3 个字符切分，可处理中英文子串
+MIN_FTS_QUERY_LENGTH = 3
+BIGRAM_QUERY_LENGTH = 2
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# 生成片段时先用 Unicode 私有区字符标记命中位置，转义 HTML 后再替换为高亮标签
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+# FTS5 外部内容表 + 同步触发器（按索引表分组）
+PROBLEM_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS problems_fts USING fts5(
+        title, title_cn,
+        content='problems', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_fts_ai AFTER INSERT ON problems BEGIN
+        INSERT INTO problems_fts(rowid, title, title_cn) VALUES (new.id, new.title, new.title_cn);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_fts_ad AFTER DELETE ON problems BEGIN
+        INSERT INTO problems_fts(problems_fts, rowid, title, title_cn)
+        VALUES ('delete', old.id, old.title, old.title_cn);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_fts_au AFTER UPDATE ON problems BEGIN
+        INSERT INTO problems_fts(problems_fts, rowid, title, title_cn)
+        VALUES ('delete', old.id, old.title, old.title_cn);
+        INSERT INTO problems_fts(rowid, title, title_cn) VALUES (new.id, new.title, new.title_cn);
+    END
+    """,
+]
+
+NOTE_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        approach, key_points, code,
+        content='notes', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, approach, key_points, code)
+        VALUES (new.id, new.approach, new.key_points, new.code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, approach, key_points, code)
+        VALUES ('delete', old.id, old.approach, old.key_points, old.code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, approach, key_points, code)
+        VALUES ('delete', old.id, old.approach, old.key_points, old.code);
+        INSERT INTO notes_fts(rowid, approach, key_points, code)
+        VALUES (new.id, new.approach, new.key_points, new.code);
+    END
+    """,
+]
+
+# 无内容表：切词由 search_bigrams() 在触发器中完成（连接上需注册该函数，见 register_sql_functions）
+NOTE_BIGRAM_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_bigram USING fts5(grams, content='', tokenize='unicode61')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_bigram_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_bigram(rowid, grams)
+        VALUES (new.id, search_bigrams(new.approach, new.key_points, new.code));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_bigram_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_bigram(notes_bigram, rowid, grams)
+        VALUES ('delete', old.id, search_bigrams(old.approach, old.key_points, old.code));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_bigram_au AFTER UPDATE ON notes BEGIN
+        INSERT INTO notes_bigram(notes_bigram, rowid, grams)
+        VALUES ('delete', old.id, search_bigrams(old.approach, old.key_points, old.code));
+        INSERT INTO notes_bigram(rowid, grams)
+        VALUES (new.id, search_bigrams(new.approach, new.key_points, new.code));
+    END
+    """,
+]
+
+SEARCH_INDEXES = {
+    "problems_fts": PROBLEM_INDEX_DDL,
+    "notes_fts": NOTE_INDEX_DDL,
+    "notes_bigram": NOTE_BIGRAM_INDEX_DDL,
+}
+
+# 索引首次创建时从现有数据填充（外部内容表用 rebuild，无内容表逐行切词写入）
+SEARCH_INDEX_POPULATE = {
+    "notes_bigram": "INSERT INTO notes_bigram(rowid, grams) "
+                    "SELECT id, search_bigrams(approach, key_points, code) FROM notes",
+}
+
+NOTE_SEARCH_INDEXES = ("notes_fts", "notes_bigram")
+
+NOTES_BIGRAM = table("notes_bigram", column("rowid"))
+
+
+async def init_search_index(
+    target_engine: AsyncEngine = engine,
+    indexes: tuple[str, ...] = ("problems_fts", *NOTE_SEARCH_INDEXES),
+) -> None:
+    """创建全文索引和同步触发器；索引首次创建时从现有数据重建（分片库只建笔记索引）"""
+    async with target_engine.begin() as conn:
+        # 外部传入的引擎（如基准测试数据生成）未必注册过切词函数
+        await conn.run_sync(lambda sync_conn: register_sql_functions(sync_conn.connection.dbapi_connection))
+        result = await conn.execute(text("SELECT name FROM main.sqlite_master WHERE type = 'table'"))
+        existing = {row[0] for row in result.fetchall()}
+
+        for fts_table in indexes:
+            for ddl in SEARCH_INDEXES[fts_table]:
+                await conn.execute(text(ddl))
+            if fts_table not in existing:
+                populate = SEARCH_INDEX_POPULATE.get(
+                    fts_table, f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"
+                )
+                await conn.execute(text(populate))
+
+
+def to_fts_query(keyword: str) -> str:
+    """将用户输入转为 FTS5 短语查询，避免特殊语法字符被解析"""
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+def use_fts(keyword: str) -> bool:
+    """关键词长度足够时才走全文索引"""
+    return len(keyword) >= MIN_FTS_QUERY_LENGTH
+
+
+def use_bigram(keyword: str) -> bool:
+    """两个字母/数字/汉字组成的关键词走 notes_bigram 索引"""
+    return len(keyword) == BIGRAM_QUERY_LENGTH and keyword.isalnum()
+
+
+def render_snippet(raw: str) -> str:
+    """转义片段中的 HTML，再把命中位置的占位符替换为高亮标签"""
+    return html.escape(raw).replace(_MARK_START, HIGHLIGHT_START).replace(_MARK_END, HIGHLIGHT_END)
+
+
+def problem_search_clause(keyword: str) -> ColumnElement[bool]:
+    """题目列表的搜索条件：标题全文匹配，或题号精确匹配"""
+    if use_fts(keyword):
+        matched = (
+            select(literal_column("rowid"))
+            .select_from(text("problems_fts"))
+            .where(text("problems_fts MATCH :fts_query").bindparams(fts_query=to_fts_query(keyword)))
+        )
+        clause = Problem.id.in_(matched)
+    else:
+        pattern = f"%{keyword}%"
+        clause = Problem.title.ilike(pattern) | Problem.title_cn.ilike(pattern)
+
+    if keyword.isdigit():
+        clause = clause | (Problem.leetcode_id == int(keyword))
+    return clause
+
+
+def make_snippet(content: str | None, keyword: str, context: int = 20) -> str:
+    """为 LIKE / 两字索引的结果生成高亮片段（已转义 HTML）"""
+    if not content:
+        return ""
+    pos = content.lower().find(keyword.lower())
+    if pos < 0:
+        return html.escape(content[:context * 2])
+    start = max(pos - context, 0)
+    end = min(pos + len(keyword) + context, len(content))
+    return render_snippet(
+        ("…" if start > 0 else "")
+        + content[start:pos]
+        + _MARK_START + content[pos:pos + len(keyword)] + _MARK_END
+        + content[pos + len(keyword):end]
+        + ("…" if end < len(content) else "")
+    )
+
+
+async def _search_fts(db: AsyncSession, keyword: str, limit: int) -> list[dict]:
+    """通过 FTS5 检索题目和笔记，按 bm25 排序"""
+    params = {
+        "fts_query": to_fts_query(keyword),
+        "limit": limit,
+        "start": _MARK_START,
+        "end": _MARK_END,
+    }
+    problem_rows = await db.execute(text("""
+        SELECT problems_fts.rowid AS problem_id,
+               snippet(problems_fts, -1, :start, :end, '…', 16) AS snippet,
+               bm25(problems_fts) AS score
+        FROM problems_fts
+        WHERE problems_fts MATCH :fts_query
+        ORDER BY score
+        LIMIT :limit
+    """), params)
+    note_rows = await db.execute(text("""
+        SELECT notes.problem_id AS problem_id,
+               snippet(notes_fts, -1, :start, :end, '…', 16) AS snippet,
+               bm25(notes_fts) AS score
+        FROM notes_fts
+        JOIN notes ON notes.id = notes_fts.rowid
+        WHERE notes_fts MATCH :fts_query
+        ORDER BY score
+        LIMIT :limit
+    """), params)
+
+    hits = [
+        {"problem_id": row.problem_id, "source": "problem", "snippet": render_snippet(row.snippet), "score": row.score}
+        for row in problem_rows
+    ] + [
+        {"problem_id": row.problem_id, "source": "note", "snippet": render_snippet(row.snippet), "score": row.score}
+        for row in note_rows
+    ]
+    # bm25 越小越相关
+    hits.sort(key=lambda hit: hit["score"])
+    return hits[:limit]
+
+
+def _note_hit(row, keyword: str) -> dict:
+    """笔记命中：在包含关键词的字段上生成片段"""
+    content = next(
+        (value for value in (row.approach, row.key_points, row.code) if value and keyword.lower() in value.lower()),
+        row.approach,
+    )
+    return {"problem_id": row.problem_id, "source": "note", "snippet": make_snippet(content, keyword), "score": 0.0}
+
+
+async def _search_problem_titles(db: AsyncSession, keyword: str, limit: int) -> list[dict]:
+    """短关键词匹配题目标题（题库规模固定，直接扫描）"""
+    pattern = f"%{keyword}%"
+    problem_rows = await db.execute(
+        select(Problem.id, Problem.title, Problem.title_cn)
+        .where(Problem.title.ilike(pattern) | Problem.title_cn.ilike(pattern))
+        .order_by(Problem.id)
+        .limit(limit)
+    )
+    hits = []
+    for row in problem_rows:
+        content = row.title_cn if keyword.lower() in row.title_cn.lower() else row.title
+        hits.append({"problem_id": row.id, "source": "problem", "snippet": make_snippet(content, keyword), "score": 0.0})
+    return hits
+
+
+async def _search_bigram(db: AsyncSession, keyword: str, limit: int) -> list[dict]:
+    """两个字的关键词：题目标题直接匹配，笔记通过 notes_bigram 索引检索"""
+    note_rows = await db.execute(
+        select(Note.problem_id, Note.approach, Note.key_points, Note.code)
+        .select_from(NOTES_BIGRAM)
+        .join(Note, Note.id == NOTES_BIGRAM.c.rowid)
+        .where(text("notes_bigram MATCH :fts_query").bindparams(fts_query=to_fts_query(keyword.lower())))
+        .order_by(literal_column("bm25(notes_bigram)"))
+        .limit(limit)
+    )
+    hits = await _search_problem_titles(db, keyword, limit)
+    hits += [_note_hit(row, keyword) for row in note_rows]
+    return hits[:limit]
+
+
+async def _search_like(db: AsyncSession, keyword: str, limit: int) -> list[dict]:
+    """单个字符或含标点的短关键词回退到 LIKE 检索（笔记全表扫描）"""
+    pattern = f"%{keyword}%"
+    note_rows = await db.execute(
+        select(Note.problem_id, Note.approach, Note.key_points, Note.code)
+        .where(or_(
+            Note.approach.ilike(pattern),
+            Note.key_points.ilike(pattern),
+            Note.code.ilike(pattern),
+        ))
+        .order_by(Note.id)
+        .limit(limit)
+    )
+    hits = await _search_problem_titles(db, keyword, limit)
+    hits += [_note_hit(row, keyword) for row in note_rows]
+    return hits[:limit]
+
+
+async def search(db: AsyncSession, keyword: str, limit: int = 20) -> list[dict]:
+    """检索题目标题和笔记内容，返回按相关度排序的命中结果"""
+    keyword = keyword.strip()
+    if not keyword:
+        return []
+    if use_fts(keyword):
+        return await _search_fts(db, keyword, limit)
+    if use_bigram(keyword):
+        return await _search_bigram(db, keyword, limit)
+    return await _search_like(db, keyword, limit)
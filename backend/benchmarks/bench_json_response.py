@@ -0,0 +1,111 @@
+"""题目列表响应序列化微基准
+
+对比两种响应构建方式的单次请求 CPU 开销（不含数据库查询）：
+- pydantic: 逐项构建 ProblemResponse，再经 response_model 校验 + jsonable_encoder + json.dumps
+- fast:     直接构建 dict，由 FastJSONResponse 一次编码
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_json_response [--items 100] [--rounds 200]
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.problems import serialize_problem
+from app.core.responses import FastJSONResponse
+from app.schemas.problem import ProblemResponse, ProblemListResponse, ProgressInProblem, TagInProblem
+
+
+def make_problems(count: int) -> list[SimpleNamespace]:
+    """构造与 ORM 对象属性一致的题目数据"""
+    now = datetime.utcnow()
+    problems = []
+    for i in range(1, count + 1):
+        tags = [
+            SimpleNamespace(tag=SimpleNamespace(id=t, name=f"标签{t}", color="#409EFF"))
+            for t in range(i % 3)
+        ]
+        progress = SimpleNamespace(
+            status="in_progress", attempt_count=i % 7, mastery_level=i % 5,
+            first_solved=now, last_attempt=now, completed_reviews=i % 5, total_reviews=5,
+        )
+        problems.append(SimpleNamespace(
+            id=i, leetcode_id=i * 3, title=f"Problem {i}", title_cn=f"题目 {i}",
+            difficulty="Medium", category="哈希", url=f"https://leetcode.cn/problems/p-{i}/",
+            progress=progress, problem_tags=tags,
+        ))
+    return problems
+
+
+def render_pydantic(problems) -> bytes:
+    """原实现：pydantic 模型 + response_model 二次校验与序列化"""
+    items = []
+    for problem in problems:
+        progress = problem.progress
+        items.append(ProblemResponse(
+            id=problem.id,
+            leetcode_id=problem.leetcode_id,
+            title=problem.title,
+            title_cn=problem.title_cn,
+            difficulty=problem.difficulty,
+            category=problem.category,
+            url=problem.url,
+            progress=ProgressInProblem(
+                status=progress.status,
+                attempt_count=progress.attempt_count,
+                mastery_level=progress.mastery_level,
+                first_solved=progress.first_solved,
+                last_attempt=progress.last_attempt,
+                completed_reviews=progress.completed_reviews,
+                total_reviews=progress.total_reviews,
+            ),
+            tags=[TagInProblem(id=pt.tag.id, name=pt.tag.name, color=pt.tag.color) for pt in problem.problem_tags],
+        ))
+    response = ProblemListResponse(total=len(items), items=items)
+    # FastAPI 对返回值按 response_model 再校验一次并转为可 JSON 编码的数据
+    validated = ProblemListResponse.model_validate(response.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def render_fast(problems) -> bytes:
+    """新实现：普通 dict + 一次编码"""
+    return FastJSONResponse({
+        "total": len(problems),
+        "items": [serialize_problem(problem) for problem in problems],
+        "next_cursor": None,
+    }).body
+
+
+def measure(func, problems, rounds: int) -> float:
+    """返回单次调用的平均 CPU 时间（毫秒）"""
+    func(problems)  # 预热
+    start = time.process_time()
+    for _ in range(rounds):
+        func(problems)
+    return (time.process_time() - start) / rounds * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="题目列表响应序列化微基准")
+    parser.add_argument("--items", type=int, default=100, help="每页题目数")
+    parser.add_argument("--rounds", type=int, default=200, help="重复次数")
+    args = parser.parse_args()
+
+    problems = make_problems(args.items)
+    assert json.loads(render_pydantic(problems)) == {**json.loads(render_fast(problems)), "next_cursor": None}
+
+    before = measure(render_pydantic, problems, args.rounds)
+    after = measure(render_fast, problems, args.rounds)
+    print(f"items={args.items} rounds={args.rounds}")
+    print(f"pydantic: {before:.3f} ms/请求")
+    print(f"fast:     {after:.3f} ms/请求")
+    print(f"加速比:   {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
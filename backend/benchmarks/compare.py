@@ -0,0 +1,59 @@
+"""对比两次基准测试结果
+
+用法（在 backend 目录下）:
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json [--threshold 10]
+
+变化超过阈值（百分比）的指标会标记为 +（变慢）或 -（变快）。
+"""
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ["throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+
+
+def change(old: float, new: float) -> float | None:
+    """相对变化百分比"""
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def format_cell(metric: str, old: float, new: float, threshold: float) -> str:
+    pct = change(old, new)
+    if pct is None:
+        return f"{old:.2f} → {new:.2f}"
+    # 吞吐量越大越好，延迟越小越好
+    worse = pct < -threshold if metric == "throughput_rps" else pct > threshold
+    better = pct > threshold if metric == "throughput_rps" else pct < -threshold
+    flag = "+" if worse else "-" if better else " "
+    return f"{old:.2f} → {new:.2f} ({pct:+.0f}%){flag}"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="对比两次基准测试结果")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="标记变化的阈值（百分比）")
+    args = parser.parse_args(argv)
+
+    old = json.loads(Path(args.old).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    print(f"{old['meta'].get('commit')} → {new['meta'].get('commit')}  (scale {new['meta']['scale']['name']})")
+    if old["meta"]["scale"] != new["meta"]["scale"]:
+        print("警告：两次结果的数据规模不同")
+
+    print(f"{'endpoint':<30}" + "".join(f"{metric:>32}" for metric in METRICS))
+    for name in sorted(set(old["endpoints"]) | set(new["endpoints"])):
+        if name not in old["endpoints"] or name not in new["endpoints"]:
+            print(f"{name:<30} {'(仅存在于一侧)':>32}")
+            continue
+        cells = [
+            format_cell(metric, old["endpoints"][name][metric], new["endpoints"][name][metric], args.threshold)
+            for metric in METRICS
+        ]
+        print(f"{name:<30}" + "".join(f"{cell:>32}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""合成大规模测试数据
+
+使用现有模型的表结构批量生成题目、标签、进度、复习计划和笔记。
+相同的规模参数和随机种子生成完全相同的数据，便于在不同提交之间对比。
+"""
+import random
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.database import Base
+from app.core.migrations import run_migrations
+from app.models import Problem, Progress, Tag, ProblemTag, ReviewPlan, Note, AppMeta
+from app.services.init_data import SEED_VERSION, SEED_VERSION_KEY
+from app.services.search_service import init_search_index
+
+# 每批 executemany 的行数
+CHUNK_SIZE = 10000
+
+# 合成题目的 leetcode_id 从这里开始，避免与 Hot 100 冲突
+LEETCODE_ID_OFFSET = 100000
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+CATEGORIES = [f"分类{i:02d}" for i in range(20)]
+STATUSES = ["not_started", "in_progress", "mastered"]
+WORDS = [
+    "数组", "哈希", "双指针", "滑动窗口", "二分", "链表", "二叉树", "回溯", "动态规划", "贪心",
+    "array", "hash", "pointer", "window", "binary", "linked", "tree", "backtrack", "dp", "greedy",
+]
+
+
+@dataclass
+class Scale:
+    """数据规模"""
+    problems: int = 5000
+    tags: int = 50
+    review_plans: int = 1000000
+    notes: int = 100000
+    seed: int = 42
+
+    @property
+    def slug(self) -> str:
+        return f"p{self.problems}-t{self.tags}-r{self.review_plans}-n{self.notes}-s{self.seed}"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+PRESETS = {
+    "small": Scale(problems=500, tags=20, review_plans=20000, notes=2000),
+    "medium": Scale(problems=2000, tags=50, review_plans=200000, notes=20000),
+    "large": Scale(),
+}
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+async def _insert_chunked(conn, model, rows) -> None:
+    """分批 executemany 写入"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK_SIZE:
+            await conn.execute(insert(model.__table__), batch)
+            batch = []
+    if batch:
+        await conn.execute(insert(model.__table__), batch)
+
+
+async def generate(engine: AsyncEngine, scale: Scale) -> None:
+    """在空数据库中生成指定规模的数据"""
+    rng = random.Random(scale.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(run_migrations, Base.metadata)
+
+        # 题目
+        await _insert_chunked(conn, Problem, (
+            {
+                "id": i,
+                "leetcode_id": LEETCODE_ID_OFFSET + i,
+                "title": f"Synthetic {_sentence(rng, 3)} {i}",
+                "title_cn": f"合成题目 {_sentence(rng, 2)} {i}",
+                "difficulty": rng.choice(DIFFICULTIES),
+                "category": rng.choice(CATEGORIES),
+                "url": f"https://leetcode.cn/problems/synthetic-{i}/",
+            }
+            for i in range(1, scale.problems + 1)
+        ))
+
+        # 标签及题目-标签关联（每题 0-3 个标签）
+        await _insert_chunked(conn, Tag, (
+            {"id": i, "name": f"标签{i:03d}", "color": "#409EFF"}
+            for i in range(1, scale.tags + 1)
+        ))
+        await _insert_chunked(conn, ProblemTag, (
+            {"problem_id": problem_id, "tag_id": tag_id}
+            for problem_id in range(1, scale.problems + 1)
+            for tag_id in rng.sample(range(1, scale.tags + 1), k=min(rng.randint(0, 3), scale.tags))
+        ))
+
+        # 进度：约一半题目已开始
+        statuses = {
+            problem_id: rng.choices(STATUSES, weights=[5, 4, 1])[0]
+            for problem_id in range(1, scale.problems + 1)
+        }
+        started = [problem_id for problem_id, status in statuses.items() if status != "not_started"] or [1]
+        await _insert_chunked(conn, Progress, (
+            {
+                "id": problem_id,
+                "problem_id": problem_id,
+                "status": status,
+                "attempt_count": 0 if status == "not_started" else rng.randint(1, 10),
+                "mastery_level": 0,
+                "completed_reviews": 0,
+                "total_reviews": 0,
+                "first_solved": None if status == "not_started" else now - timedelta(days=rng.randint(1, 730)),
+                "last_attempt": None if status == "not_started" else now - timedelta(days=rng.randint(0, 365)),
+            }
+            for problem_id, status in statuses.items()
+        ))
+
+        # 复习计划：分布在已开始的题目上，过去两年到未来 15 天
+        def review_rows():
+            for i in range(scale.review_plans):
+                scheduled = now + timedelta(days=rng.randint(-730, 15), minutes=rng.randint(0, 1439))
+                completed = scheduled < now and rng.random() < 0.8
+                yield {
+                    "progress_id": rng.choice(started),
+                    "scheduled_date": scheduled,
+                    "review_round": i % 5 + 1,
+                    "completed": completed,
+                    "completed_at": scheduled + timedelta(hours=rng.randint(0, 48)) if completed else None,
+                }
+        await _insert_chunked(conn, ReviewPlan, review_rows())
+
+        # 笔记：每个题目至多一条（笔记接口按题目唯一读取）
+        await _insert_chunked(conn, Note, (
+            {
+                "problem_id": problem_id,
+                "approach": _sentence(rng, 40),
+                "code": "def solve(nums):\n    " + _sentence(rng, 20),
+                "language": "python",
+                "time_complexity": "O(n)",
+                "space_complexity": "O(1)",
+                "key_points": _sentence(rng, 15),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for problem_id in range(1, min(scale.notes, scale.problems) + 1)
+        ))
+
+        # 回填复习计数与掌握程度，写入种子版本标记（避免启动时再写入 Hot 100）
+        await conn.execute(text("""
+            UPDATE progress SET
+                completed_reviews = (SELECT COUNT(*) FROM review_plans
+                                     WHERE progress_id = progress.id AND completed = 1),
+                total_reviews = (SELECT COUNT(*) FROM review_plans WHERE progress_id = progress.id)
+        """))
+        await conn.execute(text("UPDATE progress SET mastery_level = MIN(completed_reviews, 5)"))
+        await conn.execute(text("""
+            UPDATE progress SET
+                next_due = (SELECT MIN(scheduled_date) FROM review_plans
+                            WHERE progress_id = progress.id AND completed = 0),
+                review_round = COALESCE((SELECT MIN(review_round) FROM review_plans
+                                         WHERE progress_id = progress.id AND completed = 0), 0)
+        """))
+        # 做题事件：每题首次完成一条，每个已完成的复习计划一条；再按天汇总
+        await conn.execute(text("""
+            INSERT INTO attempts (problem_id, kind, created_at)
+            SELECT problem_id, 'complete', first_solved FROM progress WHERE first_solved IS NOT NULL
+        """))
+        await conn.execute(text("""
+            INSERT INTO attempts (problem_id, kind, created_at)
+            SELECT progress.problem_id, 'review', review_plans.completed_at
+            FROM review_plans JOIN progress ON progress.id = review_plans.progress_id
+            WHERE review_plans.completed = 1
+        """))
+        await conn.execute(text("""
+            INSERT INTO daily_activity (day, total, completes, reviews)
+            SELECT date(created_at), COUNT(*),
+                   SUM(CASE WHEN kind != 'review' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN kind = 'review' THEN 1 ELSE 0 END)
+            FROM attempts GROUP BY date(created_at)
+        """))
+        await conn.execute(insert(AppMeta.__table__), [{"key": SEED_VERSION_KEY, "value": SEED_VERSION}])
+
+    # 数据写完后一次性建立全文索引
+    await init_search_index(engine)
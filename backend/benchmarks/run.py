@@ -0,0 +1,237 @@
+"""接口基准测试
+
+在合成数据库上进程内启动应用（ASGI transport，不经过网络），
+逐个接口以固定并发发送请求，统计吞吐量和 p50/p95/p99 延迟，结果写入 JSON 供不同提交之间对比。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.run [--scale small|medium|large] [--requests 200] [--concurrency 8]
+                             [--only problems.list,reviews.today] [--output benchmarks/results/xxx.json]
+
+首次运行某个规模时会生成模板库（benchmarks/data/<规模>.db），之后每次运行复制一份工作库，
+写接口不会污染模板。
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR / "data"
+RESULTS_DIR = BENCH_DIR / "results"
+WORKING_DB = DATA_DIR / "work" / "bench.db"
+
+# 配置必须在导入应用模块之前通过环境变量注入
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORKING_DB}"
+os.environ["DEBUG"] = "false"
+os.environ["DB_ECHO"] = "false"
+
+import httpx  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.main import app  # noqa: E402
+from benchmarks.datagen import PRESETS, generate  # noqa: E402
+
+
+@dataclass
+class Endpoint:
+    """一个被测接口：名称、方法，以及按随机数生成请求参数的函数"""
+    name: str
+    method: str
+    build: Callable[[random.Random], dict]
+
+
+def build_endpoints(problem_count: int, tag_count: int) -> list[Endpoint]:
+    """所有路由的代表性请求"""
+    def problem_id(rng: random.Random) -> int:
+        return rng.randint(1, problem_count)
+
+    def tag_id(rng: random.Random) -> int:
+        return rng.randint(1, tag_count)
+
+    return [
+        # 题目
+        Endpoint("problems.list", "GET", lambda rng: {"url": "/api/problems"}),
+        Endpoint("problems.list_total", "GET", lambda rng: {
+            "url": "/api/problems", "params": {"include_total": "true", "page": rng.randint(1, 20)},
+        }),
+        Endpoint("problems.list_filtered", "GET", lambda rng: {
+            "url": "/api/problems",
+            "params": {"difficulty": rng.choice(["Easy", "Medium", "Hard"]), "status": "in_progress"},
+        }),
+        Endpoint("problems.list_tag", "GET", lambda rng: {"url": "/api/problems", "params": {"tag_id": tag_id(rng)}}),
+        Endpoint("problems.list_search", "GET", lambda rng: {"url": "/api/problems", "params": {"search": "动态规划"}}),
+        Endpoint("problems.list_page_size_500", "GET", lambda rng: {"url": "/api/problems", "params": {"page_size": 500}}),
+        Endpoint("problems.detail", "GET", lambda rng: {"url": f"/api/problems/{problem_id(rng)}"}),
+        Endpoint("problems.categories", "GET", lambda rng: {"url": "/api/problems/categories"}),
+        # 进度
+        Endpoint("progress.get", "GET", lambda rng: {"url": f"/api/progress/{problem_id(rng)}"}),
+        Endpoint("progress.complete", "POST", lambda rng: {"url": f"/api/progress/{problem_id(rng)}/complete"}),
+        Endpoint("progress.update", "PUT", lambda rng: {
+            "url": f"/api/progress/{problem_id(rng)}", "json": {"mastery_level": rng.randint(0, 5)},
+        }),
+        # 笔记
+        Endpoint("notes.get", "GET", lambda rng: {"url": f"/api/notes/{problem_id(rng)}"}),
+        Endpoint("notes.save", "POST", lambda rng: {
+            "url": "/api/notes", "json": {"problem_id": problem_id(rng), "approach": "双指针 benchmark"},
+        }),
+        # 标签
+        Endpoint("tags.list", "GET", lambda rng: {"url": "/api/tags"}),
+        Endpoint("tags.list_counts", "GET", lambda rng: {"url": "/api/tags", "params": {"with_counts": "true"}}),
+        Endpoint("tags.attach", "POST", lambda rng: {"url": f"/api/tags/{problem_id(rng)}/tags/{tag_id(rng)}"}),
+        # 复习
+        Endpoint("reviews.today", "GET", lambda rng: {"url": "/api/reviews/today"}),
+        Endpoint("reviews.list", "GET", lambda rng: {"url": "/api/reviews", "params": {"completed": "false"}}),
+        # 统计 / 搜索
+        Endpoint("stats.overview", "GET", lambda rng: {"url": "/api/stats"}),
+        Endpoint("stats.heatmap", "GET", lambda rng: {"url": "/api/stats/heatmap", "params": {"days": 365}}),
+        Endpoint("search.fts", "GET", lambda rng: {"url": "/api/search", "params": {"q": "动态规划"}}),
+        Endpoint("search.like", "GET", lambda rng: {"url": "/api/search", "params": {"q": "dp"}}),
+    ]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """最近秩法百分位"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_endpoint(client, endpoint: Endpoint, requests: int, concurrency: int, seed: int) -> dict:
+    """以固定并发发送 requests 次请求，返回该接口的统计结果"""
+    rng = random.Random(seed)
+    plans = [endpoint.build(rng) for _ in range(requests)]
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for plan in plans:
+        queue.put_nowait(plan)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            plan = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.request(endpoint.method, **plan)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": endpoint.method,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+async def prepare_database(scale, template: Path) -> None:
+    """生成模板库（已存在则跳过）"""
+    if template.exists():
+        return
+    template.parent.mkdir(parents=True, exist_ok=True)
+    partial = template.with_suffix(".tmp")
+    partial.unlink(missing_ok=True)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{partial}")
+    started = time.perf_counter()
+    try:
+        await generate(engine, scale)
+    finally:
+        await engine.dispose()
+    partial.rename(template)
+    print(f"已生成模板库 {template}（{time.perf_counter() - started:.1f}s）")
+
+
+async def main(args) -> None:
+    scale = PRESETS[args.scale]
+    template = DATA_DIR / f"{scale.slug}.db"
+    await prepare_database(scale, template)
+
+    WORKING_DB.parent.mkdir(parents=True, exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{WORKING_DB}{suffix}").unlink(missing_ok=True)
+    shutil.copyfile(template, WORKING_DB)
+
+    endpoints = build_endpoints(scale.problems, scale.tags)
+    if args.only:
+        wanted = set(args.only.split(","))
+        endpoints = [endpoint for endpoint in endpoints if endpoint.name in wanted]
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for index, endpoint in enumerate(endpoints):
+                # 预热，避免首个请求的连接建立和缓存填充计入结果
+                for _ in range(args.warmup):
+                    await client.request(endpoint.method, **endpoint.build(random.Random(index)))
+                result = await run_endpoint(client, endpoint, args.requests, args.concurrency, seed=index)
+                results[endpoint.name] = result
+                print(
+                    f"{endpoint.name:<30} {result['throughput_rps']:>9.1f} req/s  "
+                    f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+                    f"p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']}"
+                )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": {"name": args.scale, **scale.to_dict()},
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "endpoints": results,
+    }
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{report['meta']['commit'] or 'local'}-{args.scale}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"结果已写入 {output}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="接口基准测试")
+    parser.add_argument("--scale", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--requests", type=int, default=200, help="每个接口的请求数")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发请求数")
+    parser.add_argument("--warmup", type=int, default=5, help="每个接口的预热请求数")
+    parser.add_argument("--only", help="只测指定接口，逗号分隔")
+    parser.add_argument("--output", help="结果文件路径")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,59 @@
+"""测试夹具
+
+整个测试会话使用临时目录中的 SQLite 数据库；环境变量需在导入 app 之前设置
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator
+
+_tmp_dir = tempfile.mkdtemp(prefix="leetcode-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp_dir}/test.db"
+os.environ["SHARD_DIR"] = f"{_tmp_dir}/shards"
+os.environ["SLOW_QUERY_LOG_FILE"] = f"{_tmp_dir}/slow_queries.log"
+os.environ["DEBUG"] = "false"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import engine, read_engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[httpx.AsyncClient]:
+    """启动应用（建表、迁移、写入种子数据）并返回请求客户端"""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+@contextmanager
+def _count_statements() -> Iterator[list[str]]:
+    """统计读写引擎上执行的 SQL 语句"""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    targets = {engine.sync_engine, read_engine.sync_engine}
+    for target in targets:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def count_statements():
+    """with count_statements() as statements: 收集块内执行的 SQL 语句"""
+    return _count_statements
@@ -0,0 +1,30 @@
+"""做题事件日志测试"""
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal
+from app.models import Attempt, Progress
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_attempt_log_matches_attempt_count_under_concurrency(client):
+    """并发的一键完成、批量完成和手动更新后，尝试次数与事件日志条数一致"""
+    response = await client.get("/api/problems", params={"status": "not_started"})
+    problem_id = response.json()["items"][0]["id"]
+
+    requests = [client.post(f"/api/progress/{problem_id}/complete") for _ in range(8)]
+    requests += [client.post("/api/progress/complete-batch", json={"problem_ids": [problem_id]}) for _ in range(4)]
+    requests += [
+        client.put(f"/api/progress/{problem_id}", json={"status": "in_progress", "mastery_level": 0})
+        for _ in range(4)
+    ]
+    responses = await asyncio.gather(*requests)
+    assert all(response.status_code == 200 for response in responses)
+
+    async with AsyncSessionLocal() as db:
+        attempt_count = await db.scalar(select(Progress.attempt_count).where(Progress.problem_id == problem_id))
+        logged = await db.scalar(select(func.count()).select_from(Attempt).where(Attempt.problem_id == problem_id))
+    assert attempt_count == logged == len(requests)
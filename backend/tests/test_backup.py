@@ -0,0 +1,30 @@
+"""备份导入/导出"""
+import json
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_import_skips_duplicate_notes(client):
+    leetcode_id = (await client.get("/api/problems/5")).json()["leetcode_id"]
+    lines = [
+        {"type": "note", "leetcode_id": leetcode_id, "approach": "第一条"},
+        {"type": "note", "leetcode_id": leetcode_id, "approach": "重复"},
+    ]
+    body = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines)
+
+    for _ in range(2):
+        response = await client.post("/api/backup/import", content=body.encode())
+        assert response.status_code == 200
+        result = response.json()
+        assert result["imported"]["note"] == 1
+        assert result["skipped"] == 1
+        assert result["errors"][0]["line"] == 2
+
+    response = await client.get("/api/backup/export")
+    notes = [
+        record for record in map(json.loads, response.text.splitlines())
+        if record["type"] == "note" and record["leetcode_id"] == leetcode_id
+    ]
+    assert [note["approach"] for note in notes] == ["第一条"]
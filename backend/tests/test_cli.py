@@ -0,0 +1,40 @@
+"""命令行工具（多用户模式）"""
+import json
+
+import pytest
+
+from app.cli import run_command
+from app.core.config import settings
+from app.core.sharding import shard_router
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def multi_user(monkeypatch):
+    monkeypatch.setattr(settings, "MULTI_USER", True)
+
+
+async def test_backup_commands_use_user_shard(client, multi_user, tmp_path, capsys):
+    leetcode_id = (await client.get("/api/problems/11")).json()["leetcode_id"]
+    backup = tmp_path / "backup.jsonl"
+    backup.write_text(json.dumps({"type": "note", "leetcode_id": leetcode_id, "approach": "分片笔记"}, ensure_ascii=False))
+
+    await run_command("import-backup", "cli-user", str(backup))
+    assert "cli-user" in shard_router.user_ids()
+
+    exported = tmp_path / "export.jsonl"
+    await run_command("export-backup", "cli-user", str(exported))
+    notes = [record for record in map(json.loads, exported.read_text().splitlines()) if record["type"] == "note"]
+    assert [note["approach"] for note in notes] == ["分片笔记"]
+
+    # 目录库（DATABASE_URL）不受影响
+    response = await client.get("/api/notes/11")
+    assert response.status_code == 200
+    assert (response.json() or {}).get("approach") != "分片笔记"
+
+    capsys.readouterr()
+    await run_command("migrate")
+    output = capsys.readouterr().out
+    assert "[目录库]" in output
+    assert "[用户 cli-user]" in output
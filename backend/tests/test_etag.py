@@ -0,0 +1,76 @@
+"""ETag 条件请求"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from app.core import etag
+from app.core.database import AsyncSessionLocal
+from app.models import Progress
+from app.services import review_service
+
+pytestmark = pytest.mark.anyio
+
+
+class FrozenClock(datetime):
+    """utcnow 返回可调整的固定时间"""
+    now = datetime(2030, 1, 1, 23, 59)
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now
+
+
+async def test_queue_check_keeps_etag(client):
+    response = await client.get("/api/reviews/today")
+    etag = response.headers["ETag"]
+
+    response = await client.post("/api/reviews/queue/check")
+    assert response.status_code == 200
+
+    response = await client.get("/api/reviews/today", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+async def test_write_changes_etag(client):
+    response = await client.get("/api/reviews/today")
+    etag = response.headers["ETag"]
+
+    response = await client.post("/api/progress/1/complete")
+    assert response.status_code == 200
+
+    response = await client.get("/api/reviews/today", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_etag_changes_after_midnight(client, monkeypatch):
+    monkeypatch.setattr(etag, "datetime", FrozenClock)
+    monkeypatch.setattr(review_service, "datetime", FrozenClock)
+    monkeypatch.setattr(FrozenClock, "now", datetime(2030, 1, 1, 23, 59))
+    response = await client.get("/api/reviews/today")
+    assert response.status_code == 200
+    before_midnight = response.headers["ETag"]
+
+    response = await client.get("/api/reviews/today", headers={"If-None-Match": before_midnight})
+    assert response.status_code == 304
+
+    # 期间没有任何写入，跨过 UTC 零点后旧 ETag 不再命中
+    monkeypatch.setattr(FrozenClock, "now", datetime(2030, 1, 2, 0, 1))
+    response = await client.get("/api/reviews/today", headers={"If-None-Match": before_midnight})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != before_midnight
+
+
+async def test_etag_changes_after_write_from_another_session(client):
+    """其他进程（命令行、另一个 worker）的写入不经过本进程的中间件，版本号保存在数据库中同样可见"""
+    response = await client.get("/api/stats")
+    etag = response.headers["ETag"]
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Progress).where(Progress.problem_id == 7).values(attempt_count=Progress.attempt_count + 1))
+        await db.commit()
+
+    response = await client.get("/api/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,51 @@
+"""变更事件总线"""
+import asyncio
+
+import pytest
+
+from app.services.event_bus import EventBus, UserEventBuses, RESYNC_EVENT
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_user_buses_evict_idle_buses():
+    buses = UserEventBuses(max_size=2)
+    subscribed = buses.get("alice")
+    subscription = subscribed.subscribe()
+    # 订阅在第一次迭代时登记
+    next_event = asyncio.ensure_future(subscription.__anext__())
+    await asyncio.sleep(0)
+    assert subscribed.subscriber_count == 1
+    subscribed.publish("note", {})
+    assert (await next_event).type == "note"
+
+    idle = buses.get("bob")
+    buses.get("carol")
+    buses.get("dave")
+    assert len(buses) == 2
+    # 有订阅者的总线不淘汰，空闲的按最久未用淘汰
+    assert buses.get("alice") is subscribed
+    assert buses.get("bob") is not idle
+    await subscription.aclose()
+
+
+async def test_replay_from_previous_bus_resyncs():
+    old_bus = EventBus()
+    old_bus.publish("note", {})
+    last_event_id = old_bus._history[-1].id
+
+    new_bus = EventBus()
+    new_bus._epoch = old_bus._epoch + (1 << 20)
+    subscription = new_bus.subscribe(last_event_id)
+    assert (await subscription.__anext__()).type == RESYNC_EVENT
+    await subscription.aclose()
+
+
+async def test_replay_from_same_bus():
+    bus = EventBus()
+    bus.publish("note", {"n": 1})
+    last_event_id = bus._history[-1].id
+    bus.publish("note", {"n": 2})
+    subscription = bus.subscribe(last_event_id)
+    assert (await subscription.__anext__()).data == {"n": 2}
+    await subscription.aclose()
@@ -0,0 +1,30 @@
+"""数据导出"""
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_export_progress_ndjson(client):
+    await client.post("/api/progress/6/complete")
+    response = await client.get("/api/export/progress")
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    record = next(record for record in records if record["problem_id"] == 6)
+    assert record["attempt_count"] >= 1
+    assert isinstance(datetime.fromisoformat(record["first_solved"]), datetime)
+    assert len(records) == len({record["id"] for record in records})
+
+
+async def test_export_reviews_csv_matches_ndjson(client):
+    await client.post("/api/progress/6/complete")
+    ndjson = (await client.get("/api/export/reviews")).text.splitlines()
+    response = await client.get("/api/export/reviews", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text.lstrip("\ufeff"))))
+    assert len(rows) == len(ndjson) + 1
+    assert rows[0] == list(json.loads(ndjson[0]))
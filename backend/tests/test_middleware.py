@@ -0,0 +1,11 @@
+"""中间件顺序"""
+from app.core.etag import etag_middleware
+from app.core.metrics import metrics_middleware
+from app.core.slow_query import slow_query_middleware
+from app.main import app
+
+
+def test_metrics_middleware_is_outermost():
+    # user_middleware 从外到内排列
+    dispatches = [middleware.kwargs.get("dispatch") for middleware in app.user_middleware]
+    assert dispatches[:3] == [metrics_middleware, slow_query_middleware, etag_middleware]
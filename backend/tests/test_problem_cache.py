@@ -0,0 +1,50 @@
+"""题目列表缓存"""
+import pytest
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+from app.services.data_version import read_version
+from app.services.problem_cache import get_problem_cache
+
+pytestmark = pytest.mark.anyio
+
+
+def problem_status(response, problem_id: int) -> str:
+    problem = next(item for item in response.json()["items"] if item["id"] == problem_id)
+    return problem["progress"]["status"]
+
+
+async def test_cache_cleared_after_write_from_another_process(client):
+    response = await client.get("/api/problems", params={"status": "not_started"})
+    problem_id = response.json()["items"][0]["id"]
+    response = await client.get("/api/problems")
+    assert problem_status(response, problem_id) == "not_started"
+
+    # 模拟其他进程提交：直接修改数据并递增数据库中的版本号，本进程的提交钩子不会执行
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text("UPDATE progress SET status = 'mastered' WHERE problem_id = :problem_id"),
+            {"problem_id": problem_id},
+        )
+        await db.execute(text("UPDATE app_meta SET value = value + 1 WHERE key = 'data_version'"))
+        await db.commit()
+
+    response = await client.get("/api/problems")
+    assert problem_status(response, problem_id) == "mastered"
+
+
+async def test_cache_kept_after_own_write(client):
+    difficulty = (await client.get("/api/problems/10")).json()["difficulty"]
+    other = next(level for level in ("Easy", "Medium", "Hard") if level != difficulty)
+    await client.get("/api/problems", params={"difficulty": other})
+    await client.post("/api/progress/10/complete")
+
+    cache = get_problem_cache()
+    async with AsyncSessionLocal() as db:
+        assert cache.data_version == await read_version(db)
+    # 本进程的写入按题目精确失效，不包含该题目的条目保留
+    key = cache.make_key(
+        difficulty=other, category=None, status=None, search=None, tag_id=None,
+        sort_by="default", page=1, page_size=100, cursor=None, include_total=False,
+    )
+    assert cache.get(key) is not None
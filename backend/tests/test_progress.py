@@ -0,0 +1,55 @@
+"""进度 API 测试"""
+import asyncio
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# 首次完成：UPDATE ... RETURNING、DELETE 旧计划、INSERT 新计划、UPDATE 复习状态、INSERT 做题记录、
+# UPSERT 每日汇总、提交前的版本号 UPSERT（数据与队列版本号合并为一条）
+FIRST_COMPLETE_MAX_STATEMENTS = 7
+# 再次完成：UPDATE ... RETURNING、INSERT 做题记录、UPSERT 每日汇总、数据版本号 UPSERT
+REPEAT_COMPLETE_MAX_STATEMENTS = 4
+
+
+async def not_started_problem_id(client) -> int:
+    response = await client.get("/api/problems", params={"status": "not_started"})
+    return response.json()["items"][0]["id"]
+
+
+async def test_mark_complete_statement_count(client, count_statements):
+    problem_id = await not_started_problem_id(client)
+
+    with count_statements() as statements:
+        response = await client.post(f"/api/progress/{problem_id}/complete")
+    assert response.status_code == 200
+    assert response.json()["is_first_complete"] is True
+    assert len(statements) <= FIRST_COMPLETE_MAX_STATEMENTS, statements
+
+    with count_statements() as statements:
+        response = await client.post(f"/api/progress/{problem_id}/complete")
+    assert response.status_code == 200
+    assert response.json()["is_first_complete"] is False
+    assert response.json()["attempt_count"] == 2
+    assert len(statements) <= REPEAT_COMPLETE_MAX_STATEMENTS, statements
+
+
+async def test_mark_complete_missing_problem(client):
+    response = await client.post("/api/progress/999999/complete")
+    assert response.status_code == 404
+
+
+async def test_concurrent_mark_complete(client):
+    """并发完成同一题目：计数不丢失，只有一个请求是首次完成"""
+    problem_id = await not_started_problem_id(client)
+
+    responses = await asyncio.gather(
+        *(client.post(f"/api/progress/{problem_id}/complete") for _ in range(15))
+    )
+    assert all(response.status_code == 200 for response in responses)
+    assert sum(response.json()["is_first_complete"] for response in responses) == 1
+    assert max(response.json()["attempt_count"] for response in responses) == 15
+
+    response = await client.get(f"/api/progress/{problem_id}")
+    assert response.json()["attempt_count"] == 15
+    assert response.json()["total_reviews"] == 5
@@ -0,0 +1,14 @@
+"""热点查询的查询计划测试：由应用实际使用的查询构建器编译，确认命中索引"""
+import pytest
+
+from app.cli import hot_queries, explain_query_plan, plan_problems
+from app.core.database import engine
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("query", hot_queries(), ids=lambda query: query.name)
+async def test_hot_query_uses_index(client, query):
+    async with engine.connect() as conn:
+        plan = await conn.run_sync(explain_query_plan, query.statement)
+    assert plan_problems(query, plan) == [], plan
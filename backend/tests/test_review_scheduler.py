@@ -0,0 +1,24 @@
+"""复习调度器接口"""
+import pytest
+
+from app.services.review_scheduler import ReviewScheduler, ReviewStep, SCHEDULERS
+
+
+def test_incomplete_scheduler_fails_on_instantiation():
+    class FirstStepOnly(ReviewScheduler):
+        def first_step(self) -> ReviewStep:
+            return ReviewStep(review_round=1, interval_days=1, ease_factor=0.0)
+
+    with pytest.raises(TypeError):
+        FirstStepOnly(total_rounds=5)
+
+
+@pytest.mark.parametrize("name", sorted(SCHEDULERS))
+def test_schedulers_stop_after_total_rounds(name):
+    scheduler_class = SCHEDULERS[name]
+    scheduler = scheduler_class([1, 2, 4]) if name == "ebbinghaus" else scheduler_class(total_rounds=3)
+    step = scheduler.first_step()
+    rounds = [step.review_round]
+    while (step := scheduler.next_step(step)) is not None:
+        rounds.append(step.review_round)
+    assert rounds == [1, 2, 3]
@@ -0,0 +1,33 @@
+"""复习计划接口"""
+import pytest
+
+from app.services.pagination import encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_reviews_cursor_pagination(client):
+    await client.post("/api/progress/1/complete")
+    response = await client.get("/api/reviews", params={"limit": 2})
+    assert response.status_code == 200
+    first_page = response.json()
+    assert first_page["next_cursor"]
+
+    response = await client.get("/api/reviews", params={"limit": 2, "cursor": first_page["next_cursor"]})
+    assert response.status_code == 200
+    first_ids = {item["id"] for item in first_page["items"]}
+    assert first_ids.isdisjoint(item["id"] for item in response.json()["items"])
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    encode_cursor(["2024-01-01T00:00:00"]),
+    encode_cursor(["not-a-date", 1]),
+    encode_cursor(["2024-01-01T00:00:00", "1 OR 1=1"]),
+    encode_cursor(["2024-01-01T00:00:00", None]),
+    encode_cursor(["2024-01-01T00:00:00", 1.5]),
+])
+async def test_reviews_invalid_cursor(client, cursor):
+    response = await client.get("/api/reviews", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "无效的分页游标"
@@ -0,0 +1,43 @@
+"""搜索 API 测试"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def save_note(client, problem_id: int, **fields) -> dict:
+    response = await client.post("/api/notes", json={"problem_id": problem_id, **fields})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def search_notes(client, keyword: str) -> list[dict]:
+    response = await client.get("/api/search", params={"q": keyword})
+    assert response.status_code == 200
+    return [hit for hit in response.json()["items"] if hit["source"] == "note"]
+
+
+@pytest.mark.parametrize("keyword", ["onerror", "拓扑", "<"])
+async def test_snippet_escapes_note_html(client, keyword):
+    """全文索引、两字索引、LIKE 三条路径生成的片段都转义笔记中的 HTML"""
+    await save_note(client, 3, approach="拓扑 <img src=x onerror=alert(1)>")
+
+    hits = await search_notes(client, keyword)
+    assert hits
+    for hit in hits:
+        text = hit["snippet"].replace("<mark>", "").replace("</mark>", "")
+        assert "<" not in text
+        assert "&lt;img" in text
+
+
+async def test_two_character_keyword_uses_bigram_index(client):
+    note = await save_note(client, 4, approach="单调栈求下一个更大元素")
+    assert [hit["problem"]["id"] for hit in await search_notes(client, "单调")] == [4]
+
+    # 更新与删除同步到两字索引
+    await save_note(client, 4, approach="前缀和")
+    assert await search_notes(client, "单调") == []
+    assert [hit["problem"]["id"] for hit in await search_notes(client, "缀和")] == [4]
+
+    response = await client.delete(f"/api/notes/{note['id']}")
+    assert response.status_code == 200
+    assert await search_notes(client, "缀和") == []
@@ -0,0 +1,43 @@
+"""统计 API 测试"""
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.models import Problem, Progress
+
+pytestmark = pytest.mark.anyio
+
+# ETag 中间件读取数据版本号一次、分类聚合一次、每日活动汇总一次
+STATS_STATEMENTS = 3
+
+
+async def add_problems(categories: list[str], start_id: int) -> None:
+    """每个分类写入一道新题目（带进度）"""
+    async with AsyncSessionLocal() as db:
+        for offset, category in enumerate(categories):
+            problem = Problem(
+                leetcode_id=start_id + offset,
+                title=f"Stats {category}",
+                title_cn=f"统计 {category}",
+                difficulty="Medium",
+                category=category,
+            )
+            db.add(problem)
+            await db.flush()
+            db.add(Progress(problem_id=problem.id))
+        await db.commit()
+
+
+async def test_stats_statement_count_constant(client, count_statements):
+    with count_statements() as statements:
+        response = await client.get("/api/stats")
+    assert response.status_code == 200
+    categories = len(response.json()["category_stats"])
+    assert len(statements) == STATS_STATEMENTS, statements
+
+    await add_problems([f"测试分类{i}" for i in range(5)], start_id=900001)
+
+    with count_statements() as statements:
+        response = await client.get("/api/stats")
+    assert response.status_code == 200
+    assert len(response.json()["category_stats"]) == categories + 5
+    assert len(statements) == STATS_STATEMENTS, statements
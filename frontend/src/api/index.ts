@@ -5,6 +5,17 @@ const api = axios.create({
   timeout: 10000,
 })
 
+// 多用户模式：后端按 X-User-Id 路由到用户自己的数据库（保存在 localStorage 的 userId）
+const currentUserId = () => localStorage.getItem('userId')
+
+api.interceptors.request.use((config) => {
+  const userId = currentUserId()
+  if (userId) {
+    config.headers['X-User-Id'] = userId
+  }
+  return config
+})
+
 // 响应拦截器
 api.interceptors.response.use(
   (response) => response.data,
@@ -28,6 +39,8 @@ export const problemApi = {
     sort_by?: string
     page?: number
     page_size?: number
+    cursor?: string
+    include_total?: boolean
   }) => api.get('/problems', { params }),
 
   // 获取题目详情
@@ -42,6 +55,10 @@ export const progressApi = {
   // 一键完成（推荐使用）
   complete: (problemId: number) => api.post(`/progress/${problemId}/complete`),
 
+  // 批量完成
+  completeBatch: (problemIds: number[]) =>
+    api.post('/progress/complete-batch', { problem_ids: problemIds }),
+
   // 手动更新进度（高级选项）
   update: (problemId: number, data: { status: string; mastery_level: number }) =>
     api.put(`/progress/${problemId}`, data),
@@ -73,7 +90,7 @@ export const noteApi = {
 // 标签相关 API
 export const tagApi = {
   // 获取所有标签
-  getList: () => api.get('/tags'),
+  getList: (withCounts?: boolean) => api.get('/tags', { params: { with_counts: withCounts } }),
 
   // 创建标签
   create: (data: { name: string; color: string }) => api.post('/tags', data),
@@ -88,6 +105,14 @@ export const tagApi = {
   // 从题目移除标签
   removeFromProblem: (problemId: number, tagId: number) =>
     api.delete(`/tags/${problemId}/tags/${tagId}`),
+
+  // 批量添加标签
+  attachBulk: (problemIds: number[], tagIds: number[]) =>
+    api.post('/tags/bulk-attach', { problem_ids: problemIds, tag_ids: tagIds }),
+
+  // 批量移除标签
+  detachBulk: (problemIds: number[], tagIds: number[]) =>
+    api.post('/tags/bulk-detach', { problem_ids: problemIds, tag_ids: tagIds }),
 }
 
 // 复习相关 API
@@ -96,14 +121,56 @@ export const reviewApi = {
   getToday: () => api.get('/reviews/today'),
 
   // 获取所有复习计划
-  getAll: (completed?: boolean) => api.get('/reviews', { params: { completed } }),
+  getAll: (params?: { completed?: boolean; cursor?: string; limit?: number; include_total?: boolean }) =>
+    api.get('/reviews', { params }),
 
   // 标记复习完成
-  complete: (reviewId: number) => api.put(`/reviews/${reviewId}/complete`),
+  complete: (reviewId: number, quality?: number) =>
+    api.put(`/reviews/${reviewId}/complete`, null, { params: { quality } }),
+
+  // 批量标记复习完成（如一次清空逾期复习）
+  completeBatch: (reviewIds: number[], quality?: number) =>
+    api.put('/reviews/complete', { review_ids: reviewIds, quality }),
+}
+
+// 搜索相关 API
+export const searchApi = {
+  // 全文搜索题目和笔记
+  search: (q: string, limit?: number) => api.get('/search', { params: { q, limit } }),
 }
 
 // 统计相关 API
 export const statsApi = {
   // 获取统计数据
   get: () => api.get('/stats'),
+
+  // 活动热力图（最近 days 天，只返回有活动的日期）
+  getHeatmap: (days = 365) => api.get('/stats/heatmap', { params: { days } }),
+}
+
+// 备份导入/导出（JSON Lines）
+export const backupApi = {
+  // 导出文件下载地址
+  exportUrl: () => {
+    const userId = currentUserId()
+    return userId ? `/api/backup/export?user=${encodeURIComponent(userId)}` : '/api/backup/export'
+  },
+  // 导入备份文件（大文件导入耗时较长，不使用默认超时）
+  import: (file: Blob) => api.post('/backup/import', file, {
+    headers: { 'Content-Type': 'application/x-ndjson' },
+    timeout: 0,
+  }),
+}
+
+// 变更事件（SSE）
+export const eventsApi = {
+  // 订阅进度/复习/笔记/标签变更，返回 EventSource（调用 close() 取消订阅）
+  subscribe: (handlers: Record<string, (data: any) => void>) => {
+    const userId = currentUserId()
+    const source = new EventSource(userId ? `/api/events?user=${encodeURIComponent(userId)}` : '/api/events')
+    for (const [type, handler] of Object.entries(handlers)) {
+      source.addEventListener(type, (event) => handler(JSON.parse((event as MessageEvent).data)))
+    }
+    return source
+  },
 }
@@ -59,7 +59,7 @@ export const useProblemStore = defineStore('problem', () => {
   async function fetchProblems() {
     loading.value = true
     try {
-      const params: Record<string, any> = {}
+      const params: Record<string, any> = { include_total: true }
       if (filters.value.difficulty) params.difficulty = filters.value.difficulty
       if (filters.value.category) params.category = filters.value.category
       if (filters.value.status) params.status = filters.value.status